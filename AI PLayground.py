@@ -3,7 +3,7 @@
 Pixel Blackjack – an in‑depth blackjack game with retro pixel art
 =================================================================
 
-Single‑file pygame program. No external assets required.
+pygame front end over the headless blackjack_engine module. No external assets required.
 
 Features
 --------
@@ -14,6 +14,8 @@ Features
 • Dealer stands on soft 17 (configurable)
 • Clean, crisp pixel‑art cards, suits, and chips rendered from code
 • Pixel UI with buttons, hand labels, result banners
+• Engine telemetry (rounds, cards, reshuffles, splits, ..., decision latency)
+  exported in Prometheus text format — see TELEMETRY_* below
 
 How to run
 ----------
@@ -27,27 +29,36 @@ Controls
 • During your turn, click HIT, STAND, DOUBLE, SPLIT, or SURRENDER.
 • When offered, click INSURE to place an insurance bet (up to half your main bet).
 • After the round, click NEXT ROUND to continue.
+• While betting, press R to move to the next table (rule preset).
 
 Note: This is a single‑player game vs the dealer.
 """
 
 import math
-import random
 import sys
-from dataclasses import dataclass, field
-from typing import List, Tuple, Optional
+from typing import Optional
 
 import pygame
 
+from blackjack_engine import (
+    CHIP_DENOMS, PRESETS, RANKS, SUITS, Card, Hand, Table,
+)
+from blackjack_strategy import analyze
+from blackjack_telemetry import Telemetry
+from pixel_font import blit_pix_text
+
 # -----------------------------
 # Config
 # -----------------------------
 SCREEN_W, SCREEN_H = 1060, 720
 FPS = 60
-DECKS_IN_SHOE = 6
-BLACKJACK_PAYS = (3, 2)  # 3:2
-DEALER_STAND_SOFT_17 = True
-MAX_SPLIT_HANDS = 4
+# Rules live in blackjack_engine.PRESETS; press R between rounds to switch tables
+RULES_PRESET = 'classic'
+
+# Telemetry: set TELEMETRY_ENABLED = False to skip collection entirely
+TELEMETRY_ENABLED = True
+TELEMETRY_TEXTFILE = "blackjack_metrics.prom"  # Prometheus textfile, rewritten each round (None to skip)
+TELEMETRY_HTTP_PORT = None                     # e.g. 9109 to serve /metrics locally
 
 # Colors (RGB)
 BLACK = (12, 12, 12)
@@ -60,42 +71,6 @@ BLUE = (76, 138, 199)
 GREY = (120, 120, 120)
 DARKRED = (140, 30, 30)
 
-# -----------------------------
-# Utility: tiny pixel font (5x7) and helpers
-# -----------------------------
-# Each char is 5 columns x 7 rows, using strings of 0/1
-PIX_FONT = {
-    'A': ["01110","10001","10001","11111","10001","10001","10001"],
-    'K': ["10001","10010","11100","10010","10001","10001","10001"],
-    'Q': ["01110","10001","10001","10101","10011","01111","00001"],
-    'J': ["00111","00001","00001","00001","10001","10001","01110"],
-    'T': ["11111","00100","00100","00100","00100","00100","00100"],
-    '0': ["01110","10001","10011","10101","11001","10001","01110"],
-    '1': ["00100","01100","00100","00100","00100","00100","01110"],
-    '2': ["01110","10001","00001","00010","00100","01000","11111"],
-    '3': ["11110","00001","00001","01110","00001","00001","11110"],
-    '4': ["00010","00110","01010","10010","11111","00010","00010"],
-    '5': ["11111","10000","11110","00001","00001","10001","01110"],
-    '6': ["00110","01000","10000","11110","10001","10001","01110"],
-    '7': ["11111","00001","00010","00100","01000","01000","01000"],
-    '8': ["01110","10001","10001","01110","10001","10001","01110"],
-    '9': ["01110","10001","10001","01111","00001","00010","11100"],
-}
-
-
-def blit_pix_text(surface: pygame.Surface, text: str, pos: Tuple[int, int], color=BLACK, scale=2):
-    x, y = pos
-    for ch in text:
-        glyph = PIX_FONT.get(ch.upper())
-        if glyph is None:
-            x += 6 * scale
-            continue
-        for row, row_bits in enumerate(glyph):
-            for col, bit in enumerate(row_bits):
-                if bit == '1':
-                    pygame.draw.rect(surface, color, (x + col*scale, y + row*scale, scale, scale))
-        x += (5 + 1) * scale  # 1px gap
-
 # -----------------------------
 # Pixel‑art suits (16x16) built from code
 # -----------------------------
@@ -154,23 +129,6 @@ def suit_surface(suit: str, fg=(40, 40, 40), scale=2) -> pygame.Surface:
 CARD_W, CARD_H = 44, 60          # base pixel canvas size
 CARD_SCALE = 4                   # on‑screen scale (final ~176x240)
 
-RANKS = ['A','2','3','4','5','6','7','8','9','10','J','Q','K']
-SUITS = ['S','H','D','C']
-
-
-@dataclass
-class Card:
-    rank: str
-    suit: str
-
-    @property
-    def value(self):
-        if self.rank in ['J','Q','K']:
-            return 10
-        if self.rank == 'A':
-            return 11
-        return int(self.rank)
-
 
 def draw_card_surface(card: Optional[Card], face_up=True) -> pygame.Surface:
     base = pygame.Surface((CARD_W, CARD_H), pygame.SRCALPHA)
@@ -219,7 +177,6 @@ CARD_BACK = draw_card_surface(None, False)
 # -----------------------------
 # Chips rendering
 # -----------------------------
-CHIP_DENOMS = [1, 5, 25, 100, 500]
 CHIP_COLORS = {1: (232, 232, 232), 5: (220, 70, 70), 25: (40, 150, 90), 100: (60, 100, 180), 500: (160, 80, 170)}
 
 
@@ -248,79 +205,14 @@ def draw_chip(value: int, scale=3) -> pygame.Surface:
 
 CHIP_SURF = {v: draw_chip(v, 4) for v in CHIP_DENOMS}
 
-# -----------------------------
-# Shoe / dealing logic
-# -----------------------------
-
-def build_shoe(decks=DECKS_IN_SHOE) -> List[Card]:
-    cards = [Card(r, s) for s in SUITS for r in RANKS] * decks
-    random.shuffle(cards)
-    return cards
-
-
-@dataclass
-class Hand:
-    cards: List[Card] = field(default_factory=list)
-    bet: int = 0
-    insurance: int = 0
-    surrendered: bool = False
-    doubled: bool = False
-
-    def add(self, card: Card):
-        self.cards.append(card)
-
-    def values(self) -> Tuple[int, int]:
-        total = sum(c.value for c in self.cards)
-        aces = sum(1 for c in self.cards if c.rank == 'A')
-        soft_total = total
-        while soft_total > 21 and aces:
-            soft_total -= 10
-            aces -= 1
-        hard_total = soft_total
-        return hard_total, total  # (best <=21 if possible, raw with Aces as 11)
-
-    def best_total(self) -> int:
-        hard, raw = self.values()
-        return hard
-
-    def is_blackjack(self) -> bool:
-        return len(self.cards) == 2 and self.best_total() == 21
-
-    def is_bust(self) -> bool:
-        return self.best_total() > 21
-
-    def can_split(self) -> bool:
-        return len(self.cards) == 2 and self.cards[0].rank == self.cards[1].rank
-
-    def is_soft(self) -> bool:
-        # soft if an Ace counted as 11 and total <= 21
-        total = sum(11 if c.rank == 'A' else (10 if c.rank in 'JQK' else int(c.rank)) for c in self.cards)
-        aces = sum(1 for c in self.cards if c.rank == 'A')
-        while total > 21 and aces:
-            total -= 10
-            aces -= 1
-        return any(c.rank == 'A' for c in self.cards) and total <= 21 and sum(1 for c in self.cards if c.rank == 'A') > 0 and (sum(1 for c in self.cards if c.rank == 'A') >= 1)
-
-
-@dataclass
-class Player:
-    bank: int = 1000
-    hands: List[Hand] = field(default_factory=list)
-    active_index: int = 0
-
-    def reset_round(self):
-        self.hands = []
-        self.active_index = 0
-
-    def active_hand(self) -> Hand:
-        return self.hands[self.active_index]
-
-
 # -----------------------------
 # Game State
 # -----------------------------
-class Game:
+class Game(Table):
     def __init__(self):
+        super().__init__(telemetry=Telemetry() if TELEMETRY_ENABLED else None, rules=PRESETS[RULES_PRESET])
+        self.preset = RULES_PRESET
+        self.house_edge = analyze(self.rules).house_edge  # solved once per preset, not per frame
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
         pygame.display.set_caption("Pixel Blackjack")
@@ -328,16 +220,9 @@ class Game:
         self.font = pygame.font.SysFont("couriernew", 18)
         self.bigfont = pygame.font.SysFont("couriernew", 28, bold=True)
 
-        self.shoe: List[Card] = build_shoe()
-        self.cut_index = int(len(self.shoe) * 0.25)  # reshuffle when reaching this index from end
-        self.discard: List[Card] = []
-
-        self.player = Player()
-        self.dealer_hand = Hand()
-
-        self.state = 'BETTING'  # BETTING -> DEALING -> PLAYER_TURN -> DEALER_TURN -> RESOLVE
-        self.message = "Place your bet"
-        self.bets_selection: List[int] = []
+        self.metrics_server = None
+        if self.telemetry and TELEMETRY_HTTP_PORT:
+            self.metrics_server = self.telemetry.serve_http(TELEMETRY_HTTP_PORT)
 
         self.buttons = {}
         self._build_buttons()
@@ -366,201 +251,47 @@ class Game:
         textsurf = self.bigfont.render(label, True, BLACK if enabled else (60,60,60))
         self.screen.blit(textsurf, (r.centerx - textsurf.get_width()//2, r.centery - textsurf.get_height()//2))
 
-    # ------------------------- dealing helpers -------------------
-    def draw_from_shoe(self) -> Card:
-        if len(self.shoe) <= self.cut_index:
-            # reshuffle
-            self.shoe = build_shoe()
-        return self.shoe.pop()
-
-    # ------------------------- game phases -----------------------
-    def start_round(self):
-        bet = sum(self.bets_selection)
-        if bet <= 0 or bet > self.player.bank:
-            self.message = "Invalid bet"
-            return
-        self.player.bank -= bet
-        self.player.reset_round()
-        self.player.hands = [Hand(bet=bet)]
-        self.dealer_hand = Hand()
-
-        # initial deal
-        for _ in range(2):
-            self.player.hands[0].add(self.draw_from_shoe())
-            self.dealer_hand.add(self.draw_from_shoe())
-        self.state = 'PLAYER_TURN'
-        self.message = "Your move"
-
-    def offer_insurance(self) -> bool:
-        return self.dealer_hand.cards and self.dealer_hand.cards[0].rank == 'A'
-
-    def current_actions(self):
-        h = self.player.active_hand()
-        can_split = h.can_split() and len(self.player.hands) < MAX_SPLIT_HANDS and self.player.bank >= h.bet
-        can_double = (len(h.cards) == 2) and (self.player.bank >= h.bet)
-        can_surrender = (len(h.cards) == 2) and not h.doubled and not h.surrendered
-        can_insure = self.offer_insurance() and h.insurance == 0 and self.player.bank >= h.bet//2
-        return dict(split=can_split, double=can_double, surrender=can_surrender, insure=can_insure)
-
-    def settle(self):
-        # Check dealer blackjack if showing Ace or 10 and insurance placed
-        dealer_blackjack = self.dealer_hand.is_blackjack()
-
-        for idx, h in enumerate(self.player.hands):
-            result = None
-
-            if h.surrendered:
-                # Half bet returned (player already took half loss when marking surrendered)
-                result = ("Surrender", -h.bet//2)
-            elif h.is_bust():
-                result = ("Bust", -h.bet)
-            elif dealer_blackjack and not h.is_blackjack():
-                # dealer blackjack beats all except player's blackjack (which pushes)
-                loss = -h.bet
-                ins = 0
-                if h.insurance:
-                    # insurance pays 2:1
-                    ins = h.insurance * 2
-                result = ("Dealer blackjack", loss + ins)
-            else:
-                # normal compare; ensure dealer plays out if needed
-                if not dealer_blackjack:
-                    self.dealer_playout()
-                dealer_total = self.dealer_hand.best_total()
-                player_total = h.best_total()
-
-                if h.is_blackjack() and not self.dealer_hand.is_blackjack():
-                    win = h.bet * BLACKJACK_PAYS[0] // BLACKJACK_PAYS[1]
-                    result = ("Blackjack!", win)
-                elif self.dealer_hand.is_bust():
-                    result = ("Dealer busts", h.bet)
-                elif player_total > dealer_total:
-                    result = ("Win", h.bet)
-                elif player_total < dealer_total:
-                    result = ("Lose", -h.bet)
-                else:
-                    result = ("Push", 0)
-
-                if h.insurance and self.dealer_hand.is_blackjack():
-                    # this path only occurs if dealer_blackjack True; already handled above, but keep safe
-                    result = (result[0], result[1] + h.insurance*2)
-
-            self.player.bank += h.bet + result[1]  # return original bet plus net
-
-        self.state = 'RESOLVE'
-        if self.dealer_hand.is_blackjack():
-            self.message = "Dealer has Blackjack"
-        elif self.dealer_hand.is_bust():
-            self.message = "Dealer busts"
-        else:
-            self.message = "Round settled"
-
-    def dealer_playout(self):
-        # Reveal and play out to 17 (stand on soft 17 if configured)
-        while True:
-            total = self.dealer_hand.best_total()
-            soft = self.is_soft_hand(self.dealer_hand)
-            if total < 17:
-                self.dealer_hand.add(self.draw_from_shoe())
-            elif total == 17 and soft and not DEALER_STAND_SOFT_17:
-                self.dealer_hand.add(self.draw_from_shoe())
-            else:
-                break
-
-    @staticmethod
-    def is_soft_hand(hand: Hand) -> bool:
-        # same as Hand.is_soft but simpler, for dealer
-        total = sum(11 if c.rank == 'A' else (10 if c.rank in 'JQK' else int(c.rank)) for c in hand.cards)
-        aces = sum(1 for c in hand.cards if c.rank == 'A')
-        while total > 21 and aces:
-            total -= 10
-            aces -= 1
-        # soft if any ace still counted as 11
-        return any(c.rank == 'A' for c in hand.cards) and total <= 21 and aces > 0
-
     # ------------------------- input handlers --------------------
     def on_click(self, pos):
-        x, y = pos
         if self.state == 'BETTING':
             # chip clicks
             for i, val in enumerate(CHIP_DENOMS):
                 chip_rect = pygame.Rect(40 + i*100, 540, 64, 64)
                 if chip_rect.collidepoint(pos):
-                    if self.player.bank >= val:
-                        self.bets_selection.append(val)
-                        self.message = f"Bet: ${sum(self.bets_selection)}"
+                    self.add_chip(val)
                     return
             # deal button
             if self.buttons['deal'].collidepoint(pos):
-                self.start_round()
+                self.deal()
                 return
             # remove last chip if clicking total area
             total_rect = pygame.Rect(40, 500, 500, 32)
-            if total_rect.collidepoint(pos) and self.bets_selection:
-                self.player.bank += self.bets_selection.pop()
-                self.message = f"Bet: ${sum(self.bets_selection)}"
+            if total_rect.collidepoint(pos):
+                self.remove_chip()
                 return
         elif self.state == 'PLAYER_TURN':
-            h = self.player.active_hand()
-            acts = self.current_actions()
-            if self.buttons['hit'].collidepoint(pos):
-                h.add(self.draw_from_shoe())
-                if h.is_bust():
-                    self.advance_hand_or_dealer()
-                return
-            if self.buttons['stand'].collidepoint(pos):
-                self.advance_hand_or_dealer()
-                return
-            if self.buttons['double'].collidepoint(pos) and acts['double']:
-                self.player.bank -= h.bet
-                h.bet *= 2
-                h.doubled = True
-                h.add(self.draw_from_shoe())
-                self.advance_hand_or_dealer()
-                return
-            if self.buttons['split'].collidepoint(pos) and acts['split']:
-                # split into two hands
-                self.player.bank -= h.bet
-                c2 = h.cards.pop()
-                new_hand = Hand(cards=[c2], bet=h.bet)
-                # draw one new card to each split hand
-                h.add(self.draw_from_shoe())
-                new_hand.add(self.draw_from_shoe())
-                self.player.hands.insert(self.player.active_index+1, new_hand)
-                return
-            if self.buttons['surrender'].collidepoint(pos) and acts['surrender']:
-                h.surrendered = True
-                # immediately settle this hand as half loss
-                self.advance_hand_or_dealer()
-                return
-            if self.buttons['insure'].collidepoint(pos) and acts['insure']:
-                amt = min(h.bet//2, self.player.bank)
-                self.player.bank -= amt
-                h.insurance = amt
-                self.message = f"Insurance placed: ${amt}"
-                return
+            for action in ('hit', 'stand', 'double', 'split', 'surrender', 'insure'):
+                if self.buttons[action].collidepoint(pos):
+                    self.act(action)
+                    return
         elif self.state == 'RESOLVE':
             if self.buttons['next'].collidepoint(pos):
-                self.message = "Place your bet"
-                self.state = 'BETTING'
-                self.bets_selection = []
-                self.player.reset_round()
-                self.dealer_hand = Hand()
+                self.next_round()
                 return
 
-    def advance_hand_or_dealer(self):
-        # move to next hand or dealer turn/settle
-        h = self.player.active_hand()
-        if h.is_bust():
-            self.message = "Bust!"
-        if self.player.active_index < len(self.player.hands) - 1:
-            self.player.active_index += 1
-            self.message = "Next hand"
-        else:
-            # dealer turn & settle
-            self.state = 'DEALER_TURN'
-            self.dealer_playout()
-            self.settle()
+    def next_preset(self):
+        if self.state != 'BETTING' or self.bets_selection:
+            return
+        names = list(PRESETS)
+        self.preset = names[(names.index(self.preset) + 1) % len(names)]
+        self.set_rules(PRESETS[self.preset])
+        self.house_edge = analyze(self.rules).house_edge
+        self.message = f"Table: {self.preset}"
+
+    def settle(self):
+        super().settle()
+        if self.telemetry and TELEMETRY_TEXTFILE:
+            self.telemetry.write_textfile(TELEMETRY_TEXTFILE)
 
     # ------------------------- drawing ---------------------------
     def draw_table(self):
@@ -576,6 +307,10 @@ class Game:
         msg = self.bigfont.render(self.message, True, WHITE)
         self.screen.blit(msg, (40, 70))
 
+        # table rules and their (cached) house edge
+        info = self.font.render(f"{self.preset}  house edge {self.house_edge * 100:.2f}%", True, WHITE)
+        self.screen.blit(info, (SCREEN_W - info.get_width() - 40, 70))
+
     def draw_betting_ui(self):
         # chips
         for i, val in enumerate(CHIP_DENOMS):
@@ -656,6 +391,8 @@ class Game:
                     running = False
                 elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                     self.on_click(event.pos)
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+                    self.next_preset()
 
             self.draw_table()
             self.draw_hands()
@@ -663,6 +400,8 @@ class Game:
 
             pygame.display.flip()
 
+        if self.metrics_server:
+            self.metrics_server.shutdown()
         pygame.quit()
 
 
@@ -3,35 +3,61 @@
 #Assignment: HW21
 
 #1. Import the random and time libraries
-import random, time
+import random
+from combat_events import DAMAGE, NORMAL, CombatEvent, TextSink
+from sim_clock import SimClock
+#Swap for SimClock.accelerated(10) or SimClock.instant() to skip the waiting
+CLOCK = SimClock.realtime()
 #2. Create a class containing a def function that inits self and the 3 attributes health, damage, and speed.
 class Stats:
-    def __init__(self, health, damage, speed):
+    __slots__ = ("name", "health", "damage", "speed")
+
+    def __init__(self, health, damage, speed, name=""):
+        self.name = name
         self.health = health
         self.damage = damage
         self.speed = speed
-    def BattleLoop(self):
-        for i in range(10):
-            self.health -= random.randint(1,6)
-            print(f"The warrior is taking damage")
-            print(self.health)
-            time.sleep(1)
+    def BattleLoop(self, sink=None, clock=None):
+        #Runs BattleTicks on its own, waiting one clock second per tick
+        clock = clock or CLOCK
+        clock.run(self.BattleTicks(clock, sink))
+    @staticmethod
+    def DamageLines(event):
+        #The same two lines the old BattleLoop printed for every hit
+        return f"The {event.target.lower()} is taking damage\n{event.hp}"
+    async def BattleTicks(self, clock, sink=None, ticks=10):
+        #Each hit is sent to a combat_events sink (printed by default) instead of print()ing directly
+        #clock.sleep lets other battles share the event loop while this one waits
+        sink = sink if sink is not None else TextSink(buffer_lines=1, formatter=self.DamageLines)
+        for i in range(ticks):
+            dmg = random.randint(1,6)
+            self.health -= dmg
+            if sink.level >= NORMAL:
+                sink.emit(CombatEvent(DAMAGE, i + 1, "", self.name, dmg, self.health))
+            await clock.sleep(1)
+        sink.flush()
     def HealLoop(self):
         Warrior.health += 30
         if Warrior.health + 30 < 100:
             Warrior.health = 100
+    async def HealTicks(self, clock, times=3, every=3):
+        #Calls HealLoop every few clock seconds, at the same time as the warrior's BattleTicks
+        for i in range(times):
+            await clock.sleep(every)
+            self.HealLoop()
 #3. Make a "warrior" character object with 100 health, 20 damage, and 30 speed. Print the character's initial health below.
-Warrior = Stats(100, 20, 30)
+Warrior = Stats(100, 20, 30, "Warrior")
 print(f"Warrior has {Warrior.health} hp")
 #4. Make a def function within the class that loops 10 times. Within this function,
 #make the following loop 10 times: the character takes a random amount of damage from 1 to 6,
 #the new health is printed, a time.sleep delay of one second is done. Call the function to the warrior.
-Warrior.BattleLoop()
+#(Warrior.BattleLoop(clock=CLOCK) runs it alone; below it runs alongside the healer instead)
 #5. Make a "healer" character object with 60 health, 10 damage, and 30 speed.
-Healer = Stats(60, 10, 30)
+Healer = Stats(60, 10, 30, "Healer")
 #6. Make a def function within the class that heals the warrior for 30 health. Create an if statement
 #that sets the warrior's health to its max (100) if the healing would bring the warrior's health above that.
 #Call the function to the healer.
-Healer.HealLoop()
+#The healer heals every 3 seconds while the warrior is still taking damage, on the same clock
+CLOCK.run(Warrior.BattleTicks(CLOCK), Healer.HealTicks(CLOCK))
 #7. Print the warrior's final health at the very bottom.
 print(f"The Warrior now has {Warrior.health} hp")
\ No newline at end of file
@@ -4,6 +4,9 @@
 
 import random
 
+from combat_events import CRIT, DEATH, HIT, INITIATIVE, MISS, NORMAL, NULL_SINK, SUMMARY, CombatEvent, TextSink, describe
+from dice import compile_dice
+
 #With a fresh perspective, the team lead wants you to look back and refactor the old combat code to
 #be streamlined with classes so the character and enemy stats won't be built in bulky dictionaries anymore.
 
@@ -12,10 +15,15 @@ import random
 #the combat test code below as well.)
 
 
+#Damage is a dice expression like "2d6+3"; it's compiled once here and rolled fresh on every hit.
+#__slots__ keeps each Stats object to just these fields (no per-object __dict__)
 class Stats:
-    def __init__(self, health, initial, armor, atkm, damage,):
+    __slots__ = ("name", "health", "damage", "initial", "armor", "atkm")
+
+    def __init__(self, health, initial, armor, atkm, damage, name=""):
+        self.name = name
         self.health = health
-        self.damage = damage
+        self.damage = compile_dice(damage)
         self.initial = initial
         self.armor = armor
         self.atkm = atkm
@@ -23,84 +31,109 @@ class Stats:
 
 
 
-LaeZel = Stats(48, 1, 17, 6,
-               random.randint(1,6) + random.randint(1,6) + 3)
-Shadowheart = Stats(40, 1, 18, 4, random.randint(1,6) + 3)
-Gale = Stats(32, 1, 14, 6,
-             random.randint(1, 6)+random.randint(1, 10))
-Astarion = Stats(40, 3, 14, 6,
-                 random.randint(1,10) + random.randint(1,10))
-
-
-
-Goblin = Stats(7, 0, 12, 4, random.randint(1,6) + 2)
-Orc = Stats(15, 1, 13, 5, random.randint(1,12)+3)
-Troll = Stats(48, 1, 15, 7,
-              random.randint(1,6) + random.randint(1,6) + 4)
-Mindflayer = Stats(71, 1, 15, 7,
-                   random.randint(1,10) + random.randint(1,10) + 4)
-Dragon = Stats(127, 2, 18, 7,
-               random.randint(1,10) + random.randint(1,10) + random.randint(1,8) + 4)
-
-
-
-
-
-def initve():
-    groll = random.randint(1,20) + Gale.initial
-    oroll = random.randint(1,20) + Orc.initial
-    if groll > oroll:
-        print("Gale goes first")
-        gattk()
-    else:
-        print("Orc goes first")
-        oattk()
-
-
-def gattk():
-    while Gale.health > 0 or Orc.health > 0:
-        GaleAccRoll = random.randint(1,20)
-        if GaleAccRoll == 20:
-            print(f"Gale hit and did double damage. Orc now has {Orc.health} hp")
-            Orc.health -= Gale.damage * 2
-        elif GaleAccRoll == 1:
-            print("Gale missed")
-        elif GaleAccRoll + Gale.atkm >= Orc.armor:
-            Orc.health -= Gale.damage
-            print(f"Gale hit and did damage. Orc now has {Orc.health} hp")
-        else:
-            print("Gale missed")
-
-
-        if Gale.health <= 0 or Orc.health <= 0:
-            print("Battle concluded")
-            exit()
-        else:
-            oattk()
-
-
-
-def oattk():
-    while Gale.health > 0 or Orc.health > 0:
-        OrcAccRoll = random.randint(1,20)
-        if OrcAccRoll == 20:
-            Gale.health -= Orc.damage * 2
-            print(f"Orc hit and did double damage. Gale now has {Gale.health} hp")
-        elif OrcAccRoll == 1:
-            print("Orc missed")
-        elif OrcAccRoll + Orc.atkm >= Gale.armor:
-            Gale.health -= Orc.damage
-            print(f"Orc hit and did damage. Gale now has {Gale.health} hp")
+LaeZel = Stats(48, 1, 17, 6, "2d6+3", "LaeZel")
+Shadowheart = Stats(40, 1, 18, 4, "1d6+3", "Shadowheart")
+Gale = Stats(32, 1, 14, 6, "1d6+1d10", "Gale")
+Astarion = Stats(40, 3, 14, 6, "2d10", "Astarion")
+
+
+
+Goblin = Stats(7, 0, 12, 4, "1d6+2", "Goblin")
+Orc = Stats(15, 1, 13, 5, "1d12+3", "Orc")
+Troll = Stats(48, 1, 15, 7, "2d6+4", "Troll")
+Mindflayer = Stats(71, 1, 15, 7, "2d10+4", "Mindflayer")
+Dragon = Stats(127, 2, 18, 7, "2d10+1d8+4", "Dragon")
+
+
+
+
+
+#The old gattk()/oattk() called each other every turn, so a long fight (Gale vs Dragon) piled up stack
+#frames until RecursionError, and the fight ended by exit()ing the whole program. Now one loop swaps
+#whose turn it is, the fighters' health is copied so the Stats objects are never touched, and the
+#fight hands back a FightResult, so a batch can run it as many times as it wants.
+class FightResult:
+    def __init__(self, winner, loser, turns, winner_health):
+        self.winner = winner
+        self.loser = loser
+        self.turns = turns
+        self.winner_health = winner_health
+
+
+#Instead of printing every swing, fights send combat_events to a sink. The default TextSink prints
+#the same lines as before; batch() uses NULL_SINK so quiet fights skip building the messages at all.
+def old_lines(e):
+    #Turns an event back into the line the old gattk()/oattk() printed
+    if e.kind == INITIATIVE:
+        return f"{e.actor} goes first"
+    if e.kind == CRIT:
+        return f"{e.actor} hit and did double damage. {e.target} now has {e.hp} hp"
+    if e.kind == HIT:
+        return f"{e.actor} hit and did damage. {e.target} now has {e.hp} hp"
+    if e.kind == MISS:
+        return f"{e.actor} missed"
+    if e.kind == DEATH:
+        return "Battle concluded"
+    return describe(e)
+
+
+def attack(attacker, defender, defender_health, sink, turn):
+    AccRoll = random.randint(1,20)
+    if AccRoll == 20:
+        dmg = attacker.damage.roll() * 2
+        defender_health -= dmg
+        if sink.level >= NORMAL:
+            sink.emit(CombatEvent(CRIT, turn, attacker.name, defender.name, dmg, defender_health))
+    elif AccRoll != 1 and AccRoll + attacker.atkm >= defender.armor:
+        dmg = attacker.damage.roll()
+        defender_health -= dmg
+        if sink.level >= NORMAL:
+            sink.emit(CombatEvent(HIT, turn, attacker.name, defender.name, dmg, defender_health))
+    elif sink.level >= NORMAL:
+        sink.emit(CombatEvent(MISS, turn, attacker.name, defender.name, AccRoll))
+    return defender_health
+
+
+def fight(hero, enemy, sink=None):
+    sink = sink if sink is not None else TextSink(formatter=old_lines)
+    hroll = random.randint(1,20) + hero.initial
+    eroll = random.randint(1,20) + enemy.initial
+    hero_turn = hroll > eroll
+    if sink.level >= NORMAL:
+        #Only whoever goes first gets an initiative event, with their roll as the value
+        first, roll = (hero, hroll) if hero_turn else (enemy, eroll)
+        sink.emit(CombatEvent(INITIATIVE, 0, first.name, value=roll))
+
+    hero_health = hero.health
+    enemy_health = enemy.health
+    turns = 0
+    while hero_health > 0 and enemy_health > 0:
+        turns += 1
+        if hero_turn:
+            enemy_health = attack(hero, enemy, enemy_health, sink, turns)
         else:
-            print("Orc missed")
+            hero_health = attack(enemy, hero, hero_health, sink, turns)
+        hero_turn = not hero_turn
 
+    if enemy_health <= 0:
+        result = FightResult(hero, enemy, turns, hero_health)
+    else:
+        result = FightResult(enemy, hero, turns, enemy_health)
+    if sink.level >= SUMMARY:
+        sink.emit(CombatEvent(DEATH, turns, result.winner.name, result.loser.name))
+    sink.flush()
+    return result
 
-        if Gale.health <= 0 or Orc.health <= 0:
-            print("Battle concluded")
-            exit()
-        else:
-            gattk()
 
+def batch(hero, enemy, fights):
+    #Runs a lot of quiet fights and returns how often the hero won
+    wins = 0
+    for i in range(fights):
+        if fight(hero, enemy, NULL_SINK).winner is hero:
+            wins += 1
+    return wins / fights
 
 
-initve()
\ No newline at end of file
+if __name__ == "__main__":
+    result = fight(Gale, Orc)
+    print(f"{result.winner.name} won in {result.turns} turns with {result.winner_health} hp left")
@@ -12,74 +12,10 @@ import time
 # characters and some of the enemies they may face, and are tasked with making an early prototype
 # of one of the party members fighting against an enemy until one of them hits zero HP (dies).
 
-partyDict = {
-    "LaeZel": {
-        "HP": 48,
-        "Init": 1,
-        "AC": 17,
-        "AtkMod": 6,
-        "Damage": random.randint(1, 6) + random.randint(1, 6) + 3
-    },
-    "Shadowheart": {
-        "HP": 40,
-        "Init": 1,
-        "AC": 18,
-        "AtkMod": 4,
-        "Damage": random.randint(1, 6) + 3,
-    },
-    "Gale": {
-        "HP": 32,
-        "Init": 1,
-        "AC": 14,
-        "AtkMod": 6,
-        "Damage": random.randint(1, 10) + random.randint(1, 10),
-    },
-    "Astarion": {
-        "HP": 40,
-        "Init": 3,
-        "AC": 14,
-        "AtkMod": 5,
-        "Damage": random.randint(1, 8) + random.randint(1, 6) + 4,
-    }
-}
-
-enemyDict = {
-    "Goblin": {
-        "HP": 7,
-        "Init": 0,
-        "AC": 12,
-        "AtkMod": 4,
-        "Damage": random.randint(1, 6) + 2
-    },
-    "Orc": {
-        "HP": 15,
-        "Init": 1,
-        "AC": 13,
-        "AtkMod": 5,
-        "Damage": random.randint(1, 12) + 3
-    },
-    "Troll": {
-        "HP": 84,
-        "Init": 1,
-        "AC": 15,
-        "AtkMod": 7,
-        "Damage": random.randint(1, 6) + random.randint(1, 6) + 4
-    },
-    "Mindflayer": {
-        "HP": 71,
-        "Init": 1,
-        "AC": 15,
-        "AtkMod": 7,
-        "Damage": random.randint(1, 10) + random.randint(1, 10) + 4
-    },
-    "Dragon": {
-        "HP": 127,
-        "Init": 2,
-        "AC": 18,
-        "AtkMod": 7,
-        "Damage": random.randint(1, 10) + random.randint(1, 10) + random.randint(1, 8) + 4
-    },
-}
+# The dictionaries now live in roster.py so the simulators can share them. "Damage" is a dice
+# expression like "2d6+3", compiled once below and rolled fresh on every attack.
+from roster import partyDict, enemyDict
+from dice import compile_dice
 
 # Combat consists of these steps:
 
@@ -113,20 +49,22 @@ else:
 
 gHP = partyDict["Gale"]["HP"]
 gAC = partyDict["Gale"]["AC"]
-gDMG = partyDict["Gale"]["Damage"]
+gDice = compile_dice(partyDict["Gale"]["Damage"])
 gMOD = partyDict["Gale"]["AtkMod"]
 
 tHP = enemyDict["Troll"]["HP"]
 tAC = enemyDict["Troll"]["AC"]
-tDMG = enemyDict["Troll"]["Damage"]
+tDice = compile_dice(enemyDict["Troll"]["Damage"])
 tMOD = partyDict["Gale"]["AtkMod"]
 
 while gHP > 0 or tHP > 0:
 
     gNat = random.randint(1, 20)
     gMODROLL = gNat + gMOD
+    gDMG = gDice.roll()
     tNat = random.randint(1, 20)
     tMODROLL = tNat + tMOD
+    tDMG = tDice.roll()
 
     if gMove == True:
         if gHP <= 0:
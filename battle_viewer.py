@@ -0,0 +1,289 @@
+"""
+Live battle viewer
+==================
+
+Watch an ``encounter.Encounter`` play out in a pygame window drawn with the
+pixel font from the blackjack table.
+
+The simulation runs in its own process and never waits for the screen:
+after every turn it writes a snapshot (time, and each combatant's x, y, HP)
+into a ``SnapshotRing`` — a fixed-size ring buffer in shared memory. The
+ring is lock-free single-producer/single-consumer: each slot carries a
+sequence number that is odd while the slot is being written (a seqlock), so
+the reader copies a slot and keeps it only if the number didn't change
+underneath it. A reader that falls behind just skips to the newest slots.
+
+The renderer runs at a steady 60 FPS, drawing a moment a little in the past
+and interpolating positions and HP between the two snapshots around it. A
+slow simulation only means the picture holds on the latest snapshot; it
+never blocks a frame.
+
+Controls: Esc / close window to quit.
+
+Run:    python battle_viewer.py --heroes LaeZel Gale Astarion --monsters Goblin:4 Orc:2
+"""
+
+import argparse
+import multiprocessing as mp
+import random
+import time
+from collections import deque
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from battlefield import Battlefield
+from combat_events import CRIT, HIT, MISS, NORMAL, NullSink
+from encounter import ENEMIES, PARTY, Combatant, Encounter, weakest_target
+from roster import enemyDict, partyDict
+
+# -----------------------------
+# Config
+# -----------------------------
+SCREEN_W, SCREEN_H = 960, 600
+FPS = 60
+FIELD_W, FIELD_H = 160.0, 100.0     # feet
+TURN_SECONDS = 0.35                 # simulated pacing between turns
+INTERP_DELAY = 2 * TURN_SECONDS     # render this far behind the newest snapshot
+RING_SLOTS = 64
+MELEE_REACH = 5.0
+
+BACKGROUND = (24, 40, 30)
+WHITE = (240, 240, 240)
+GREY = (110, 110, 110)
+BLUE = (76, 138, 199)
+RED = (205, 68, 68)
+GOLD = (235, 190, 72)
+HP_BACK = (50, 20, 20)
+HP_FORE = (90, 200, 90)
+
+
+# -----------------------------
+# Lock-free snapshot ring
+# -----------------------------
+class SnapshotRing:
+    """Single-producer/single-consumer ring of fixed-size snapshots in shared memory.
+
+    Layout: ``head`` (newest published sequence number), then per slot a
+    sequence number, a timestamp and ``units`` rows of (x, y, hp, round).
+    """
+
+    FIELDS = 4
+
+    def __init__(self, units: int, slots: int = RING_SLOTS, name: Optional[str] = None):
+        self.units = units
+        self.slots = slots
+        size = 8 + slots * 16 + slots * units * self.FIELDS * 4
+        self._owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self._owner, size=size)
+        buf = self.shm.buf
+        self.head = np.ndarray((1,), np.int64, buf, 0)
+        self.seqs = np.ndarray((slots,), np.int64, buf, 8)
+        self.times = np.ndarray((slots,), np.float64, buf, 8 + slots * 8)
+        self.data = np.ndarray((slots, units, self.FIELDS), np.float32, buf, 8 + slots * 16)
+        if self._owner:
+            self.head[0] = 0
+            self.seqs[:] = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    # producer side
+    def publish(self, t: float, frame: np.ndarray):
+        seq = int(self.head[0]) + 1
+        slot = seq % self.slots
+        self.seqs[slot] = 2 * seq - 1          # odd: being written
+        self.times[slot] = t
+        self.data[slot] = frame
+        self.seqs[slot] = 2 * seq              # even: done
+        self.head[0] = seq
+
+    # consumer side
+    def read_since(self, last: int) -> Tuple[int, List[Tuple[float, np.ndarray]]]:
+        """Snapshots published after sequence ``last`` that could be read intact; returns (newest seq, snapshots)."""
+        head = int(self.head[0])
+        out = []
+        for seq in range(max(last + 1, head - self.slots + 1), head + 1):
+            slot = seq % self.slots
+            if self.seqs[slot] != 2 * seq:
+                continue                        # overwritten or mid-write: skip
+            t = float(self.times[slot])
+            frame = self.data[slot].copy()
+            if self.seqs[slot] == 2 * seq:
+                out.append((t, frame))
+        return head, out
+
+    def close(self):
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+# -----------------------------
+# Simulation process
+# -----------------------------
+class _TargetSink(NullSink):
+    """Remembers who was attacked last, so the attacker can be drawn stepping toward them."""
+    level = NORMAL
+
+    def __init__(self):
+        self.target = None
+
+    def emit(self, event):
+        if event.kind in (HIT, CRIT, MISS):
+            self.target = event.target
+
+
+def build_combatants(heroes: List[str], monsters: List[Tuple[str, int]]) -> List[Combatant]:
+    units = [Combatant.from_stats(h, partyDict[h], PARTY) for h in heroes]
+    for name, count in monsters:
+        units += [Combatant.from_stats(f"{name} {i + 1}", enemyDict[name], ENEMIES) for i in range(count)]
+    return units
+
+
+def simulate(ring_name: str, heroes, monsters, seed: Optional[int], turn_seconds: float):
+    """Run one encounter, publishing a snapshot after every turn. Runs in a child process."""
+    units = build_combatants(heroes, monsters)
+    ring = SnapshotRing(len(units), name=ring_name)
+    rng = random.Random(seed)
+    sink = _TargetSink()
+    enc = Encounter(units, policy=weakest_target, rng=rng, events=sink)
+    index = {c.name: i for i, c in enumerate(units)}
+
+    field = Battlefield(FIELD_W, FIELD_H)
+    party = [i for i, c in enumerate(units) if c.side == PARTY]
+    foes = [i for i, c in enumerate(units) if c.side == ENEMIES]
+    for group, x in ((party, 15.0), (foes, FIELD_W - 15.0)):
+        for k, i in enumerate(group):
+            field.add(x, FIELD_H * (k + 1) / (len(group) + 1))
+
+    frame = np.zeros((len(units), SnapshotRing.FIELDS), np.float32)
+
+    def publish():
+        frame[:, 0] = field.x[:len(units)]
+        frame[:, 1] = field.y[:len(units)]
+        frame[:, 2] = [max(c.hp, 0) for c in units]
+        frame[:, 3] = enc.round
+        ring.publish(time.monotonic(), frame)
+
+    publish()
+    try:
+        while True:
+            actor = enc.step()
+            if actor is None:
+                break
+            a, t = index[actor.name], index.get(sink.target)
+            if t is not None:
+                field.move_toward([a], field.x[t], field.y[t], stop_at=MELEE_REACH)
+            publish()
+            time.sleep(turn_seconds)
+        publish()
+    finally:
+        ring.shm.close()
+
+
+# -----------------------------
+# Renderer
+# -----------------------------
+def _interpolate(history, when: float) -> Optional[np.ndarray]:
+    """State at ``when`` from a time-ordered list of (t, frame), clamped to its ends."""
+    if not history:
+        return None
+    if when <= history[0][0]:
+        return history[0][1]
+    for (t0, f0), (t1, f1) in zip(history, list(history)[1:]):
+        if t0 <= when <= t1:
+            a = (when - t0) / (t1 - t0) if t1 > t0 else 1.0
+            out = f0 + (f1 - f0) * a
+            out[:, 3] = f1[:, 3] if a >= 1.0 else f0[:, 3]
+            return out
+    return history[-1][1]
+
+
+def run_viewer(heroes, monsters, seed=None, turn_seconds=TURN_SECONDS, max_frames: Optional[int] = None):
+    import pygame
+    from pixel_font import blit_pix_text, pix_text_width
+
+    units = build_combatants(heroes, monsters)
+    ring = SnapshotRing(len(units))
+    sim = mp.Process(target=simulate, args=(ring.name, heroes, monsters, seed, turn_seconds), daemon=True)
+    sim.start()
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+    pygame.display.set_caption("Battle Viewer")
+    clock = pygame.time.Clock()
+    sx, sy = (SCREEN_W - 80) / FIELD_W, (SCREEN_H - 120) / FIELD_H
+
+    history = deque(maxlen=16)
+    last_seq = 0
+    frames = 0
+    running = True
+    try:
+        while running:
+            clock.tick(FPS)
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    running = False
+
+            last_seq, fresh = ring.read_since(last_seq)
+            history.extend(fresh)
+            state = _interpolate(history, time.monotonic() - INTERP_DELAY)
+
+            screen.fill(BACKGROUND)
+            if state is not None:
+                blit_pix_text(screen, f"ROUND {int(state[0, 3])}", (20, 16), color=GOLD, scale=3)
+                # the fallen first, so the living are drawn on top of them
+                for i in sorted(range(len(units)), key=lambda i: state[i, 2] > 0):
+                    c = units[i]
+                    x, y, hp = 40 + state[i, 0] * sx, 80 + state[i, 1] * sy, state[i, 2]
+                    alive = hp > 0
+                    color = (BLUE if c.side == PARTY else RED) if alive else GREY
+                    pygame.draw.rect(screen, color, (int(x) - 10, int(y) - 10, 20, 20))
+                    bar = int(40 * hp / c.max_hp)
+                    pygame.draw.rect(screen, HP_BACK, (int(x) - 20, int(y) - 20, 40, 4))
+                    pygame.draw.rect(screen, HP_FORE, (int(x) - 20, int(y) - 20, bar, 4))
+                    label = c.name if alive else f"{c.name} X"
+                    blit_pix_text(screen, label, (int(x) - pix_text_width(label, 1) // 2, int(y) + 14),
+                                  color=WHITE if alive else GREY, scale=1)
+                over = not sim.is_alive() and history and state is history[-1][1]
+                if over:
+                    party_up = any(state[i, 2] > 0 for i, c in enumerate(units) if c.side == PARTY)
+                    blit_pix_text(screen, "VICTORY!" if party_up else "DEFEAT", (SCREEN_W // 2 - 100, 20),
+                                  color=GOLD if party_up else RED, scale=5)
+            blit_pix_text(screen, f"{clock.get_fps():.0f} FPS", (SCREEN_W - 110, SCREEN_H - 24), color=GREY)
+            pygame.display.flip()
+
+            frames += 1
+            if max_frames is not None and frames >= max_frames:
+                running = False
+    finally:
+        if sim.is_alive():
+            sim.terminate()
+        sim.join()
+        ring.close()
+        pygame.quit()
+    return frames
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Watch an encounter play out live")
+    ap.add_argument('--heroes', nargs='+', default=['LaeZel', 'Shadowheart', 'Gale', 'Astarion'],
+                    choices=list(partyDict))
+    ap.add_argument('--monsters', nargs='+', default=['Goblin:4', 'Orc:2'], help="NAME:COUNT pairs from enemyDict")
+    ap.add_argument('--seed', type=int)
+    ap.add_argument('--turn-seconds', type=float, default=TURN_SECONDS)
+    ap.add_argument('--frames', type=int, help="quit after this many frames")
+    args = ap.parse_args()
+
+    monsters = []
+    for spec in args.monsters:
+        name, _, count = spec.partition(':')
+        monsters.append((name, int(count or 1)))
+    run_viewer(args.heroes, monsters, args.seed, args.turn_seconds, args.frames)
+
+
+if __name__ == '__main__':
+    main()
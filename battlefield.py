@@ -0,0 +1,264 @@
+"""
+2D battlefield
+==============
+
+Positions and movement for combatants, with a uniform-grid spatial index.
+
+Units live in NumPy columns (x, y, speed, side). Speed is in feet per turn,
+taken from a stat block's ``"Speed"`` (SC1's enemies) or a ``.speed``
+attribute (HW21's ``Stats``), or ``DEFAULT_SPEED`` (30 ft) for the Semester
+Project 1 dicts, which don't have one.
+
+The index buckets units into square cells. It is rebuilt lazily — one
+vectorized counting sort — the first time a query comes in after units have
+moved, so moving thousands of units per turn costs a couple of array
+operations rather than per-unit bookkeeping. Queries only look at the cells
+that can matter:
+
+• ``nearest(x, y, side)``     — ring search outward from the query's cell
+• ``within(x, y, r, side)``   — the cells overlapping the circle's bounding box
+• ``in_shape(shape, side)``   — ``Circle`` (fireball), ``Cone``, ``Line``
+
+    field = Battlefield(600, 600)
+    goblins = field.add_many(xs, ys, speed=30, side=ENEMY_SIDE)
+    gale = field.add(300, 300, speed_of(partyDict["Gale"]), PARTY_SIDE)
+    hit = field.in_shape(Circle(320, 310, 20), side=ENEMY_SIDE)
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from creatures import ENEMY_SIDE, PARTY_SIDE
+
+DEFAULT_SPEED = 30
+DEFAULT_CELL = 10.0
+
+
+def speed_of(stats) -> float:
+    if isinstance(stats, dict):
+        return stats.get('Speed', stats.get('speed', DEFAULT_SPEED))
+    return getattr(stats, 'speed', DEFAULT_SPEED)
+
+
+# -----------------------------
+# Area shapes
+# -----------------------------
+@dataclass(frozen=True)
+class Circle:
+    x: float
+    y: float
+    radius: float
+
+    def bbox(self):
+        r = self.radius
+        return self.x - r, self.y - r, self.x + r, self.y + r
+
+    def contains(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        return (xs - self.x) ** 2 + (ys - self.y) ** 2 <= self.radius ** 2
+
+
+@dataclass(frozen=True)
+class Cone:
+    """Cone from (x, y) pointing at ``angle`` radians, ``length`` long, ``width`` radians wide in total."""
+    x: float
+    y: float
+    angle: float
+    length: float
+    width: float = math.radians(53)   # 5e cone: as wide as it is long
+
+    def bbox(self):
+        r = self.length
+        return self.x - r, self.y - r, self.x + r, self.y + r
+
+    def contains(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        dx, dy = xs - self.x, ys - self.y
+        ux, uy = math.cos(self.angle), math.sin(self.angle)
+        along = dx * ux + dy * uy
+        dist2 = dx * dx + dy * dy
+        cos_half = math.cos(self.width / 2)
+        return (dist2 <= self.length ** 2) & (along >= 0) & (along * along >= cos_half * cos_half * dist2)
+
+
+@dataclass(frozen=True)
+class Line:
+    """Lightning-bolt style line from (x0, y0) to (x1, y1), ``width`` feet wide."""
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+    width: float = 5.0
+
+    def bbox(self):
+        h = self.width / 2
+        return min(self.x0, self.x1) - h, min(self.y0, self.y1) - h, max(self.x0, self.x1) + h, max(self.y0, self.y1) + h
+
+    def contains(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        vx, vy = self.x1 - self.x0, self.y1 - self.y0
+        length2 = vx * vx + vy * vy or 1e-12
+        t = np.clip(((xs - self.x0) * vx + (ys - self.y0) * vy) / length2, 0.0, 1.0)
+        px, py = self.x0 + t * vx - xs, self.y0 + t * vy - ys
+        return px * px + py * py <= (self.width / 2) ** 2
+
+
+# -----------------------------
+# Battlefield
+# -----------------------------
+class Battlefield:
+    def __init__(self, width: float, height: float, cell: float = DEFAULT_CELL, capacity: int = 1024):
+        self.width = width
+        self.height = height
+        self.cell = cell
+        self.cols = max(1, math.ceil(width / cell))
+        self.rows = max(1, math.ceil(height / cell))
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.side = np.zeros(capacity, dtype=np.int8)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self._size = 0
+        self._dirty = True
+        self._order = np.zeros(0, dtype=np.int64)           # unit ids sorted by cell
+        self._start = np.zeros(self.cols * self.rows + 1, dtype=np.int64)
+
+    def __len__(self):
+        return self._size
+
+    # ------------------------- units ------------------------------
+    def _grow(self, need: int):
+        if need <= len(self.x):
+            return
+        cap = max(need, 2 * len(self.x))
+        for name in ('x', 'y', 'speed', 'side', 'alive'):
+            old = getattr(self, name)
+            new = np.zeros(cap, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def add_many(self, xs, ys, speed=DEFAULT_SPEED, side: int = ENEMY_SIDE) -> np.ndarray:
+        xs = np.asarray(xs, dtype=float)
+        n = len(xs)
+        start, end = self._size, self._size + n
+        self._grow(end)
+        self.x[start:end] = np.clip(xs, 0, self.width)
+        self.y[start:end] = np.clip(np.asarray(ys, dtype=float), 0, self.height)
+        self.speed[start:end] = speed
+        self.side[start:end] = side
+        self.alive[start:end] = True
+        self._size = end
+        self._dirty = True
+        return np.arange(start, end)
+
+    def add(self, x: float, y: float, speed: float = DEFAULT_SPEED, side: int = ENEMY_SIDE) -> int:
+        return int(self.add_many([x], [y], speed, side)[0])
+
+    def remove(self, ids):
+        self.alive[ids] = False
+        self._dirty = True
+
+    def move_to(self, ids, xs, ys):
+        self.x[ids] = np.clip(xs, 0, self.width)
+        self.y[ids] = np.clip(ys, 0, self.height)
+        self._dirty = True
+
+    def move_toward(self, ids, tx, ty, stop_at: float = 0.0):
+        """Move each unit up to its speed toward (tx, ty), stopping ``stop_at`` feet short."""
+        ids = np.asarray(ids)
+        dx, dy = np.asarray(tx) - self.x[ids], np.asarray(ty) - self.y[ids]
+        dist = np.hypot(dx, dy)
+        step = np.clip(dist - stop_at, 0, self.speed[ids])
+        scale = np.divide(step, dist, out=np.zeros_like(dist), where=dist > 0)
+        self.move_to(ids, self.x[ids] + dx * scale, self.y[ids] + dy * scale)
+
+    def distance(self, a: int, b: int) -> float:
+        return math.hypot(self.x[a] - self.x[b], self.y[a] - self.y[b])
+
+    # ------------------------- index ------------------------------
+    def _cells(self, xs, ys) -> np.ndarray:
+        cx = np.minimum((xs / self.cell).astype(np.int64), self.cols - 1)
+        cy = np.minimum((ys / self.cell).astype(np.int64), self.rows - 1)
+        return cy * self.cols + cx
+
+    def _rebuild(self):
+        ids = np.flatnonzero(self.alive[:self._size])
+        cells = self._cells(self.x[ids], self.y[ids])
+        self._order = ids[np.argsort(cells, kind='stable')]
+        counts = np.bincount(cells, minlength=self.cols * self.rows)
+        self._start = np.concatenate(([0], np.cumsum(counts)))
+        self._dirty = False
+
+    def _box(self, x0: float, y0: float, x1: float, y1: float) -> np.ndarray:
+        """Ids of units in every cell overlapping the box (a superset of those inside it)."""
+        if self._dirty:
+            self._rebuild()
+        cx0 = max(0, int(x0 // self.cell))
+        cx1 = min(self.cols - 1, int(x1 // self.cell))
+        cy0 = max(0, int(y0 // self.cell))
+        cy1 = min(self.rows - 1, int(y1 // self.cell))
+        if cx0 > cx1 or cy0 > cy1:
+            return self._order[:0]
+        start = self._start
+        parts = [self._order[start[cy * self.cols + cx0]:start[cy * self.cols + cx1 + 1]] for cy in range(cy0, cy1 + 1)]
+        return np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+    def _filter_side(self, ids: np.ndarray, side: Optional[int]) -> np.ndarray:
+        return ids if side is None else ids[self.side[ids] == side]
+
+    # ------------------------- queries ----------------------------
+    def in_shape(self, shape, side: Optional[int] = None) -> np.ndarray:
+        ids = self._filter_side(self._box(*shape.bbox()), side)
+        return ids[shape.contains(self.x[ids], self.y[ids])]
+
+    def within(self, x: float, y: float, r: float, side: Optional[int] = None) -> np.ndarray:
+        return self.in_shape(Circle(x, y, r), side)
+
+    def nearest(self, x: float, y: float, side: Optional[int] = None, exclude: int = -1,
+                max_range: float = math.inf) -> Optional[int]:
+        """Closest living unit (optionally of ``side``) to (x, y), or None."""
+        if self._dirty:
+            self._rebuild()
+        cx = min(int(x // self.cell), self.cols - 1)
+        cy = min(int(y // self.cell), self.rows - 1)
+        best, best_d2 = None, math.inf
+        for k in range(max(self.cols, self.rows)):
+            if k:
+                # rings 0..k-1 are done: anything unchecked lies outside that box, at least this far away
+                c = self.cell
+                edge = min(x - (cx - k + 1) * c, (cx + k) * c - x, y - (cy - k + 1) * c, (cy + k) * c - y)
+                if edge * edge >= best_d2 or edge > max_range:
+                    break
+            ids = self._ring(cx, cy, k)
+            ids = self._filter_side(ids, side)
+            if exclude >= 0:
+                ids = ids[ids != exclude]
+            if len(ids):
+                d2 = (self.x[ids] - x) ** 2 + (self.y[ids] - y) ** 2
+                i = int(np.argmin(d2))
+                if d2[i] < best_d2:
+                    best, best_d2 = int(ids[i]), float(d2[i])
+        if best is None or best_d2 > max_range ** 2:
+            return None
+        return best
+
+    def _ring(self, cx: int, cy: int, k: int) -> np.ndarray:
+        """Ids in the cells exactly ``k`` steps (Chebyshev) from (cx, cy)."""
+        if k == 0:
+            s = self._start[cy * self.cols + cx]
+            return self._order[s:self._start[cy * self.cols + cx + 1]]
+        x0, x1 = max(0, cx - k), min(self.cols - 1, cx + k)
+        parts = []
+        for cy_ in (cy - k, cy + k):
+            if 0 <= cy_ < self.rows:
+                parts.append(self._order[self._start[cy_ * self.cols + x0]:self._start[cy_ * self.cols + x1 + 1]])
+        for cy_ in range(max(0, cy - k + 1), min(self.rows, cy + k)):
+            for cx_ in (cx - k, cx + k):
+                if 0 <= cx_ < self.cols:
+                    c = cy_ * self.cols + cx_
+                    parts.append(self._order[self._start[c]:self._start[c + 1]])
+        return np.concatenate(parts) if parts else self._order[:0]
+
+    def nearest_foe(self, unit: int) -> Optional[int]:
+        foe = ENEMY_SIDE if self.side[unit] == PARTY_SIDE else PARTY_SIDE
+        return self.nearest(self.x[unit], self.y[unit], foe)
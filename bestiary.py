@@ -0,0 +1,217 @@
+"""
+Indexed bestiary loader
+=======================
+
+Loads monster stat blocks from CSV or JSON files with thousands of entries —
+the same fields as ``enemyDict`` (HP, Init, AC, AtkMod, Damage) plus an
+optional challenge rating (CR, "1/4" style fractions allowed).
+
+The first load parses the file and writes a binary cache next to it
+(``.bestiary_cache/<name>-<key>/``): a fixed-width NumPy structured array of
+rows plus sorted index arrays for name, CR and AC. Later loads, in any
+process, open those ``.npy`` files with ``mmap_mode='r'`` — no parsing, and
+the OS shares the pages between processes. Lookups are binary searches on
+the index arrays:
+
+    beasts = Bestiary.load("monsters.csv")
+    beasts["Troll"]                 # enemyDict-style stat block
+    beasts.by_cr(1, 3)              # names with 1 <= CR <= 3
+    beasts.by_ac(15, 18)
+
+CSV header: ``name,HP,Init,AC,AtkMod,Damage[,CR]``. JSON: either a dict
+shaped like ``enemyDict`` or a list of objects with a ``name`` key.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import shutil
+from fractions import Fraction
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+CACHE_DIRNAME = '.bestiary_cache'
+CACHE_VERSION = 1
+
+_INDEX_FILES = ('rows', 'by_name', 'by_cr', 'by_ac', 'cr_keys', 'ac_keys')
+
+
+def _parse_cr(value) -> float:
+    if value in (None, ''):
+        return float('nan')
+    return float(Fraction(str(value).strip()))
+
+
+def _read_source(path: str) -> List[dict]:
+    if path.lower().endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            return [{'name': name, **stats} for name, stats in data.items()]
+        return data
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def _build_rows(entries: List[dict]) -> np.ndarray:
+    names = [str(e['name']).encode('utf-8') for e in entries]
+    damages = [str(e['Damage']).encode('utf-8') for e in entries]
+    dtype = np.dtype([
+        ('name', f"S{max(map(len, names), default=1)}"),
+        ('hp', np.int32),
+        ('init', np.int16),
+        ('ac', np.int16),
+        ('atk_mod', np.int16),
+        ('damage', f"S{max(map(len, damages), default=1)}"),
+        ('cr', np.float32),
+    ])
+    rows = np.zeros(len(entries), dtype=dtype)
+    rows['name'] = names
+    rows['damage'] = damages
+    for field, key in (('hp', 'HP'), ('init', 'Init'), ('ac', 'AC'), ('atk_mod', 'AtkMod')):
+        rows[field] = [int(e[key]) for e in entries]
+    rows['cr'] = [_parse_cr(e.get('CR')) for e in entries]
+    return rows
+
+
+def _cache_key(path: str) -> str:
+    st = os.stat(path)
+    blob = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|{CACHE_VERSION}"
+    return hashlib.sha1(blob.encode('utf-8')).hexdigest()[:16]
+
+
+class Bestiary:
+    def __init__(self, rows: np.ndarray, by_name: np.ndarray, by_cr: np.ndarray, by_ac: np.ndarray,
+                 cr_keys: np.ndarray, ac_keys: np.ndarray):
+        self.rows = rows          # structured array (memory-mapped when loaded from cache)
+        self._by_name = by_name   # row indices sorted by name
+        self._by_cr = by_cr       # row indices sorted by CR (NaN last)
+        self._by_ac = by_ac       # row indices sorted by AC
+        self._cr_keys = cr_keys   # rows['cr'][by_cr], so range queries are a binary search
+        self._ac_keys = ac_keys
+
+    # ------------------------- loading ----------------------------
+    @classmethod
+    def from_entries(cls, entries: List[dict]) -> 'Bestiary':
+        rows = _build_rows(entries)
+        by_cr = np.argsort(rows['cr'], kind='stable')
+        by_ac = np.argsort(rows['ac'], kind='stable')
+        return cls(rows, np.argsort(rows['name'], kind='stable'), by_cr, by_ac,
+                   rows['cr'][by_cr], rows['ac'][by_ac])
+
+    @classmethod
+    def load(cls, path: str, use_cache: bool = True) -> 'Bestiary':
+        """Open ``path``, from the memory-mapped cache when it is up to date."""
+        if not use_cache:
+            return cls.from_entries(_read_source(path))
+        base = os.path.basename(path)
+        cache = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIRNAME, f"{base}-{_cache_key(path)}")
+        try:
+            arrays = [np.load(os.path.join(cache, f"{n}.npy"), mmap_mode='r') for n in _INDEX_FILES]
+            return cls(*arrays)
+        except (OSError, ValueError):
+            pass
+
+        beasts = cls.from_entries(_read_source(path))
+        beasts.save(cache)
+        # drop caches of older versions of this file
+        parent = os.path.dirname(cache)
+        for entry in os.listdir(parent):
+            if entry.startswith(f"{base}-") and entry != os.path.basename(cache):
+                shutil.rmtree(os.path.join(parent, entry), ignore_errors=True)
+        return beasts
+
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        arrays = (self.rows, self._by_name, self._by_cr, self._by_ac, self._cr_keys, self._ac_keys)
+        for name, arr in zip(_INDEX_FILES, arrays):
+            final = os.path.join(directory, f"{name}.npy")
+            tmp = os.path.join(directory, f"{name}.{os.getpid()}.tmp.npy")
+            np.save(tmp, np.ascontiguousarray(arr))
+            os.replace(tmp, final)
+
+    # ------------------------- lookups ----------------------------
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, name: str) -> bool:
+        return self.index_of(name) is not None
+
+    def __getitem__(self, name: str) -> dict:
+        i = self.index_of(name)
+        if i is None:
+            raise KeyError(name)
+        return self.stats(i)
+
+    def __iter__(self) -> Iterator[str]:
+        for i in self._by_name:
+            yield self.rows['name'][i].decode('utf-8')
+
+    def index_of(self, name: str):
+        key = name.encode('utf-8')
+        names = self.rows['name']
+        lo, hi = 0, len(self._by_name)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if names[self._by_name[mid]] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self._by_name) and names[self._by_name[lo]] == key:
+            return int(self._by_name[lo])
+        return None
+
+    def stats(self, i: int) -> dict:
+        """Row ``i`` as an ``enemyDict``-style stat block."""
+        r = self.rows[i]
+        block = {
+            'HP': int(r['hp']),
+            'Init': int(r['init']),
+            'AC': int(r['ac']),
+            'AtkMod': int(r['atk_mod']),
+            'Damage': r['damage'].decode('utf-8'),
+        }
+        if not np.isnan(r['cr']):
+            block['CR'] = float(r['cr'])
+        return block
+
+    def _range(self, order: np.ndarray, values: np.ndarray, lo, hi) -> List[str]:
+        start = np.searchsorted(values, lo, side='left')
+        stop = np.searchsorted(values, hi, side='right')
+        return [n.decode('utf-8') for n in self.rows['name'][order[start:stop]]]
+
+    def by_cr(self, lo: float, hi: float) -> List[str]:
+        return self._range(self._by_cr, self._cr_keys, lo, hi)
+
+    def by_ac(self, lo: int, hi: int) -> List[str]:
+        return self._range(self._by_ac, self._ac_keys, lo, hi)
+
+    def to_dict(self, names=None) -> Dict[str, dict]:
+        """``{name: stat block}`` for feeding matchup_matrix / combat_sim."""
+        names = self if names is None else names
+        return {n: self[n] for n in names}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Load and query a bestiary file")
+    ap.add_argument('path')
+    ap.add_argument('--name')
+    ap.add_argument('--cr', nargs=2, type=float, metavar=('LO', 'HI'))
+    ap.add_argument('--ac', nargs=2, type=int, metavar=('LO', 'HI'))
+    args = ap.parse_args()
+
+    beasts = Bestiary.load(args.path)
+    print(f"{len(beasts)} monsters")
+    if args.name:
+        print(args.name, beasts[args.name])
+    if args.cr:
+        print("CR", args.cr, beasts.by_cr(*args.cr))
+    if args.ac:
+        print("AC", args.ac, beasts.by_ac(*args.ac))
+
+
+if __name__ == '__main__':
+    main()
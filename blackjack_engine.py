@@ -0,0 +1,452 @@
+"""
+Blackjack engine
+================
+
+Headless game logic behind Pixel Blackjack (``AI PLayground.py``): cards, the
+shoe, hands, and the ``Table`` state machine that the pygame front end drives.
+Nothing in here imports pygame, so tables can be run from simulations and
+servers as well as from the UI.
+"""
+
+import hashlib
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from blackjack_telemetry import Telemetry
+
+# -----------------------------
+# Rules
+# -----------------------------
+DECKS_IN_SHOE = 6
+BLACKJACK_PAYS = (3, 2)  # 3:2
+DEALER_STAND_SOFT_17 = True
+MAX_SPLIT_HANDS = 4
+
+
+@dataclass(frozen=True)
+class Rules:
+    """One table's rule set. Frozen, so it can key caches (see blackjack_strategy)."""
+    decks: int = DECKS_IN_SHOE
+    blackjack_pays: Tuple[int, int] = BLACKJACK_PAYS
+    dealer_stand_soft_17: bool = DEALER_STAND_SOFT_17
+    max_split_hands: int = MAX_SPLIT_HANDS
+    surrender: bool = True
+    insurance_pays: Tuple[int, int] = (2, 1)
+    penetration: float = 0.75  # fraction of the shoe dealt before the cut card
+
+    @property
+    def key(self) -> str:
+        """Stable hash of every rule value (blackjack_strategy keys its cache on the ones that matter)."""
+        text = repr(sorted(asdict(self).items()))
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+DEFAULT_RULES = Rules()
+
+PRESETS: Dict[str, Rules] = {
+    'classic': DEFAULT_RULES,
+    'vegas_strip': Rules(decks=4, max_split_hands=4, surrender=True),
+    'downtown': Rules(decks=2, dealer_stand_soft_17=False, surrender=False),
+    'single_deck': Rules(decks=1, dealer_stand_soft_17=False, max_split_hands=2, surrender=False, penetration=0.6),
+    'carnival_6_5': Rules(decks=6, blackjack_pays=(6, 5), dealer_stand_soft_17=False, surrender=False),
+}
+
+RANKS = ['A','2','3','4','5','6','7','8','9','10','J','Q','K']
+SUITS = ['S','H','D','C']
+CHIP_DENOMS = [1, 5, 25, 100, 500]
+
+# Actions a client can send to a table (what Game.on_click maps clicks onto)
+ACTIONS = ('chip', 'unchip', 'deal', 'hit', 'stand', 'double', 'split', 'surrender', 'insure', 'next')
+
+
+@dataclass
+class Card:
+    rank: str
+    suit: str
+
+    @property
+    def value(self):
+        if self.rank in ['J','Q','K']:
+            return 10
+        if self.rank == 'A':
+            return 11
+        return int(self.rank)
+
+
+# -----------------------------
+# Shoe / dealing logic
+# -----------------------------
+
+def build_shoe(decks=DECKS_IN_SHOE) -> List[Card]:
+    cards = [Card(r, s) for s in SUITS for r in RANKS] * decks
+    random.shuffle(cards)
+    return cards
+
+
+@dataclass
+class Hand:
+    cards: List[Card] = field(default_factory=list)
+    bet: int = 0
+    insurance: int = 0
+    surrendered: bool = False
+    doubled: bool = False
+
+    def add(self, card: Card):
+        self.cards.append(card)
+
+    def values(self) -> Tuple[int, int]:
+        total = sum(c.value for c in self.cards)
+        aces = sum(1 for c in self.cards if c.rank == 'A')
+        soft_total = total
+        while soft_total > 21 and aces:
+            soft_total -= 10
+            aces -= 1
+        hard_total = soft_total
+        return hard_total, total  # (best <=21 if possible, raw with Aces as 11)
+
+    def best_total(self) -> int:
+        hard, raw = self.values()
+        return hard
+
+    def is_blackjack(self) -> bool:
+        return len(self.cards) == 2 and self.best_total() == 21
+
+    def is_bust(self) -> bool:
+        return self.best_total() > 21
+
+    def can_split(self) -> bool:
+        return len(self.cards) == 2 and self.cards[0].rank == self.cards[1].rank
+
+    def is_soft(self) -> bool:
+        # soft if an Ace counted as 11 and total <= 21
+        total = sum(11 if c.rank == 'A' else (10 if c.rank in 'JQK' else int(c.rank)) for c in self.cards)
+        aces = sum(1 for c in self.cards if c.rank == 'A')
+        while total > 21 and aces:
+            total -= 10
+            aces -= 1
+        return any(c.rank == 'A' for c in self.cards) and total <= 21 and sum(1 for c in self.cards if c.rank == 'A') > 0 and (sum(1 for c in self.cards if c.rank == 'A') >= 1)
+
+
+@dataclass
+class Player:
+    bank: int = 1000
+    hands: List[Hand] = field(default_factory=list)
+    active_index: int = 0
+
+    def reset_round(self):
+        self.hands = []
+        self.active_index = 0
+
+    def active_hand(self) -> Hand:
+        return self.hands[self.active_index]
+
+
+# -----------------------------
+# Table state machine
+# -----------------------------
+class Table:
+    def __init__(self, telemetry: Optional[Telemetry] = None, rules: Rules = DEFAULT_RULES):
+        self.telemetry = telemetry  # None disables collection entirely
+        self._decision_started = 0.0
+        self.set_rules(rules)
+
+        self.player = Player()
+        self.dealer_hand = Hand()
+
+        self.state = 'BETTING'  # BETTING -> DEALING -> PLAYER_TURN -> DEALER_TURN -> RESOLVE
+        self.message = "Place your bet"
+        self.bets_selection: List[int] = []
+
+    def set_rules(self, rules: Rules):
+        # switching rules means a fresh shoe for the new deck count
+        self.rules = rules
+        self.shoe: List[Card] = build_shoe(rules.decks)
+        self.cut_index = int(len(self.shoe) * (1 - rules.penetration))  # reshuffle when reaching this index from end
+        self.discard: List[Card] = []
+
+    # ------------------------- dealing helpers -------------------
+    def draw_from_shoe(self) -> Card:
+        tel = self.telemetry
+        if len(self.shoe) <= self.cut_index:
+            # reshuffle
+            self.shoe = build_shoe(self.rules.decks)
+            if tel:
+                tel.reshuffles += 1
+        if tel:
+            tel.cards_drawn += 1
+        return self.shoe.pop()
+
+    def _decided(self):
+        # called on every player decision; records how long it took
+        tel = self.telemetry
+        if tel:
+            now = time.perf_counter()
+            tel.observe_decision(now - self._decision_started)
+            self._decision_started = now
+
+    # ------------------------- game phases -----------------------
+    def start_round(self):
+        bet = sum(self.bets_selection)
+        if bet <= 0 or bet > self.player.bank:
+            self.message = "Invalid bet"
+            return
+        self.player.bank -= bet
+        self.player.reset_round()
+        self.player.hands = [Hand(bet=bet)]
+        self.dealer_hand = Hand()
+
+        # initial deal
+        for _ in range(2):
+            self.player.hands[0].add(self.draw_from_shoe())
+            self.dealer_hand.add(self.draw_from_shoe())
+        self.state = 'PLAYER_TURN'
+        self.message = "Your move"
+        if self.telemetry:
+            self.telemetry.rounds_played += 1
+            self._decision_started = time.perf_counter()
+
+    def offer_insurance(self) -> bool:
+        return self.dealer_hand.cards and self.dealer_hand.cards[0].rank == 'A'
+
+    def current_actions(self):
+        h = self.player.active_hand()
+        can_split = h.can_split() and len(self.player.hands) < self.rules.max_split_hands and self.player.bank >= h.bet
+        can_double = (len(h.cards) == 2) and (self.player.bank >= h.bet)
+        can_surrender = self.rules.surrender and (len(h.cards) == 2) and not h.doubled and not h.surrendered
+        can_insure = self.offer_insurance() and h.insurance == 0 and self.player.bank >= h.bet//2
+        return dict(split=can_split, double=can_double, surrender=can_surrender, insure=can_insure)
+
+    def settle(self):
+        # Check dealer blackjack if showing Ace or 10 and insurance placed
+        dealer_blackjack = self.dealer_hand.is_blackjack()
+        bj_num, bj_den = self.rules.blackjack_pays
+        ins_num, ins_den = self.rules.insurance_pays
+
+        for idx, h in enumerate(self.player.hands):
+            result = None
+
+            if h.surrendered:
+                # Half bet returned (player already took half loss when marking surrendered)
+                result = ("Surrender", -h.bet//2)
+            elif h.is_bust():
+                result = ("Bust", -h.bet)
+            elif dealer_blackjack and not h.is_blackjack():
+                # dealer blackjack beats all except player's blackjack (which pushes)
+                loss = -h.bet
+                ins = 0
+                if h.insurance:
+                    # insurance pays 2:1 by default
+                    ins = h.insurance * ins_num // ins_den
+                result = ("Dealer blackjack", loss + ins)
+            else:
+                # normal compare; ensure dealer plays out if needed
+                if not dealer_blackjack:
+                    self.dealer_playout()
+                dealer_total = self.dealer_hand.best_total()
+                player_total = h.best_total()
+
+                if h.is_blackjack() and not self.dealer_hand.is_blackjack():
+                    win = h.bet * bj_num // bj_den
+                    result = ("Blackjack!", win)
+                elif self.dealer_hand.is_bust():
+                    result = ("Dealer busts", h.bet)
+                elif player_total > dealer_total:
+                    result = ("Win", h.bet)
+                elif player_total < dealer_total:
+                    result = ("Lose", -h.bet)
+                else:
+                    result = ("Push", 0)
+
+                if h.insurance and self.dealer_hand.is_blackjack():
+                    # this path only occurs if dealer_blackjack True; already handled above, but keep safe
+                    result = (result[0], result[1] + h.insurance * ins_num // ins_den)
+
+            self.player.bank += h.bet + result[1]  # return original bet plus net
+            if self.telemetry:
+                self.telemetry.house_net -= result[1]
+
+        self.state = 'RESOLVE'
+        if self.dealer_hand.is_blackjack():
+            self.message = "Dealer has Blackjack"
+        elif self.dealer_hand.is_bust():
+            self.message = "Dealer busts"
+        else:
+            self.message = "Round settled"
+
+    def dealer_playout(self):
+        # Reveal and play out to 17 (stand on soft 17 if configured)
+        while True:
+            total = self.dealer_hand.best_total()
+            soft = self.is_soft_hand(self.dealer_hand)
+            if total < 17:
+                self.dealer_hand.add(self.draw_from_shoe())
+            elif total == 17 and soft and not self.rules.dealer_stand_soft_17:
+                self.dealer_hand.add(self.draw_from_shoe())
+            else:
+                break
+
+    @staticmethod
+    def is_soft_hand(hand: Hand) -> bool:
+        # same as Hand.is_soft but simpler, for dealer
+        total = sum(11 if c.rank == 'A' else (10 if c.rank in 'JQK' else int(c.rank)) for c in hand.cards)
+        aces = sum(1 for c in hand.cards if c.rank == 'A')
+        while total > 21 and aces:
+            total -= 10
+            aces -= 1
+        # soft if any ace still counted as 11
+        return any(c.rank == 'A' for c in hand.cards) and total <= 21 and aces > 0
+
+    # ------------------------- actions ---------------------------
+    # Each returns True if the action was accepted in the current state.
+    def add_chip(self, val: int) -> bool:
+        if self.state != 'BETTING' or val not in CHIP_DENOMS:
+            return False
+        if self.player.bank >= val:
+            self.bets_selection.append(val)
+            self.message = f"Bet: ${sum(self.bets_selection)}"
+        return True
+
+    def remove_chip(self) -> bool:
+        if self.state != 'BETTING' or not self.bets_selection:
+            return False
+        self.player.bank += self.bets_selection.pop()
+        self.message = f"Bet: ${sum(self.bets_selection)}"
+        return True
+
+    def deal(self) -> bool:
+        if self.state != 'BETTING':
+            return False
+        self.start_round()
+        return True
+
+    def hit(self) -> bool:
+        if self.state != 'PLAYER_TURN':
+            return False
+        self._decided()
+        h = self.player.active_hand()
+        h.add(self.draw_from_shoe())
+        if h.is_bust():
+            self.advance_hand_or_dealer()
+        return True
+
+    def stand(self) -> bool:
+        if self.state != 'PLAYER_TURN':
+            return False
+        self._decided()
+        self.advance_hand_or_dealer()
+        return True
+
+    def double(self) -> bool:
+        if self.state != 'PLAYER_TURN' or not self.current_actions()['double']:
+            return False
+        self._decided()
+        h = self.player.active_hand()
+        self.player.bank -= h.bet
+        h.bet *= 2
+        h.doubled = True
+        h.add(self.draw_from_shoe())
+        if self.telemetry:
+            self.telemetry.doubles += 1
+        self.advance_hand_or_dealer()
+        return True
+
+    def split(self) -> bool:
+        if self.state != 'PLAYER_TURN' or not self.current_actions()['split']:
+            return False
+        self._decided()
+        h = self.player.active_hand()
+        # split into two hands
+        self.player.bank -= h.bet
+        c2 = h.cards.pop()
+        new_hand = Hand(cards=[c2], bet=h.bet)
+        # draw one new card to each split hand
+        h.add(self.draw_from_shoe())
+        new_hand.add(self.draw_from_shoe())
+        self.player.hands.insert(self.player.active_index+1, new_hand)
+        if self.telemetry:
+            self.telemetry.splits += 1
+        return True
+
+    def surrender(self) -> bool:
+        if self.state != 'PLAYER_TURN' or not self.current_actions()['surrender']:
+            return False
+        self._decided()
+        self.player.active_hand().surrendered = True
+        if self.telemetry:
+            self.telemetry.surrenders += 1
+        # immediately settle this hand as half loss
+        self.advance_hand_or_dealer()
+        return True
+
+    def insure(self) -> bool:
+        if self.state != 'PLAYER_TURN' or not self.current_actions()['insure']:
+            return False
+        self._decided()
+        h = self.player.active_hand()
+        amt = min(h.bet//2, self.player.bank)
+        self.player.bank -= amt
+        h.insurance = amt
+        self.message = f"Insurance placed: ${amt}"
+        if self.telemetry:
+            self.telemetry.insurance_taken += 1
+        return True
+
+    def next_round(self) -> bool:
+        if self.state != 'RESOLVE':
+            return False
+        self.message = "Place your bet"
+        self.state = 'BETTING'
+        self.bets_selection = []
+        self.player.reset_round()
+        self.dealer_hand = Hand()
+        return True
+
+    def snapshot(self) -> dict:
+        """Compact, JSON-friendly view of what a player at this table can see."""
+        hide_hole = self.state == 'PLAYER_TURN' and not self.dealer_hand.is_blackjack()
+        dealer = [c.rank + c.suit for c in self.dealer_hand.cards]
+        if hide_hole and dealer:
+            dealer[0] = '??'
+        return {
+            'state': self.state,
+            'msg': self.message,
+            'bank': self.player.bank,
+            'bets': list(self.bets_selection),
+            'dealer': dealer,
+            'hands': [[[c.rank + c.suit for c in h.cards], h.bet, h.insurance, h.doubled, h.surrendered]
+                      for h in self.player.hands],
+            'active': self.player.active_index,
+        }
+
+    def act(self, action: str, arg: Optional[int] = None) -> bool:
+        """Apply one of ``ACTIONS`` by name ('chip' takes the chip value as ``arg``)."""
+        if action == 'chip':
+            return self.add_chip(arg)
+        handler = {
+            'unchip': self.remove_chip,
+            'deal': self.deal,
+            'hit': self.hit,
+            'stand': self.stand,
+            'double': self.double,
+            'split': self.split,
+            'surrender': self.surrender,
+            'insure': self.insure,
+            'next': self.next_round,
+        }.get(action)
+        return handler() if handler else False
+
+    def advance_hand_or_dealer(self):
+        # move to next hand or dealer turn/settle
+        h = self.player.active_hand()
+        if h.is_bust():
+            self.message = "Bust!"
+        if self.player.active_index < len(self.player.hands) - 1:
+            self.player.active_index += 1
+            self.message = "Next hand"
+        else:
+            # dealer turn & settle
+            self.state = 'DEALER_TURN'
+            self.dealer_playout()
+            self.settle()
@@ -0,0 +1,115 @@
+"""
+Load test for blackjack_server
+==============================
+
+Opens a number of connections, each driving several tables with a simple
+hit-below-15 strategy, and reports actions per second and action latency
+percentiles (one request in flight per table, so latency is round-trip).
+
+Run:    python blackjack_loadtest.py --connections 50 --tables 20 --seconds 10
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import List, Optional
+
+CARD_VALUES = {'A': 11, 'J': 10, 'Q': 10, 'K': 10}
+
+
+def hand_total(cards: List[str]) -> int:
+    total = aces = 0
+    for c in cards:
+        rank = c[:-1]
+        total += CARD_VALUES.get(rank) or int(rank)
+        aces += rank == 'A'
+    while total > 21 and aces:
+        total -= 10
+        aces -= 1
+    return total
+
+
+def next_action(state: dict):
+    phase = state.get('state')
+    if phase == 'BETTING':
+        return ('deal', None) if state.get('bets') else ('chip', 5)
+    if phase == 'PLAYER_TURN':
+        hand = state['hands'][state['active']][0]
+        return ('hit', None) if hand_total(hand) < 15 else ('stand', None)
+    return ('next', None)
+
+
+async def drive_connection(cid: int, tables: int, deadline: float, latencies: List[float],
+                           host: str, port: int, unix: Optional[str]):
+    if unix:
+        reader, writer = await asyncio.open_unix_connection(unix)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    states = {}
+    sent_at = {}
+
+    def send(tid, action, arg=None):
+        msg = {'t': tid, 'a': action}
+        if arg is not None:
+            msg['v'] = arg
+        sent_at[tid] = time.perf_counter()
+        writer.write(json.dumps(msg, separators=(',', ':')).encode() + b'\n')
+
+    for i in range(tables):
+        tid = f"{cid}-{i}"
+        states[tid] = {}
+        send(tid, 'join')
+    await writer.drain()
+
+    pending = tables
+    while pending:
+        line = await reader.readline()
+        if not line:
+            break
+        reply = json.loads(line)
+        tid = reply['t']
+        latencies.append(time.perf_counter() - sent_at[tid])
+        states[tid].update(reply.get('d', {}))
+        if time.perf_counter() >= deadline:
+            pending -= 1
+            continue
+        send(tid, *next_action(states[tid]))
+        await writer.drain()
+    writer.close()
+
+
+def percentile(sorted_vals: List[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))]
+
+
+async def run(args):
+    latencies: List[float] = []
+    start = time.perf_counter()
+    deadline = start + args.seconds
+    await asyncio.gather(*(drive_connection(c, args.tables, deadline, latencies, args.host, args.port, args.unix)
+                           for c in range(args.connections)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"tables:       {args.connections * args.tables}")
+    print(f"actions:      {len(latencies)}")
+    print(f"actions/sec:  {len(latencies) / elapsed:,.0f}")
+    print(f"p50 latency:  {percentile(latencies, 0.50) * 1000:.2f} ms")
+    print(f"p99 latency:  {percentile(latencies, 0.99) * 1000:.2f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Load test a local blackjack_server instance")
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8765)
+    ap.add_argument('--unix', help="connect to a unix socket path instead of TCP")
+    ap.add_argument('--connections', type=int, default=50)
+    ap.add_argument('--tables', type=int, default=20, help="tables per connection")
+    ap.add_argument('--seconds', type=float, default=10.0)
+    asyncio.run(run(ap.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
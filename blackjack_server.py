@@ -0,0 +1,185 @@
+"""
+Blackjack table server
+======================
+
+Hosts many blackjack tables from one asyncio process. Clients speak
+newline-delimited JSON over TCP or a unix socket; every request names a table
+and one of the actions ``Game.on_click`` handles (see ``blackjack_engine.ACTIONS``):
+
+    -> {"t": "42", "a": "chip", "v": 25}
+    -> {"t": "42", "a": "deal"}
+    <- {"t": "42", "ok": true, "d": {"state": "PLAYER_TURN", "dealer": [...], ...}}
+
+``"a": "join"`` creates the table if needed and returns the full state; every
+later reply carries ``d``, only the keys that changed since the previous
+broadcast. Other connections joined to the same table get the same diffs.
+
+Backpressure: each connection has a bounded outbound queue. Replies to the
+acting client are awaited, so a client that stops reading stops being read
+from. Broadcasts to a slow watcher are dropped rather than stalling the
+table, and the watcher gets a full-state resync once it catches up.
+
+Run:    python blackjack_server.py --port 8765      (or --unix /tmp/bj.sock)
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Dict, Optional, Set
+
+from blackjack_engine import Table
+from blackjack_telemetry import Telemetry
+
+OUTBOUND_QUEUE = 64       # messages buffered per connection before backpressure kicks in
+MAX_LINE = 4096           # longest request line accepted
+
+
+def diff_state(old: dict, new: dict) -> dict:
+    return {k: v for k, v in new.items() if old.get(k) != v}
+
+
+def _dumps(msg: dict) -> bytes:
+    return json.dumps(msg, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+class TableSession:
+    __slots__ = ('table', 'last', 'watchers')
+
+    def __init__(self, table: Table):
+        self.table = table
+        self.last = table.snapshot()
+        self.watchers: Set['Connection'] = set()
+
+
+class Connection:
+    def __init__(self, server: 'BlackjackServer', reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.outbox: asyncio.Queue = asyncio.Queue(OUTBOUND_QUEUE)
+        self.stale: Set[str] = set()  # tables whose broadcast diffs were dropped
+        self.tables: Set[str] = set()
+
+    async def run(self):
+        sender = asyncio.create_task(self._send_loop())
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                await self.outbox.put(self.server.handle(self, line))
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            for tid in self.tables:
+                session = self.server.tables.get(tid)
+                if session:
+                    session.watchers.discard(self)
+                    if not session.watchers:
+                        del self.server.tables[tid]
+            if not sender.done():
+                await self.outbox.put(None)
+                await sender
+            self.writer.close()
+
+    def push(self, tid: str, msg: bytes):
+        """Queue a broadcast without waiting; mark the table stale if we are backed up."""
+        if tid in self.stale:
+            return
+        try:
+            self.outbox.put_nowait(msg)
+        except asyncio.QueueFull:
+            self.stale.add(tid)
+
+    async def _send_loop(self):
+        try:
+            while True:
+                msg = await self.outbox.get()
+                if msg is None:
+                    break
+                self.writer.write(msg)
+                if self.outbox.empty():
+                    while self.stale:
+                        tid = self.stale.pop()
+                        session = self.server.tables.get(tid)
+                        if session:
+                            self.writer.write(_dumps({'t': tid, 'ok': True, 'd': session.last, 'full': True}))
+                await self.writer.drain()
+        except ConnectionError:
+            pass
+
+
+class BlackjackServer:
+    def __init__(self, telemetry: Optional[Telemetry] = None):
+        self.telemetry = telemetry  # shared by every table
+        self.tables: Dict[str, TableSession] = {}
+
+    def handle(self, conn: Connection, line: bytes) -> bytes:
+        try:
+            req = json.loads(line)
+            tid = str(req['t'])
+            action = req['a']
+        except (ValueError, KeyError, TypeError):
+            return _dumps({'ok': False, 'err': 'bad request'})
+        if not isinstance(action, str):
+            return _dumps({'t': tid, 'ok': False, 'err': 'bad request'})
+
+        session = self.tables.get(tid)
+        if action == 'join':
+            if session is None:
+                session = self.tables[tid] = TableSession(Table(telemetry=self.telemetry))
+            session.watchers.add(conn)
+            conn.tables.add(tid)
+            return _dumps({'t': tid, 'ok': True, 'd': session.last, 'full': True})
+        if session is None:
+            return _dumps({'t': tid, 'ok': False, 'err': 'unknown table'})
+        if action == 'leave':
+            session.watchers.discard(conn)
+            conn.tables.discard(tid)
+            if not session.watchers:
+                del self.tables[tid]
+            return _dumps({'t': tid, 'ok': True})
+
+        ok = session.table.act(action, req.get('v'))
+        snap = session.table.snapshot()
+        diff = diff_state(session.last, snap)
+        session.last = snap
+        reply = _dumps({'t': tid, 'ok': ok, 'd': diff})
+        if diff:
+            for other in session.watchers:
+                if other is not conn:
+                    other.push(tid, reply)
+        return reply
+
+    async def _on_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        await Connection(self, reader, writer).run()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8765, unix: Optional[str] = None):
+        if unix:
+            server = await asyncio.start_unix_server(self._on_client, path=unix, limit=MAX_LINE)
+        else:
+            server = await asyncio.start_server(self._on_client, host, port, limit=MAX_LINE)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve many blackjack tables over a local socket")
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8765)
+    ap.add_argument('--unix', help="listen on a unix socket path instead of TCP")
+    ap.add_argument('--metrics-port', type=int, help="serve Prometheus /metrics on this port")
+    args = ap.parse_args()
+
+    telemetry = None
+    if args.metrics_port:
+        telemetry = Telemetry()
+        telemetry.serve_http(args.metrics_port)
+    try:
+        asyncio.run(BlackjackServer(telemetry).serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
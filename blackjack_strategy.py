@@ -0,0 +1,276 @@
+"""
+Blackjack basic strategy and house edge per rule set
+=====================================================
+
+Computes, for a ``blackjack_engine.Rules``, the best action for every starting
+hand against every dealer upcard and the resulting house edge, matching how
+``blackjack_engine.Table`` actually plays:
+
+• the dealer does not peek, so doubles and splits lose in full to a dealer
+  blackjack, and surrender (when offered) always returns half the bet — in
+  effect early surrender, worth about +0.6% to the player
+• a two-card 21 after a split counts as blackjack
+• pairs can be resplit until the player holds ``max_split_hands`` hands
+• insurance is only worth taking when ``insurance_pays`` beats the 10 odds
+
+Those first two rules are generous enough that the stand-on-soft-17 presets
+come out slightly in the player's favour (a negative house edge).
+
+The shoe is finite: every initial deal (two player cards and the upcard) is
+analysed with exactly those three cards removed from a fresh ``decks``-deck
+shoe, the dealer draws without replacement, and the player's draws use the
+remaining composition. This is what separates a single-deck table from a
+six-deck one. Penetration doesn't change strategy off the top of the shoe,
+so it is left out of the cache key. Results are cached in memory and on
+disk by the rules that matter, so switching tables in the UI or sweeping
+presets in a simulation only pays for a rule set once.
+
+Run:    python blackjack_strategy.py            (prints every preset)
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from blackjack_engine import PRESETS, Rules
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.blackjack_cache')
+
+# Card values 2..11 (11 = Ace); a shoe composition is a tuple of counts in this order
+VALUES = tuple(range(2, 12))
+LABELS = {11: 'A'}
+
+# the Rules fields that change strategy or edge (penetration doesn't)
+ANALYSIS_FIELDS = ('decks', 'blackjack_pays', 'dealer_stand_soft_17', 'max_split_hands', 'surrender', 'insurance_pays')
+
+BUST, DEALER_BJ = 22, 0  # keys in the dealer outcome distribution
+
+
+@dataclass
+class RuleAnalysis:
+    rules_key: str
+    house_edge: float                      # fraction of the initial bet the house keeps
+    take_insurance: bool
+    hard: Dict[str, Dict[str, str]]        # hard total -> upcard -> action
+    soft: Dict[str, Dict[str, str]]        # soft total -> upcard -> action
+    pairs: Dict[str, Dict[str, str]]       # pair card -> upcard -> action
+
+    # Action letters: H hit, S stand, D double, P split, R surrender
+
+
+def _add(total: int, soft: bool, card: int) -> Tuple[int, bool]:
+    total += card
+    if card == 11:
+        soft_aces = 1 + soft
+    else:
+        soft_aces = int(soft)
+    while total > 21 and soft_aces:
+        total -= 10
+        soft_aces -= 1
+    return total, soft_aces > 0
+
+
+def analysis_key(rules: Rules) -> str:
+    """Stable hash of the rule values that affect the analysis, used as the cache key."""
+    text = repr([(f, getattr(rules, f)) for f in ANALYSIS_FIELDS])
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def shoe_counts(decks: int) -> Tuple[int, ...]:
+    return tuple(decks * (16 if v == 10 else 4) for v in VALUES)
+
+
+def _remove(counts: Tuple[int, ...], *cards: int) -> Tuple[int, ...]:
+    out = list(counts)
+    for card in cards:
+        out[card - 2] -= 1
+    return tuple(out)
+
+
+def _probs(counts: Tuple[int, ...]) -> Dict[int, float]:
+    n = sum(counts)
+    return {v: k / n for v, k in zip(VALUES, counts) if k}
+
+
+@lru_cache(maxsize=None)
+def _dealer_from(total: int, soft: bool, counts: Tuple[int, ...], stand_soft_17: bool) -> Dict[int, float]:
+    """Dealer's final-total distribution drawing without replacement from ``counts``."""
+    if total > 21:
+        return {BUST: 1.0}
+    if total > 17 or (total == 17 and (not soft or stand_soft_17)):
+        return {total: 1.0}
+    out: Dict[int, float] = {}
+    for card, p in _probs(counts).items():
+        for final, q in _dealer_from(*_add(total, soft, card), _remove(counts, card), stand_soft_17).items():
+            out[final] = out.get(final, 0.0) + p * q
+    return out
+
+
+class _Solver:
+    """EVs for one initial deal; ``counts`` is the shoe with both player cards and the upcard removed."""
+
+    def __init__(self, rules: Rules, counts: Tuple[int, ...], up: int):
+        self.rules = rules
+        self.up = up
+        self.bj_pays = rules.blackjack_pays[0] / rules.blackjack_pays[1]
+        self.probs = _probs(counts)
+        self.dealer: Dict[int, float] = {}
+        for hole, p in self.probs.items():
+            total, soft = _add(up, up == 11, hole)
+            if total == 21:
+                self.dealer[DEALER_BJ] = self.dealer.get(DEALER_BJ, 0.0) + p
+                continue
+            for final, q in _dealer_from(total, soft, _remove(counts, hole), rules.dealer_stand_soft_17).items():
+                self.dealer[final] = self.dealer.get(final, 0.0) + p * q
+        # per-deal memos (an lru_cache on the methods would keep every solver alive)
+        self.stand = lru_cache(maxsize=None)(self._stand)
+        self.hit = lru_cache(maxsize=None)(self._hit)
+
+    def _stand(self, total: int) -> float:
+        if total > 21:
+            return -1.0
+        ev = 0.0
+        for final, p in self.dealer.items():
+            if final == DEALER_BJ or (final != BUST and final > total):
+                ev -= p
+            elif final == BUST or final < total:
+                ev += p
+        return ev
+
+    def _hit(self, total: int, soft: bool) -> float:
+        ev = 0.0
+        for card, p in self.probs.items():
+            t, s = _add(total, soft, card)
+            ev += p * (-1.0 if t > 21 else max(self.stand(t), self.hit(t, s)))
+        return ev
+
+    def double(self, total: int, soft: bool) -> float:
+        return 2 * sum(p * self.stand(_add(total, soft, card)[0]) for card, p in self.probs.items())
+
+    def natural(self) -> float:
+        return self.bj_pays * (1 - self.dealer.get(DEALER_BJ, 0.0))
+
+    def two_card(self, total: int, soft: bool) -> Dict[str, float]:
+        """EV of each option on a fresh two-card (non-pair) hand."""
+        if total == 21:
+            return {'S': self.natural()}
+        evs = {
+            'S': self.stand(total),
+            'H': self.hit(total, soft),
+            'D': self.double(total, soft),
+        }
+        if self.rules.surrender:
+            evs['R'] = -0.5
+        return evs
+
+    def split(self, card: int) -> float:
+        """EV of splitting a pair of ``card``, resplitting while fewer than ``max_split_hands`` are out."""
+        q = self.probs.get(card, 0.0)
+        others = 1 - q
+        # a split hand that drew anything else, and one that drew another ``card`` but can't resplit
+        other = sum(p * max(self.two_card(*_add(card, card == 11, c)).values())
+                    for c, p in self.probs.items() if c != card) / others if others else 0.0
+        same = max(self.two_card(*_add(card, card == 11, card)).values())
+        limit = self.rules.max_split_hands
+
+        @lru_cache(maxsize=None)
+        def hands(out: int, waiting: int) -> float:
+            """EV of ``waiting`` hands still due their second card, with ``out`` hands on the table."""
+            if not waiting:
+                return 0.0
+            keep = same + hands(out, waiting - 1)
+            if out < limit:
+                keep = max(keep, hands(out + 1, waiting + 1))
+            return q * keep + others * (other + hands(out, waiting - 1))
+
+        return hands(2, 2)
+
+    def pair(self, card: int) -> Dict[str, float]:
+        evs = self.two_card(*_add(card, card == 11, card))
+        if self.rules.max_split_hands > 1:
+            evs['P'] = self.split(card)
+        return evs
+
+
+def _best(evs: Dict[str, float]) -> Tuple[str, float]:
+    action = max(evs, key=evs.get)
+    return action, evs[action]
+
+
+def _label(v: int) -> str:
+    return LABELS.get(v, str(v))
+
+
+def _compute(rules: Rules) -> RuleAnalysis:
+    shoe = shoe_counts(rules.decks)
+    # each table cell's action is the best for the probability-weighted EVs of the deals that reach it
+    cells: Dict[Tuple[str, str, str], Dict[str, float]] = {}
+
+    player_ev = 0.0
+    for c1, p1 in _probs(shoe).items():
+        after1 = _remove(shoe, c1)
+        for c2, p2 in _probs(after1).items():
+            after2 = _remove(after1, c2)
+            total, is_soft = _add(c1, c1 == 11, c2)
+            for up, pu in _probs(after2).items():
+                solver = _Solver(rules, _remove(after2, up), up)
+                evs = solver.pair(c1) if c1 == c2 else solver.two_card(total, is_soft)
+                w = p1 * p2 * pu
+                player_ev += w * max(evs.values())
+                if c1 == c2:
+                    cell = ('pairs', _label(c1), _label(up))
+                elif total != 21:
+                    cell = ('soft' if is_soft else 'hard', str(total), _label(up))
+                else:
+                    continue
+                acc = cells.setdefault(cell, {})
+                for action, ev in evs.items():
+                    acc[action] = acc.get(action, 0.0) + w * ev
+    _dealer_from.cache_clear()
+
+    tables: Dict[str, Dict[str, Dict[str, str]]] = {'hard': {}, 'soft': {}, 'pairs': {}}
+    for (kind, row, up), evs in cells.items():
+        tables[kind].setdefault(row, {})[up] = _best(evs)[0]
+
+    num, den = rules.insurance_pays
+    p_ten = _probs(_remove(shoe, 11))[10]
+    take_insurance = p_ten * num / den - (1 - p_ten) > 0
+    return RuleAnalysis(analysis_key(rules), -player_ev, take_insurance,
+                        tables['hard'], tables['soft'], tables['pairs'])
+
+
+def analyze(rules: Rules) -> RuleAnalysis:
+    """Strategy table and house edge for ``rules``, from the disk cache when possible."""
+    return _analyze(analysis_key(rules), rules)
+
+
+@lru_cache(maxsize=None)
+def _analyze(key: str, rules: Rules) -> RuleAnalysis:
+    path = os.path.join(CACHE_DIR, f"{key}.json")
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return RuleAnalysis(**data['analysis'])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    result = _compute(rules)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'rules': asdict(rules), 'analysis': asdict(result)}, f)
+    os.replace(tmp, path)
+    return result
+
+
+def sweep(presets: Dict[str, Rules] = PRESETS) -> Dict[str, float]:
+    """House edge for every preset, reusing cached results."""
+    return {name: analyze(rules).house_edge for name, rules in presets.items()}
+
+
+if __name__ == '__main__':
+    for name, edge in sweep().items():
+        print(f"{name:14s} house edge {edge * 100:6.3f}%   ({analysis_key(PRESETS[name])})")
@@ -0,0 +1,112 @@
+"""
+Blackjack engine telemetry
+==========================
+
+Lightweight counters and gauges for the blackjack engine, exported in the
+Prometheus text exposition format (either as a textfile for node_exporter's
+textfile collector or from a tiny local HTTP endpoint).
+
+Collection is just attribute increments on a ``__slots__`` object; the engine
+holds ``telemetry = None`` when disabled, so a disabled engine pays a single
+truthiness check per hook and nothing else.
+"""
+
+import os
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+# Decision latency histogram buckets, in seconds
+LATENCY_BUCKETS: Tuple[float, ...] = (0.0001, 0.001, 0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_COUNTERS = (
+    ('rounds_played', 'Rounds dealt'),
+    ('cards_drawn', 'Cards drawn from the shoe'),
+    ('reshuffles', 'Shoe reshuffles triggered by the cut card'),
+    ('splits', 'Hands split'),
+    ('doubles', 'Hands doubled'),
+    ('surrenders', 'Hands surrendered'),
+    ('insurance_taken', 'Insurance bets placed'),
+)
+
+
+class Telemetry:
+    __slots__ = tuple(name for name, _ in _COUNTERS) + (
+        'house_net', 'latency_counts', 'latency_sum', 'latency_count', 'prefix',
+    )
+
+    def __init__(self, prefix: str = 'blackjack'):
+        self.prefix = prefix
+        self.reset()
+
+    def reset(self):
+        for name, _ in _COUNTERS:
+            setattr(self, name, 0)
+        self.house_net = 0  # gauge: chips won by the house, net of payouts
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)  # last slot is +Inf
+        self.latency_sum = 0.0
+        self.latency_count = 0
+
+    def observe_decision(self, seconds: float):
+        self.latency_counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.latency_sum += seconds
+        self.latency_count += 1
+
+    # ------------------------- export ----------------------------
+    def render(self) -> str:
+        """Return all metrics in Prometheus text exposition format."""
+        p = self.prefix
+        lines = []
+        for name, help_text in _COUNTERS:
+            metric = f"{p}_{name}_total"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {getattr(self, name)}")
+
+        lines.append(f"# HELP {p}_house_net_win Net chips won by the house")
+        lines.append(f"# TYPE {p}_house_net_win gauge")
+        lines.append(f"{p}_house_net_win {self.house_net}")
+
+        metric = f"{p}_decision_latency_seconds"
+        lines.append(f"# HELP {metric} Time the player took to choose an action")
+        lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.latency_counts):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{le="+Inf"}} {self.latency_count}')
+        lines.append(f"{metric}_sum {self.latency_sum:.6f}")
+        lines.append(f"{metric}_count {self.latency_count}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        """Atomically write the metrics so a scraper never sees a half file."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+    def serve_http(self, port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """Serve ``/metrics`` from a daemon thread; returns the server so it can be shut down."""
+        telemetry = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip('/') not in ('', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = telemetry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), _Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
@@ -0,0 +1,186 @@
+"""
+Adventuring-day campaign simulator
+==================================
+
+Runs the party through a sequence of ``enemyDict`` encounters with hit
+points carried over between fights. Rests between encounters recover HP:
+
+• ``'short'`` — every living hero heals ``SHORT_REST_HEAL`` (rolled), up to max
+• ``'long'``  — every living hero back to full
+
+Fallen heroes stay down for the rest of the day; the campaign ends when the
+whole party has fallen or the day is over.
+
+Many independent campaigns run in chunks across a process pool. Each run is
+streamed to a CSV as soon as its chunk comes back, and the parent keeps only
+running totals, so memory doesn't grow with the number of runs. The totals
+give
+
+• the survival curve — P(party still standing after encounter k)
+• per-hero attrition — mean HP left and chance of having fallen after each encounter
+
+Run:    python campaign.py --runs 5000 --out campaign_runs.csv
+"""
+
+import argparse
+import csv
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Union
+
+from dice import as_dice
+from encounter import ENEMIES, PARTY, Combatant, Encounter
+from roster import enemyDict, partyDict
+
+SHORT_REST_HEAL = "2d8+2"
+
+Step = Union[Dict[str, int], str]   # {monster: count} or 'short' / 'long'
+
+DEFAULT_DAY: List[Step] = [
+    {"Goblin": 4},
+    {"Orc": 2, "Goblin": 2},
+    'short',
+    {"Troll": 1},
+    {"Orc": 3},
+    'short',
+    {"Mindflayer": 1, "Goblin": 2},
+]
+
+
+def encounters_in(day: Sequence[Step]) -> int:
+    return sum(1 for s in day if isinstance(s, dict))
+
+
+def run_campaign(heroes: Sequence[str], day: Sequence[Step], rng: random.Random) -> List[List[int]]:
+    """One adventuring day; returns each hero's HP (0 once fallen) after every encounter."""
+    party = [Combatant.from_stats(h, partyDict[h], PARTY) for h in heroes]
+    short_rest = as_dice(SHORT_REST_HEAL)
+    after: List[List[int]] = []
+    for step in day:
+        standing = [c for c in party if c.alive]
+        if step == 'short':
+            for c in standing:
+                c.hp = min(c.max_hp, c.hp + short_rest.roll(rng))
+            continue
+        if step == 'long':
+            for c in standing:
+                c.hp = c.max_hp
+            continue
+        if standing:
+            monsters = [Combatant.from_stats(f"{name} {i + 1}", enemyDict[name], ENEMIES)
+                        for name, count in step.items() for i in range(count)]
+            Encounter(standing + monsters, rng=rng).run()
+        after.append([max(c.hp, 0) for c in party])
+    return after
+
+
+def _run_chunk(heroes: Sequence[str], day: Sequence[Step], seed: int, start: int, runs: int):
+    """Worker: ``runs`` campaigns seeded from (seed, run number); returns (run, hp rows) pairs."""
+    out = []
+    for run in range(start, start + runs):
+        out.append((run, run_campaign(heroes, day, random.Random(f"{seed}:{run}"))))
+    return out
+
+
+@dataclass
+class CampaignStats:
+    heroes: List[str]
+    encounters: int
+    runs: int = 0
+    standing: List[int] = field(default_factory=list)        # [k] runs with someone still up after encounter k
+    hp_sum: List[List[int]] = field(default_factory=list)    # [k][h] total HP left
+    fallen: List[List[int]] = field(default_factory=list)    # [k][h] runs where hero h is down
+
+    def __post_init__(self):
+        n, h = self.encounters, len(self.heroes)
+        self.standing = self.standing or [0] * n
+        self.hp_sum = self.hp_sum or [[0] * h for _ in range(n)]
+        self.fallen = self.fallen or [[0] * h for _ in range(n)]
+
+    def add(self, after: List[List[int]]):
+        self.runs += 1
+        for k, hps in enumerate(after):
+            self.standing[k] += any(hps)
+            for h, hp in enumerate(hps):
+                self.hp_sum[k][h] += hp
+                self.fallen[k][h] += hp == 0
+
+    def survival(self) -> List[float]:
+        """P(party still standing) before the first fight and after each encounter."""
+        return [1.0] + [s / self.runs for s in self.standing]
+
+    def attrition(self) -> Dict[str, Dict[str, List[float]]]:
+        out = {}
+        for h, name in enumerate(self.heroes):
+            out[name] = {
+                'mean_hp': [self.hp_sum[k][h] / self.runs for k in range(self.encounters)],
+                'fallen': [self.fallen[k][h] / self.runs for k in range(self.encounters)],
+            }
+        return out
+
+
+def simulate_campaigns(heroes: Sequence[str], day: Sequence[Step] = DEFAULT_DAY, runs: int = 1000,
+                       out_path: Optional[str] = None, workers: Optional[int] = None,
+                       chunk: int = 200, seed: int = 0) -> CampaignStats:
+    heroes = list(heroes)
+    n = encounters_in(day)
+    stats = CampaignStats(heroes, n)
+    writer = f = None
+    if out_path:
+        f = open(out_path, 'w', newline='', encoding='utf-8')
+        writer = csv.writer(f)
+        writer.writerow(['run', 'encounter'] + heroes)
+    try:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # only a couple of chunks per worker in flight, so finished results never pile up
+            starts = iter(range(0, runs, chunk))
+            pending = set()
+            while True:
+                for start in starts:
+                    pending.add(pool.submit(_run_chunk, heroes, list(day), seed, start, min(chunk, runs - start)))
+                    if len(pending) >= 2 * workers:
+                        break
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    for run, after in fut.result():
+                        stats.add(after)
+                        if writer:
+                            writer.writerows([run, k + 1] + hps for k, hps in enumerate(after))
+    finally:
+        if f:
+            f.close()
+    return stats
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Simulate adventuring days with HP carried between encounters")
+    ap.add_argument('--party', nargs='+', default=list(partyDict), choices=list(partyDict))
+    ap.add_argument('--runs', type=int, default=2000)
+    ap.add_argument('--workers', type=int, default=os.cpu_count())
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--out', help="CSV of per-run HP after each encounter")
+    args = ap.parse_args()
+
+    start = time.perf_counter()
+    stats = simulate_campaigns(args.party, DEFAULT_DAY, args.runs, args.out, args.workers, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    encounters = [s for s in DEFAULT_DAY if isinstance(s, dict)]
+    print(f"{stats.runs} campaigns in {elapsed:.1f}s")
+    print("survival:")
+    for k, p in enumerate(stats.survival()[1:]):
+        group = ", ".join(f"{n} x{c}" for n, c in encounters[k].items())
+        print(f"  after {k + 1} ({group:24s}) {p:6.1%}")
+    print("attrition (mean HP left / fallen after the last encounter):")
+    for name, a in stats.attrition().items():
+        print(f"  {name:12s} {a['mean_hp'][-1]:5.1f} HP   {a['fallen'][-1]:6.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""
+Combat event stream
+===================
+
+Combat code emits typed ``CombatEvent``s to a sink instead of building
+f-strings and printing. Every sink has a ``level``; producers check it before
+building an event, so with ``NULL_SINK`` (level ``OFF``) a simulation pays one
+integer comparison per would-be message and nothing else.
+
+Levels:   OFF < SUMMARY (deaths) < NORMAL (initiative, hits, misses, damage, heals) < DEBUG (raw attack rolls)
+
+Sinks:
+• ``NullSink``     — discards everything
+• ``SummarySink``  — counts events by kind, damage by actor, and who died
+• ``TextSink``     — buffered human-readable lines to a stream (``describe`` by default,
+                     or any ``formatter`` that turns an event into a line)
+• ``JsonlSink``    — batched JSON-lines file
+
+    sink = TextSink(sys.stdout, level=NORMAL)
+    if sink.level >= NORMAL:
+        sink.emit(CombatEvent(HIT, turn, "Gale", "Orc", 9, 6))
+"""
+
+import json
+import sys
+from typing import Callable, Dict, List, NamedTuple, Optional, TextIO
+
+OFF, SUMMARY, NORMAL, DEBUG = 0, 1, 2, 3
+
+INITIATIVE = 'initiative'
+ATTACK_ROLL = 'attack_roll'
+HIT = 'hit'
+CRIT = 'crit'
+MISS = 'miss'
+DAMAGE = 'damage'
+DEATH = 'death'
+HEAL = 'heal'
+DEFEND = 'defend'
+EFFECT_START = 'effect_start'
+EFFECT_END = 'effect_end'
+
+# Verbosity each kind of event is emitted at
+LEVELS = {
+    INITIATIVE: NORMAL,
+    ATTACK_ROLL: DEBUG,
+    HIT: NORMAL,
+    CRIT: NORMAL,
+    MISS: NORMAL,
+    DAMAGE: NORMAL,
+    DEATH: SUMMARY,
+    HEAL: NORMAL,
+    DEFEND: NORMAL,
+    EFFECT_START: NORMAL,
+    EFFECT_END: NORMAL,
+}
+
+
+class CombatEvent(NamedTuple):
+    """One thing that happened in a fight.
+
+    ``value`` is the initiative total, the natural d20, or the damage dealt,
+    depending on ``kind``; ``hp`` is the target's HP afterwards where it applies.
+    HIT and CRIT carry their damage; DAMAGE is for damage that isn't an attack.
+    """
+    kind: str
+    turn: int
+    actor: str
+    target: str = ''
+    value: int = 0
+    hp: Optional[int] = None
+
+
+class NullSink:
+    level = OFF
+
+    def emit(self, event: CombatEvent):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+NULL_SINK = NullSink()
+
+
+class SummarySink(NullSink):
+    def __init__(self, level: int = NORMAL):
+        self.level = level
+        self.counts: Dict[str, int] = {}
+        self.damage_by_actor: Dict[str, int] = {}
+        self.deaths: List[str] = []
+
+    def emit(self, event: CombatEvent):
+        self.counts[event.kind] = self.counts.get(event.kind, 0) + 1
+        if event.kind in (HIT, CRIT, DAMAGE):
+            self.damage_by_actor[event.actor] = self.damage_by_actor.get(event.actor, 0) + event.value
+        elif event.kind == DEATH:
+            self.deaths.append(event.target)
+
+    def summary(self) -> dict:
+        return {'counts': dict(self.counts), 'damage': dict(self.damage_by_actor), 'deaths': list(self.deaths)}
+
+
+def describe(e: CombatEvent) -> str:
+    """Default human-readable line for an event."""
+    if e.kind == INITIATIVE:
+        return f"{e.actor} rolled {e.value} for initiative"
+    if e.kind == ATTACK_ROLL:
+        return f"{e.actor} rolled a natural {e.value} against {e.target}"
+    if e.kind == HIT:
+        return f"{e.actor} hit and did {e.value} damage. {e.target} now has {e.hp} hp"
+    if e.kind == CRIT:
+        return f"{e.actor} hit and did double damage ({e.value}). {e.target} now has {e.hp} hp"
+    if e.kind == MISS:
+        return f"{e.actor} missed"
+    if e.kind == DAMAGE:
+        return f"{e.target} took {e.value} damage and now has {e.hp} hp"
+    if e.kind == DEATH:
+        return f"{e.target} was killed" + (f" by {e.actor}" if e.actor else "")
+    if e.kind == HEAL:
+        return f"{e.actor} healed {e.target} for {e.value}. {e.target} now has {e.hp} hp"
+    if e.kind == DEFEND:
+        return f"{e.actor} took a defensive stance"
+    if e.kind == EFFECT_START:
+        return f"{e.target} is affected by {e.actor} for {e.value} rounds"
+    if e.kind == EFFECT_END:
+        return f"{e.actor} wore off {e.target}"
+    return repr(e)
+
+
+class TextSink(NullSink):
+    def __init__(self, stream: TextIO = None, level: int = NORMAL, buffer_lines: int = 256,
+                 formatter: Callable[[CombatEvent], str] = describe):
+        self.stream = stream or sys.stdout
+        self.level = level
+        self.buffer_lines = buffer_lines
+        self.formatter = formatter
+        self._lines: List[str] = []
+
+    def emit(self, event: CombatEvent):
+        if LEVELS.get(event.kind, NORMAL) > self.level:
+            return
+        self._lines.append(self.formatter(event))
+        if len(self._lines) >= self.buffer_lines:
+            self.flush()
+
+    def flush(self):
+        if self._lines:
+            self.stream.write("\n".join(self._lines) + "\n")
+            self._lines.clear()
+        self.stream.flush()
+
+    def close(self):
+        self.flush()
+
+
+class JsonlSink(NullSink):
+    def __init__(self, path: str, level: int = NORMAL, batch_size: int = 4096):
+        self.level = level
+        self.batch_size = batch_size
+        self._file = open(path, 'w', encoding='utf-8')
+        self._batch: List[str] = []
+
+    def emit(self, event: CombatEvent):
+        if LEVELS.get(event.kind, NORMAL) > self.level:
+            return
+        self._batch.append(json.dumps(event._asdict(), separators=(',', ':')))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._batch:
+            self._file.write("\n".join(self._batch) + "\n")
+            self._batch.clear()
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
@@ -0,0 +1,144 @@
+"""
+Exact hero-vs-monster outcome probabilities
+===========================================
+
+Solves a one-on-one duel (same rules as ``combat_sim``) as a Markov chain
+instead of sampling it. Each side's per-attack damage distribution — miss,
+normal hit, natural-20 double damage — is worked out exactly against the
+defender's AC, then the joint (hero HP, monster HP) distribution is pushed
+forward one attack at a time until the probability of the fight still going
+is below ``tol``. Ground truth for checking the Monte Carlo simulators, and
+much faster than them for small HP pools.
+
+Run:    python combat_exact.py Gale Troll
+"""
+
+import argparse
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Tuple
+
+import numpy as np
+
+from dice import as_dice
+from roster import enemyDict, partyDict
+
+
+@dataclass
+class ExactResult:
+    hero: str
+    monster: str
+    win_prob: float
+    loss_prob: float
+    rounds_dist: np.ndarray   # rounds_dist[r] = P(fight ends in round r); index 0 unused
+    unresolved: float         # probability mass still fighting when the solver stopped
+
+    @property
+    def mean_rounds(self) -> float:
+        return float((np.arange(len(self.rounds_dist)) * self.rounds_dist).sum() / self.rounds_dist.sum())
+
+    def rounds_quantile(self, q: float) -> int:
+        cdf = np.cumsum(self.rounds_dist) / self.rounds_dist.sum()
+        return int(np.searchsorted(cdf, q))
+
+
+def hit_chances(atk_mod: int, target_ac: int) -> Tuple[float, float]:
+    """(P(normal hit), P(critical hit)) for one d20 attack roll."""
+    normal = sum(1 for nat in range(2, 20) if nat + atk_mod >= target_ac)
+    return normal / 20, 1 / 20
+
+
+@lru_cache(maxsize=None)
+def damage_distribution(atk_mod: int, damage: str, target_ac: int) -> Tuple[Tuple[int, float], ...]:
+    """Exact damage from one attack against ``target_ac``, as (damage, prob) pairs.
+
+    Memoized on the attacker's modifier and damage dice and the defender's AC,
+    which is everything a pairing contributes to it.
+    """
+    p_hit, p_crit = hit_chances(atk_mod, target_ac)
+    out: Dict[int, float] = {0: 1 - p_hit - p_crit}
+    for dmg, p in as_dice(damage).distribution().items():
+        dmg = max(dmg, 0)
+        out[dmg] = out.get(dmg, 0.0) + p_hit * p
+        out[2 * dmg] = out.get(2 * dmg, 0.0) + p_crit * p
+    return tuple(sorted(out.items()))
+
+
+def first_move_prob(hero_init: int, monster_init: int) -> float:
+    """P(hero acts first); ties go to the hero."""
+    wins = sum(1 for a in range(1, 21) for b in range(1, 21) if a + hero_init >= b + monster_init)
+    return wins / 400
+
+
+def _strike(grid: np.ndarray, dist, on_monster: bool) -> Tuple[np.ndarray, float]:
+    """Apply one attack to every live state; return the new grid and the mass that died."""
+    g = grid if on_monster else grid.T
+    new = np.zeros_like(g)
+    killed = 0.0
+    for dmg, p in dist:
+        if dmg == 0:
+            new += p * g
+            continue
+        killed += p * g[:, 1:1 + dmg].sum()
+        if dmg < g.shape[1] - 1:
+            new[:, 1:-dmg] += p * g[:, 1 + dmg:]
+    return (new if on_monster else new.T), killed
+
+
+def solve(hero: dict, monster: dict, tol: float = 1e-12, max_rounds: int = 100_000,
+          hero_name: str = 'hero', monster_name: str = 'monster') -> ExactResult:
+    """Exact win probability and fight-length distribution for two stat blocks."""
+    hero_dist = damage_distribution(hero['AtkMod'], as_dice(hero['Damage']).expr, monster['AC'])
+    monster_dist = damage_distribution(monster['AtkMod'], as_dice(monster['Damage']).expr, hero['AC'])
+    p_first = first_move_prob(hero['Init'], monster['Init'])
+
+    # grid[h, m] = P(hero at h HP, monster at m HP, both alive); row/column 0 unused
+    start = np.zeros((hero['HP'] + 1, monster['HP'] + 1))
+    start[hero['HP'], monster['HP']] = 1.0
+    hero_first, monster_first = start * p_first, start * (1 - p_first)
+
+    win = loss = 0.0
+    rounds = [0.0]
+    while len(rounds) <= max_rounds:
+        # hero-first fights: hero swings, then monster
+        hero_first, w1 = _strike(hero_first, hero_dist, on_monster=True)
+        hero_first, l1 = _strike(hero_first, monster_dist, on_monster=False)
+        # monster-first fights: monster swings, then hero
+        monster_first, l2 = _strike(monster_first, monster_dist, on_monster=False)
+        monster_first, w2 = _strike(monster_first, hero_dist, on_monster=True)
+
+        win += w1 + w2
+        loss += l1 + l2
+        rounds.append(w1 + w2 + l1 + l2)
+        remaining = hero_first.sum() + monster_first.sum()
+        if remaining < tol:
+            break
+
+    return ExactResult(hero_name, monster_name, win, loss, np.array(rounds), float(remaining))
+
+
+def exact_matchup(hero: str, monster: str, tol: float = 1e-12) -> ExactResult:
+    return solve(partyDict[hero], enemyDict[monster], tol, hero_name=hero, monster_name=monster)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Exact outcome of a hero-vs-monster duel")
+    ap.add_argument('hero', choices=sorted(partyDict))
+    ap.add_argument('monster', choices=sorted(enemyDict))
+    ap.add_argument('--check', type=int, metavar='N', help="also run N Monte Carlo fights for comparison")
+    args = ap.parse_args()
+
+    r = exact_matchup(args.hero, args.monster)
+    print(f"{args.hero} vs {args.monster} (exact)")
+    print(f"  win probability   {r.win_prob:.6f}")
+    print(f"  rounds            mean {r.mean_rounds:.3f}, "
+          f"p5 {r.rounds_quantile(0.05)}, p50 {r.rounds_quantile(0.5)}, p95 {r.rounds_quantile(0.95)}")
+    print(f"  unresolved mass   {r.unresolved:.2e}")
+    if args.check:
+        from combat_sim import matchup
+        mc = matchup(args.hero, args.monster, args.check)
+        print(f"  Monte Carlo       win {mc.win_prob:.6f}, mean rounds {mc.rounds.mean():.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Monte Carlo hero-vs-monster simulator
+=====================================
+
+Runs N independent one-on-one fights at once as NumPy arrays, using the
+Semester Project 1 combat rules:
+
+• initiative is d20 + Init; on a tie the hero goes first
+• an attack is d20 + AtkMod and hits if it matches or beats the target's AC
+• a natural 20 always hits for double damage, a natural 1 always misses
+• the two sides alternate until one of them reaches 0 HP
+
+Fights that have finished are dropped from the working arrays every half
+round, so the cost tracks the number of fights still running.
+
+Run:    python combat_sim.py Gale Troll -n 1000000
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from dice import as_dice
+from roster import enemyDict, partyDict
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+@dataclass
+class MatchupResult:
+    hero: str
+    monster: str
+    hero_won: np.ndarray      # bool, one per fight
+    rounds: np.ndarray        # round in which the fight ended (1-based)
+    hero_hp: np.ndarray       # HP left at the end (may be negative)
+    monster_hp: np.ndarray
+
+    @property
+    def fights(self) -> int:
+        return len(self.hero_won)
+
+    @property
+    def win_prob(self) -> float:
+        return float(self.hero_won.mean())
+
+    def summary(self) -> Dict[str, object]:
+        won = self.hero_won
+        lost = ~won
+        return {
+            'fights': self.fights,
+            'win_prob': self.win_prob,
+            'win_prob_stderr': float(np.sqrt(self.win_prob * (1 - self.win_prob) / self.fights)),
+            'rounds_mean': float(self.rounds.mean()),
+            'rounds_quantiles': dict(zip(QUANTILES, np.quantile(self.rounds, QUANTILES).tolist())),
+            'hero_hp_left_when_won': float(self.hero_hp[won].mean()) if won.any() else 0.0,
+            'monster_hp_left_when_lost': float(self.monster_hp[lost].mean()) if lost.any() else 0.0,
+        }
+
+
+def attack(rng: np.random.Generator, n: int, atk_mod: int, target_ac: int, dice) -> np.ndarray:
+    """Damage dealt by ``n`` independent attacks (0 on a miss, never negative)."""
+    nat = rng.integers(1, 21, size=n)
+    hit = (nat == 20) | ((nat != 1) & (nat + atk_mod >= target_ac))
+    dmg = np.maximum(dice.roll_many(n, rng), 0)   # a 1d4-3 hit does 0, as in combat_exact
+    dmg[nat == 20] *= 2
+    dmg[~hit] = 0
+    return dmg
+
+
+def simulate(hero: dict, monster: dict, n: int, rng: Optional[np.random.Generator] = None,
+             max_rounds: int = 10_000, hero_name: str = 'hero', monster_name: str = 'monster') -> MatchupResult:
+    """Run ``n`` fights between two stat blocks shaped like ``partyDict`` entries."""
+    rng = rng if rng is not None else np.random.default_rng()
+    h_dice, m_dice = as_dice(hero['Damage']), as_dice(monster['Damage'])
+
+    hero_first = rng.integers(1, 21, size=n) + hero['Init'] >= rng.integers(1, 21, size=n) + monster['Init']
+    hero_hp = np.full(n, hero['HP'], dtype=np.int64)
+    monster_hp = np.full(n, monster['HP'], dtype=np.int64)
+    rounds = np.zeros(n, dtype=np.int32)
+
+    active = np.arange(n)
+    rnd = 0
+    while active.size and rnd < max_rounds:
+        rnd += 1
+        for half in (0, 1):
+            hero_turn = hero_first[active] ^ bool(half)
+            h_idx = active[hero_turn]
+            m_idx = active[~hero_turn]
+            monster_hp[h_idx] -= attack(rng, h_idx.size, hero['AtkMod'], monster['AC'], h_dice)
+            hero_hp[m_idx] -= attack(rng, m_idx.size, monster['AtkMod'], hero['AC'], m_dice)
+
+            done = (hero_hp[active] <= 0) | (monster_hp[active] <= 0)
+            if done.any():
+                rounds[active[done]] = rnd
+                active = active[~done]
+    rounds[active] = rnd  # only reached if max_rounds cut fights short
+
+    return MatchupResult(hero_name, monster_name, monster_hp <= 0, rounds, hero_hp, monster_hp)
+
+
+def matchup(hero: str, monster: str, n: int, seed: Optional[int] = None) -> MatchupResult:
+    """``simulate`` by roster name, e.g. ``matchup("Gale", "Troll", 1_000_000)``."""
+    return simulate(partyDict[hero], enemyDict[monster], n, np.random.default_rng(seed),
+                    hero_name=hero, monster_name=monster)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Simulate many hero-vs-monster fights")
+    ap.add_argument('hero', choices=sorted(partyDict))
+    ap.add_argument('monster', choices=sorted(enemyDict))
+    ap.add_argument('-n', type=int, default=1_000_000, help="number of fights")
+    ap.add_argument('--seed', type=int)
+    args = ap.parse_args()
+
+    start = time.perf_counter()
+    result = matchup(args.hero, args.monster, args.n, args.seed)
+    elapsed = time.perf_counter() - start
+    s = result.summary()
+    print(f"{args.hero} vs {args.monster}: {s['fights']:,} fights in {elapsed:.2f}s")
+    print(f"  win probability   {s['win_prob']:.4f} ± {1.96 * s['win_prob_stderr']:.4f}")
+    print(f"  rounds            mean {s['rounds_mean']:.2f}, "
+          + ", ".join(f"p{int(q * 100)} {v:g}" for q, v in s['rounds_quantiles'].items()))
+    print(f"  HP left           hero (when won) {s['hero_hp_left_when_won']:.1f}, "
+          f"monster (when lost) {s['monster_hp_left_when_lost']:.1f}")
+
+
+if __name__ == '__main__':
+    main()
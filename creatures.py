@@ -0,0 +1,170 @@
+"""
+Creature storage for bulk combat
+================================
+
+Two layouts for the same stat block (HP, AC, AtkMod, Init, Damage):
+
+• ``Creature`` — a ``__slots__`` record for single fights, no per-instance
+  ``__dict__``
+• ``Roster``   — a struct-of-arrays NumPy structured array, one 17-byte row per
+  creature, for million-creature simulations. Damage dice and names are stored
+  once per *kind* (e.g. "Goblin") and rows refer to them by index.
+
+Whole-roster operations (damage, healing, resets, filtering the living,
+attack resolution) are vectorized over the array.
+
+    roster = Roster()
+    goblins = roster.add(enemyDict["Goblin"], 1_000_000, kind="Goblin", side=ENEMY_SIDE)
+    roster.apply_damage(goblins[:500], 5)
+    survivors = roster.living()
+"""
+
+from typing import List, Optional
+
+import numpy as np
+
+from dice import Dice, as_dice
+
+PARTY_SIDE, ENEMY_SIDE = 0, 1
+
+CREATURE_DTYPE = np.dtype([
+    ('hp', np.int32),
+    ('max_hp', np.int32),
+    ('ac', np.int16),
+    ('atk_mod', np.int16),
+    ('init_mod', np.int16),
+    ('kind', np.int16),   # index into Roster.kinds / Roster.dice
+    ('side', np.int8),
+])
+
+
+class Creature:
+    __slots__ = ('name', 'hp', 'max_hp', 'ac', 'atk_mod', 'init_mod', 'damage')
+
+    def __init__(self, name: str, hp: int, ac: int, atk_mod: int, init_mod: int, damage):
+        self.name = name
+        self.hp = hp
+        self.max_hp = hp
+        self.ac = ac
+        self.atk_mod = atk_mod
+        self.init_mod = init_mod
+        self.damage: Dice = as_dice(damage)
+
+    @classmethod
+    def from_stats(cls, name: str, stats: dict) -> 'Creature':
+        return cls(name, stats['HP'], stats['AC'], stats['AtkMod'], stats['Init'], stats['Damage'])
+
+    @property
+    def alive(self) -> bool:
+        return self.hp > 0
+
+
+class Roster:
+    def __init__(self, capacity: int = 1024):
+        self._data = np.zeros(capacity, dtype=CREATURE_DTYPE)
+        self._size = 0
+        self.kinds: List[str] = []
+        self.dice: List[Dice] = []
+        self._kind_index = {}
+
+    # ------------------------- building ---------------------------
+    def _kind(self, name: str, damage) -> int:
+        k = self._kind_index.get(name)
+        if k is None:
+            k = self._kind_index[name] = len(self.kinds)
+            self.kinds.append(name)
+            self.dice.append(as_dice(damage))
+        return k
+
+    def add(self, stats: dict, count: int = 1, kind: str = '', side: int = ENEMY_SIDE) -> np.ndarray:
+        """Append ``count`` copies of a ``partyDict``/``enemyDict`` stat block; returns their indices."""
+        need = self._size + count
+        if need > len(self._data):
+            grown = np.zeros(max(need, 2 * len(self._data)), dtype=CREATURE_DTYPE)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        rows = self._data[self._size:need]
+        rows['hp'] = rows['max_hp'] = stats['HP']
+        rows['ac'] = stats['AC']
+        rows['atk_mod'] = stats['AtkMod']
+        rows['init_mod'] = stats['Init']
+        rows['kind'] = self._kind(kind or str(stats['Damage']), stats['Damage'])
+        rows['side'] = side
+        start, self._size = self._size, need
+        return np.arange(start, need)
+
+    # ------------------------- views ------------------------------
+    def __len__(self):
+        return self._size
+
+    @property
+    def data(self) -> np.ndarray:
+        return self._data[:self._size]
+
+    @property
+    def hp(self) -> np.ndarray:
+        return self._data['hp'][:self._size]
+
+    @property
+    def nbytes_per_creature(self) -> int:
+        return CREATURE_DTYPE.itemsize
+
+    def alive(self) -> np.ndarray:
+        return self.hp > 0
+
+    def living(self, side: Optional[int] = None) -> np.ndarray:
+        """Indices of living creatures, optionally only one side's."""
+        mask = self.alive()
+        if side is not None:
+            mask &= self.data['side'] == side
+        return np.flatnonzero(mask)
+
+    def kind_of(self, i: int) -> str:
+        return self.kinds[self._data['kind'][i]]
+
+    # ------------------------- bulk updates -----------------------
+    def apply_damage(self, idx, amount):
+        """Subtract ``amount`` (scalar or per-index array) from HP; repeated indices accumulate."""
+        np.subtract.at(self._data['hp'], idx, amount)
+
+    def heal(self, idx, amount):
+        hp = self._data['hp']
+        np.add.at(hp, idx, amount)
+        hp[idx] = np.minimum(hp[idx], self._data['max_hp'][idx])
+
+    def reset_hp(self, idx=None):
+        if idx is None:
+            self.hp[:] = self.data['max_hp']
+        else:
+            self._data['hp'][idx] = self._data['max_hp'][idx]
+
+    def compact(self) -> np.ndarray:
+        """Drop dead creatures in place; returns the old indices of the survivors."""
+        keep = self.living()
+        self._data[:len(keep)] = self._data[keep]
+        self._size = len(keep)
+        return keep
+
+    # ------------------------- combat -----------------------------
+    def roll_damage(self, idx: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """One damage roll for each creature in ``idx``, grouped by kind so each dice expression rolls once."""
+        out = np.zeros(len(idx), dtype=np.int64)
+        kinds = self._data['kind'][idx]
+        for k in np.unique(kinds):
+            sel = kinds == k
+            out[sel] = self.dice[k].roll_many(int(sel.sum()), rng)
+        return out
+
+    def attack(self, attackers: np.ndarray, targets: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Resolve ``attackers[i]`` attacking ``targets[i]`` for every i and apply the damage.
+
+        Same rules as the rest of the combat code: d20 + AtkMod vs AC, natural 20
+        hits for double damage, natural 1 misses. Returns the damage dealt.
+        """
+        nat = rng.integers(1, 21, size=len(attackers))
+        hit = (nat == 20) | ((nat != 1) & (nat + self._data['atk_mod'][attackers] >= self._data['ac'][targets]))
+        dmg = np.maximum(self.roll_damage(attackers, rng), 0)   # a hit never heals
+        dmg[nat == 20] *= 2
+        dmg[~hit] = 0
+        self.apply_damage(targets, dmg)
+        return dmg
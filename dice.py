@@ -0,0 +1,140 @@
+"""
+Dice expressions
+================
+
+Damage and other rolls written as dice expressions, e.g. ``"2d6+3"``,
+``"2d10+1d8+4"``, ``"d20-1"``. An expression is parsed once by
+``compile_dice`` into a ``Dice`` roller; each ``roll()`` is a fresh roll, and
+``roll_many(n)`` returns ``n`` rolls at once as a NumPy array for simulations.
+``distribution()`` gives the exact probability of every total.
+
+    >>> fireball = compile_dice("8d6")
+    >>> fireball.min, fireball.max, fireball.mean
+    (8, 48, 28.0)
+    >>> import numpy as np
+    >>> fireball.roll_many(5, np.random.default_rng(0)).tolist()   # vectorized; try 1_000_000
+    [21, 36, 31, 32, 21]
+"""
+
+import random
+import re
+from functools import lru_cache
+from typing import Dict, Tuple
+
+_TERM = re.compile(r'([+-]?)\s*(?:(\d*)[dD](\d+)|(\d+))')
+
+
+class Dice:
+    """A compiled dice expression: a sum of ``NdS`` terms plus a flat modifier."""
+    __slots__ = ('expr', 'terms', 'flat')
+
+    def __init__(self, expr: str, terms: Tuple[Tuple[int, int], ...], flat: int):
+        self.expr = expr
+        self.terms = terms  # (count, sides); count is negative for subtracted dice
+        self.flat = flat
+
+    def __repr__(self):
+        return f"Dice({self.expr!r})"
+
+    def roll(self, rng=random) -> int:
+        total = self.flat
+        randint = rng.randint
+        for count, sides in self.terms:
+            sign = 1 if count > 0 else -1
+            for _ in range(abs(count)):
+                total += sign * randint(1, sides)
+        return total
+
+    def roll_many(self, n: int, rng=None):
+        """Return ``n`` independent rolls as an int64 NumPy array."""
+        import numpy as np
+
+        rng = rng if rng is not None else np.random.default_rng()
+        out = np.full(n, self.flat, dtype=np.int64)
+        for count, sides in self.terms:
+            rolls = rng.integers(1, sides + 1, size=(n, abs(count)), dtype=np.int64).sum(axis=1)
+            if count > 0:
+                out += rolls
+            else:
+                out -= rolls
+        return out
+
+    def distribution(self) -> Dict[int, float]:
+        """Exact probability of every total, by convolving the terms."""
+        dist = {self.flat: 1.0}
+        for count, sides in self.terms:
+            sign = 1 if count > 0 else -1
+            term = _sum_of_dice(abs(count), sides)
+            out: Dict[int, float] = {}
+            for a, pa in dist.items():
+                for b, pb in term.items():
+                    out[a + sign * b] = out.get(a + sign * b, 0.0) + pa * pb
+            dist = out
+        return dist
+
+    @property
+    def min(self) -> int:
+        return self.flat + sum(c if c > 0 else c * s for c, s in self.terms)
+
+    @property
+    def max(self) -> int:
+        return self.flat + sum(c * s if c > 0 else c for c, s in self.terms)
+
+    @property
+    def mean(self) -> float:
+        return self.flat + sum(c * (s + 1) / 2 for c, s in self.terms)
+
+
+@lru_cache(maxsize=None)
+def _sum_of_dice(count: int, sides: int) -> Dict[int, float]:
+    if count == 0:
+        return {0: 1.0}
+    prev = _sum_of_dice(count - 1, sides)
+    p = 1 / sides
+    out: Dict[int, float] = {}
+    for total, q in prev.items():
+        for face in range(1, sides + 1):
+            out[total + face] = out.get(total + face, 0.0) + q * p
+    return out
+
+
+@lru_cache(maxsize=None)
+def compile_dice(expr: str) -> Dice:
+    """Parse ``expr`` once; repeated calls with the same text return the same roller."""
+    text = expr.strip()
+    terms = []
+    flat = 0
+    pos = 0
+    for m in _TERM.finditer(text):
+        gap = text[pos:m.start()].strip()
+        if gap or (m.start() and not m.group(1)):
+            raise ValueError(f"bad dice expression: {expr!r}")
+        sign = -1 if m.group(1) == '-' else 1
+        if m.group(3):
+            count = int(m.group(2) or 1)
+            sides = int(m.group(3))
+            if sides < 1:
+                raise ValueError(f"bad dice expression: {expr!r}")
+            if count:
+                terms.append((sign * count, sides))
+        else:
+            flat += sign * int(m.group(4))
+        pos = m.end()
+    if pos != len(text) or not text:
+        raise ValueError(f"bad dice expression: {expr!r}")
+    return Dice(text, tuple(terms), flat)
+
+
+def roll(expr: str, rng=random) -> int:
+    """One-off roll of a dice expression (compiled and cached on first use)."""
+    return compile_dice(expr).roll(rng)
+
+
+def as_dice(damage) -> Dice:
+    """Accept a dice expression, a ``Dice`` or a flat int and return a roller."""
+    if isinstance(damage, Dice):
+        return damage
+    if isinstance(damage, int):
+        return compile_dice(str(damage))
+    return compile_dice(damage)
+
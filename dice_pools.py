@@ -0,0 +1,316 @@
+"""
+Exact dice pools
+================
+
+Exact outcome distributions for dice expressions, including the rolls that
+``dice.py`` can only sample or sum:
+
+• keep / drop: ``4d6kh3`` (SC4's stat roll; ``4d6dl1`` is the same),
+  ``10d6kl3``, ``2d20kh1`` / ``2d20kl1`` (advantage / disadvantage)
+• exploding dice: ``3d6!`` — a die showing its top face is rolled again and
+  added, up to ``EXPLODE_DEPTH`` extra rolls (the last one doesn't explode)
+• reroll once: ``2d6r2`` rerolls 1s and 2s once and keeps the new roll
+• flat modifiers and sums of terms: ``2d20kh1+5``, ``2d10+1d8+4``, ``1d8-1d4``,
+  ``100d2-100`` (HW18's heads out of 100 flips)
+
+Nothing is enumerated. Plain sums are built by convolution, splitting ``n``
+dice into two halves whose distributions are memoized, so ``100d6`` costs a
+handful of convolutions. Keep-highest runs over the faces from the top down:
+"``r`` dice left, all showing less than face ``i``, ``j`` keep slots open" is
+a sub-pool whose kept-sum distribution is memoized and shared, so ``10d6kh3``
+is a few hundred small array additions the first time and a cache hit after.
+Keep-lowest is keep-highest on the mirrored die.
+
+``attack_damage`` / ``hit_chance`` follow the house rules of the simulators:
+d20 + AtkMod meets AC to hit, natural 20 hits for double damage, natural 1
+misses; advantage and disadvantage are ``2d20kh1`` / ``2d20kl1``.
+
+    >>> round(distribution("4d6kh3").mean, 4)
+    12.2446
+    >>> round(distribution("10d6kh3").at_least(17), 4)
+    0.4667
+    >>> round(hit_chance(5, 15, mode='advantage'), 4)
+    0.7975
+
+Run:    python dice_pools.py 4d6kh3 10d6kl3 "2d20kh1+5" "3d6!"
+"""
+
+import argparse
+import re
+import time
+from functools import lru_cache
+from math import comb
+from typing import Dict, Iterator, Tuple, Union
+
+import numpy as np
+
+EXPLODE_DEPTH = 6
+MODES = ('normal', 'advantage', 'disadvantage')
+
+_TERM = re.compile(r'([+-]?)\s*(?:(\d*)[dD](\d+)(!?)(?:[rR](\d+))?(?:([kKdD])([hHlL])(\d+))?|(\d+))')
+
+
+# -----------------------------
+# Distributions
+# -----------------------------
+class Distribution:
+    """Probabilities of the integer totals ``lo`` .. ``lo + len(p) - 1``; read-only and shareable."""
+    __slots__ = ('lo', 'p')
+
+    def __init__(self, lo: int, p: np.ndarray):
+        nz = np.flatnonzero(p)
+        p = p[nz[0]:nz[-1] + 1] if len(nz) else np.zeros(1)
+        p.flags.writeable = False
+        self.lo = lo + (int(nz[0]) if len(nz) else 0)
+        self.p = p
+
+    @classmethod
+    def constant(cls, value: int) -> 'Distribution':
+        return cls(value, np.ones(1))
+
+    def __repr__(self):
+        return f"Distribution({self.lo}..{self.hi}, mean={self.mean:.4f})"
+
+    @property
+    def hi(self) -> int:
+        return self.lo + len(self.p) - 1
+
+    @property
+    def values(self) -> np.ndarray:
+        return np.arange(self.lo, self.hi + 1)
+
+    def __getitem__(self, value: int) -> float:
+        i = value - self.lo
+        return float(self.p[i]) if 0 <= i < len(self.p) else 0.0
+
+    def __iter__(self) -> Iterator[int]:
+        """The possible totals, like iterating a dict of probabilities."""
+        return (v for v, _ in self.items())
+
+    def items(self) -> Iterator[Tuple[int, float]]:
+        for v, q in zip(range(self.lo, self.hi + 1), self.p):
+            if q:
+                yield v, float(q)
+
+    def as_dict(self) -> Dict[int, float]:
+        return dict(self.items())
+
+    @property
+    def mean(self) -> float:
+        return float(self.values @ self.p)
+
+    @property
+    def variance(self) -> float:
+        return float(((self.values - self.mean) ** 2) @ self.p)
+
+    def at_least(self, value: int) -> float:
+        return float(self.p[max(value - self.lo, 0):].sum())
+
+    def at_most(self, value: int) -> float:
+        return float(self.p[:max(value - self.lo + 1, 0)].sum())
+
+    def __add__(self, other: Union['Distribution', int]) -> 'Distribution':
+        if isinstance(other, int):
+            return Distribution(self.lo + other, self.p)
+        return Distribution(self.lo + other.lo, np.convolve(self.p, other.p))
+
+    __radd__ = __add__
+
+    def __neg__(self) -> 'Distribution':
+        return Distribution(-self.hi, self.p[::-1].copy())
+
+    def __sub__(self, other: Union['Distribution', int]) -> 'Distribution':
+        return self + (-other)
+
+    def scale(self, k: int) -> 'Distribution':
+        """Distribution of ``k * X`` (e.g. doubled crit damage)."""
+        if k == 1:
+            return self
+        p = np.zeros((len(self.p) - 1) * k + 1)
+        p[::k] = self.p
+        return Distribution(self.lo * k, p)
+
+    def floor(self, value: int) -> 'Distribution':
+        """Distribution of ``max(X, value)``."""
+        if self.lo >= value:
+            return self
+        p = self.p[value - self.lo:].copy() if self.hi >= value else np.zeros(1)
+        p[0] = self.at_most(value)
+        return Distribution(value, p)
+
+
+def mix(parts) -> Distribution:
+    """Weighted mixture of ``(weight, Distribution)`` pairs."""
+    lo = min(d.lo for _, d in parts)
+    p = np.zeros(max(d.hi for _, d in parts) - lo + 1)
+    for w, d in parts:
+        p[d.lo - lo:d.hi - lo + 1] += w * d.p
+    return Distribution(lo, p)
+
+
+# -----------------------------
+# Single dice
+# -----------------------------
+@lru_cache(maxsize=None)
+def die(sides: int, explode: bool = False, reroll: int = 0) -> Distribution:
+    """One die: plain, rerolling faces <= ``reroll`` once, and/or exploding on its top face."""
+    p = np.full(sides, 1 / sides)
+    if reroll:
+        low = min(reroll, sides) / sides
+        p = p * low + np.where(np.arange(1, sides + 1) > reroll, p, 0.0)
+    if not explode or sides == 1:
+        return Distribution(1, p)
+    base = Distribution(1, p)
+    out = base
+    for _ in range(EXPLODE_DEPTH):
+        top = out.p[-1]                        # P(every roll so far was the top face)
+        head = Distribution(out.lo, np.append(out.p[:-1], 0.0))
+        out = mix([(1.0, head), (top, base + out.hi)])
+    return out
+
+
+# -----------------------------
+# Pools
+# -----------------------------
+@lru_cache(maxsize=None)
+def sum_pool(count: int, single: Distribution) -> Distribution:
+    """Sum of ``count`` independent copies of ``single`` (memoized halves)."""
+    if count == 0:
+        return Distribution.constant(0)
+    if count == 1:
+        return single
+    half = count // 2
+    return sum_pool(half, single) + sum_pool(count - half, single)
+
+
+def keep_highest(count: int, keep: int, single: Distribution) -> Distribution:
+    """Sum of the ``keep`` highest of ``count`` copies of ``single``."""
+    keep = max(0, min(keep, count))
+    if keep == count:
+        return sum_pool(count, single)
+    if keep == 0:
+        return Distribution.constant(0)
+    # shift faces to start at 0 so kept sums index arrays directly; add the offset back at the end
+    faces = tuple((v - single.lo, q) for v, q in single.items())
+    return _keep_highest(count, keep, faces) + keep * single.lo
+
+
+def keep_lowest(count: int, keep: int, single: Distribution) -> Distribution:
+    if keep >= count:
+        return sum_pool(count, single)
+    return -keep_highest(count, keep, -single)
+
+
+@lru_cache(maxsize=None)
+def _keep_highest(count: int, keep: int, faces: Tuple[Tuple[int, float], ...]) -> Distribution:
+    top = faces[-1][0]
+    size = keep * top + 1
+
+    @lru_cache(maxsize=None)
+    def sub(left: int, i: int, slots: int) -> np.ndarray:
+        """Kept-sum weights for ``left`` dice that all show one of faces[0..i], with ``slots`` keeps open."""
+        out = np.zeros(size)
+        if left == 0:
+            out[0] = 1.0
+            return out
+        if i < 0:
+            return out
+        value, q = faces[i]
+        for c in range(left + 1):          # c dice show exactly this face
+            w = comb(left, c) * q ** c
+            if not w:
+                continue
+            taken = min(c, slots)
+            rest = sub(left - c, i - 1, slots - taken)
+            shift = taken * value
+            out[shift:] += w * rest[:size - shift]
+        return out
+
+    return Distribution(0, sub(count, len(faces) - 1, keep))
+
+
+# -----------------------------
+# Expressions
+# -----------------------------
+@lru_cache(maxsize=None)
+def distribution(expr: str) -> Distribution:
+    """Exact distribution of a dice expression such as ``"4d6kh3"``, ``"2d20kl1+3"`` or ``"3d6!-2"``."""
+    text = expr.strip()
+    total = Distribution.constant(0)
+    pos = 0
+    for m in _TERM.finditer(text):
+        gap = text[pos:m.start()].strip()
+        if gap or (m.start() and not m.group(1)):
+            raise ValueError(f"bad dice expression: {expr!r}")
+        sign, count, sides, bang, reroll, kd, hl, n, flat = m.groups()
+        if sides:
+            count, sides = int(count or 1), int(sides)
+            if sides < 1:
+                raise ValueError(f"bad dice expression: {expr!r}")
+            single = die(sides, bool(bang), int(reroll or 0))
+            if kd:
+                n = int(n)
+                mode = (kd + hl).lower()     # kh, kl, dh, dl
+                if mode == 'dl':
+                    mode, n = 'kh', count - n
+                elif mode == 'dh':
+                    mode, n = 'kl', count - n
+                term = (keep_highest if mode == 'kh' else keep_lowest)(count, n, single)
+            else:
+                term = sum_pool(count, single)
+        else:
+            term = Distribution.constant(int(flat))
+        total = total - term if sign == '-' else total + term
+        pos = m.end()
+    if pos != len(text) or not text:
+        raise ValueError(f"bad dice expression: {expr!r}")
+    return total
+
+
+# -----------------------------
+# Attacks
+# -----------------------------
+def d20(mode: str = 'normal') -> Distribution:
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+    return distribution({'normal': '1d20', 'advantage': '2d20kh1', 'disadvantage': '2d20kl1'}[mode])
+
+
+def hit_chance(atk_mod: int, ac: int, mode: str = 'normal') -> float:
+    """P(hit) including crits: natural 20 always hits, natural 1 always misses."""
+    roll = d20(mode)
+    return sum(q for nat, q in roll.items() if nat == 20 or (nat != 1 and nat + atk_mod >= ac))
+
+
+@lru_cache(maxsize=None)
+def attack_damage(atk_mod: int, damage: str, ac: int, mode: str = 'normal') -> Distribution:
+    """Damage from one attack: 0 on a miss, the damage roll on a hit, double on a natural 20."""
+    roll = d20(mode)
+    p_crit = roll[20]
+    p_hit = hit_chance(atk_mod, ac, mode) - p_crit
+    dmg = distribution(damage).floor(0)
+    return mix([(1 - p_hit - p_crit, Distribution.constant(0)), (p_hit, dmg), (p_crit, dmg.scale(2))])
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Exact distributions of dice expressions")
+    ap.add_argument('exprs', nargs='+', help='e.g. 4d6kh3 10d6kl3 "2d20kh1+5" "3d6!" 2d6r2')
+    ap.add_argument('--table', action='store_true', help="print every outcome's probability")
+    args = ap.parse_args()
+
+    for expr in args.exprs:
+        start = time.perf_counter()
+        d = distribution(expr)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        distribution(expr)
+        again = time.perf_counter() - start
+        print(f"{expr:14s} {d.lo}..{d.hi}  mean {d.mean:.4f}  sd {d.variance ** 0.5:.4f}   "
+              f"({first * 1e6:.0f} us, cached {again * 1e6:.1f} us)")
+        if args.table:
+            for v, q in d.items():
+                print(f"  {v:4d} {q:8.5f}  {'#' * round(q * 200)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,259 @@
+"""
+Multi-combatant encounters
+==========================
+
+Whole parties against groups of monsters, using the Semester Project 1
+attack rules (d20 + AtkMod vs AC, natural 20 double damage, natural 1 miss).
+
+Turn order lives in a heap keyed on (round, initiative): popping the heap
+gives the next combatant to act, who is pushed back for the following round.
+Dead combatants are dropped lazily when they surface, so a turn costs
+O(log n) however many combatants are on the field.
+
+Targeting is pluggable. A policy is any callable ``policy(attacker, foes, rng)``
+that returns a living ``Combatant`` from the opposing ``Side``; the built-in
+ones use the side's O(1) random pick and lazy HP heaps instead of scanning.
+
+    enc = Encounter.from_roster(["LaeZel", "Gale"], {"Goblin": 6, "Orc": 2}, policy=weakest_target)
+    result = enc.run()
+
+Pass a ``status_effects.StatusBoard`` as ``status`` to have buffs, poison and
+stuns count: its per-combatant modifiers feed every attack roll, and the
+board is advanced at the start of each round.
+"""
+
+import heapq
+import itertools
+import random
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from combat_events import ATTACK_ROLL, CRIT, DEATH, DEBUG, HIT, INITIATIVE, MISS, NORMAL, NULL_SINK, SUMMARY, CombatEvent
+from dice import Dice, as_dice
+from roster import enemyDict, partyDict
+
+PARTY, ENEMIES = 'party', 'enemies'
+
+
+@dataclass(eq=False, slots=True)
+class Combatant:
+    name: str
+    side: str
+    hp: int
+    ac: int
+    atk_mod: int
+    init_mod: int
+    damage: Dice
+    max_hp: int = 0
+    policy: Optional[Callable] = None  # overrides the encounter's default targeting
+    initiative: int = 0
+
+    def __post_init__(self):
+        self.max_hp = self.max_hp or self.hp
+
+    @property
+    def alive(self) -> bool:
+        return self.hp > 0
+
+    @classmethod
+    def from_stats(cls, name: str, stats: dict, side: str, **kw) -> 'Combatant':
+        """Build from a ``partyDict``/``enemyDict`` style stat block."""
+        return cls(name, side, stats['HP'], stats['AC'], stats['AtkMod'], stats['Init'],
+                   as_dice(stats['Damage']), **kw)
+
+
+class Side:
+    """The living members of one side, with O(1) random pick and O(log n) weakest/toughest.
+
+    The HP heaps are only built once a policy asks for them, and are rebuilt
+    when stale entries outnumber the living.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.living: List[Combatant] = []
+        self._pos: Dict[Combatant, int] = {}
+        self._seq = itertools.count()
+        self._heaps: Dict[int, List[Tuple[int, int, Combatant]]] = {}  # sign -> lazy heap of (sign*hp, seq, c)
+
+    def __len__(self):
+        return len(self.living)
+
+    def add(self, c: Combatant):
+        self._pos[c] = len(self.living)
+        self.living.append(c)
+        self.hp_changed(c)
+
+    def remove(self, c: Combatant):
+        i = self._pos.pop(c)
+        last = self.living.pop()
+        if last is not c:
+            self.living[i] = last
+            self._pos[last] = i
+
+    def hp_changed(self, c: Combatant):
+        for sign, heap in self._heaps.items():
+            if len(heap) > 4 * len(self.living) + 64:
+                self._heaps[sign] = self._build(sign)
+            else:
+                heapq.heappush(heap, (sign * c.hp, next(self._seq), c))
+
+    def random(self, rng) -> Combatant:
+        return self.living[rng.randrange(len(self.living))]
+
+    def weakest(self) -> Combatant:
+        return self._peek(1)
+
+    def toughest(self) -> Combatant:
+        return self._peek(-1)
+
+    def _build(self, sign: int) -> List[Tuple[int, int, Combatant]]:
+        heap = [(sign * c.hp, next(self._seq), c) for c in self.living]
+        heapq.heapify(heap)
+        return heap
+
+    def _peek(self, sign: int) -> Combatant:
+        heap = self._heaps.get(sign)
+        if heap is None:
+            heap = self._heaps[sign] = self._build(sign)
+        # entries go stale when HP changes or the combatant dies; discard them as they surface
+        while True:
+            key, _, c = heap[0]
+            if c.alive and key == sign * c.hp:
+                return c
+            heapq.heappop(heap)
+
+
+# -----------------------------
+# Targeting policies
+# -----------------------------
+def random_target(attacker: Combatant, foes: Side, rng) -> Combatant:
+    return foes.random(rng)
+
+
+def weakest_target(attacker: Combatant, foes: Side, rng) -> Combatant:
+    """Focus fire: finish off whoever is closest to dropping."""
+    return foes.weakest()
+
+
+def toughest_target(attacker: Combatant, foes: Side, rng) -> Combatant:
+    return foes.toughest()
+
+
+@dataclass
+class EncounterResult:
+    winner: Optional[str]          # PARTY, ENEMIES, or None if max_turns ran out
+    rounds: int
+    turns: int
+    survivors: List[Combatant] = field(default_factory=list)
+
+
+class Encounter:
+    def __init__(self, combatants: Iterable[Combatant], policy: Callable = random_target,
+                 rng: Optional[random.Random] = None, events=NULL_SINK, status=None):
+        self.rng = rng or random.Random()
+        self.events = events  # a combat_events sink
+        self.status = status  # an optional status_effects.StatusBoard
+        self.policy = policy
+        self.sides = {PARTY: Side(PARTY), ENEMIES: Side(ENEMIES)}
+        self.round = 1
+        self.turns = 0
+        self._seq = itertools.count()
+        self._order: List[Tuple[int, int, int, int, Combatant]] = []
+
+        for c in combatants:
+            self.sides[c.side].add(c)
+            c.initiative = self.rng.randint(1, 20) + c.init_mod
+            self._schedule(c, 1)
+            if events.level >= NORMAL:
+                events.emit(CombatEvent(INITIATIVE, 0, c.name, value=c.initiative))
+        if status is not None:
+            self._start_round(1)
+
+    @classmethod
+    def from_roster(cls, heroes: Iterable[str], monsters: Dict[str, int], **kw) -> 'Encounter':
+        """Heroes by ``partyDict`` name, monsters as ``{enemyDict name: count}``."""
+        combatants = [Combatant.from_stats(h, partyDict[h], PARTY) for h in heroes]
+        for name, count in monsters.items():
+            combatants += [Combatant.from_stats(f"{name} {i + 1}", enemyDict[name], ENEMIES) for i in range(count)]
+        return cls(combatants, **kw)
+
+    def _schedule(self, c: Combatant, rnd: int):
+        # higher initiative first; on a tie the party acts before monsters
+        heapq.heappush(self._order, (rnd, -c.initiative, c.side != PARTY, next(self._seq), c))
+
+    def foes_of(self, c: Combatant) -> Side:
+        return self.sides[ENEMIES if c.side == PARTY else PARTY]
+
+    @property
+    def over(self) -> bool:
+        return not self.sides[PARTY] or not self.sides[ENEMIES]
+
+    def attack(self, attacker: Combatant, target: Combatant) -> int:
+        """Resolve one attack and return the damage dealt."""
+        ev = self.events
+        atk_mod, ac, bonus = attacker.atk_mod, target.ac, 0
+        if self.status is not None:
+            mods = self.status.mods(attacker)
+            atk_mod += mods.atk_mod
+            bonus = mods.damage
+            ac += self.status.mods(target).ac
+        nat = self.rng.randint(1, 20)
+        if ev.level >= DEBUG:
+            ev.emit(CombatEvent(ATTACK_ROLL, self.turns, attacker.name, target.name, nat))
+        if nat == 1 or (nat != 20 and nat + atk_mod < ac):
+            if ev.level >= NORMAL:
+                ev.emit(CombatEvent(MISS, self.turns, attacker.name, target.name, nat))
+            return 0
+        # clamp the roll before a crit doubles it; status bonuses can be negative, so clamp again
+        dmg = max(0, max(0, attacker.damage.roll(self.rng)) * (2 if nat == 20 else 1) + bonus)
+        target.hp -= dmg
+        if ev.level >= NORMAL:
+            ev.emit(CombatEvent(CRIT if nat == 20 else HIT, self.turns, attacker.name, target.name, dmg, target.hp))
+        self._hp_changed(target, attacker.name)
+        return dmg
+
+    def _hp_changed(self, c: Combatant, source: str = ''):
+        side = self.sides[c.side]
+        if c.alive:
+            side.hp_changed(c)
+        elif c in side._pos:
+            side.remove(c)
+            if self.status is not None:
+                self.status.clear(c)
+            if self.events.level >= SUMMARY:
+                self.events.emit(CombatEvent(DEATH, self.turns, source, c.name, hp=c.hp))
+
+    def _start_round(self, rnd: int):
+        self.round = rnd
+        if self.status is not None:
+            for c in self.status.advance(rnd):
+                self._hp_changed(c)
+
+    def step(self) -> Optional[Combatant]:
+        """Let the next living combatant act; returns who acted (None once the fight is over)."""
+        while self._order and not self.over:
+            rnd, _, _, _, actor = heapq.heappop(self._order)
+            if rnd != self.round:
+                self._start_round(rnd)
+            if not actor.alive or self.over:
+                continue
+            self.turns += 1
+            if self.status is None or not self.status.mods(actor).stunned:
+                policy = actor.policy or self.policy
+                self.attack(actor, policy(actor, self.foes_of(actor), self.rng))
+            self._schedule(actor, rnd + 1)
+            return actor
+        return None
+
+    def run(self, max_turns: int = 1_000_000) -> EncounterResult:
+        while self.turns < max_turns and self.step() is not None:
+            pass
+        self.events.flush()
+        winner = None
+        if not self.sides[ENEMIES]:
+            winner = PARTY
+        elif not self.sides[PARTY]:
+            winner = ENEMIES
+        survivors = self.sides[PARTY].living + self.sides[ENEMIES].living
+        return EncounterResult(winner, self.round, self.turns, list(survivors))
@@ -0,0 +1,198 @@
+"""
+Encounter balancer
+==================
+
+Given a party and a target win probability, searches combinations of
+``enemyDict`` monsters (kinds and counts) for encounters whose win rate lands
+within tolerance of the target.
+
+Three stages keep it fast:
+
+1. Analytic estimate. Each side's strength is its expected damage per round
+   against the other side's AC times its total HP (Lanchester's square law);
+   the strength ratio maps to a rough win probability. The estimate itself
+   isn't monotone — a low-AC monster raises the party's average damage — so
+   pruning uses ``estimate_bound``, which credits the party with its damage
+   against the lowest AC any further monster could have. That bound only
+   falls as monsters are added, so once it says a group is clearly too hard
+   none of its supersets are visited.
+2. Short Monte Carlo runs (``encounter.Encounter``) on the survivors, each
+   stage dropping groups more than three standard errors outside tolerance.
+3. A full-length run on whatever is left.
+
+Per-attack expected damage and simulation results are memoized, so repeated
+sub-results are only ever computed once.
+
+Run:    python encounter_balancer.py --target 0.7 --tol 0.05
+"""
+
+import argparse
+import random
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from math import sqrt
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from dice import as_dice
+from encounter import ENEMIES, PARTY, Combatant, Encounter, random_target
+from roster import enemyDict, partyDict
+
+
+@dataclass
+class BalancedEncounter:
+    monsters: Dict[str, int]
+    win_prob: float
+    stderr: float
+    estimate: float      # analytic win-probability estimate
+    fights: int
+
+    def describe(self) -> str:
+        group = ", ".join(f"{n} x{c}" for n, c in self.monsters.items())
+        return f"{group:40s} win {self.win_prob:.3f} ± {1.96 * self.stderr:.3f}  (est {self.estimate:.2f})"
+
+
+@lru_cache(maxsize=None)
+def expected_damage(atk_mod: int, damage: str, target_ac: int) -> float:
+    """Expected damage of one attack, natural 20s doubled and natural 1s missing."""
+    normal = sum(1 for nat in range(2, 20) if nat + atk_mod >= target_ac) / 20
+    return (normal + 2 / 20) * as_dice(damage).mean
+
+
+def _strength(attackers: List[dict], defenders: List[dict]) -> float:
+    hp = sum(a['HP'] for a in attackers)
+    dpr = 0.0
+    for a in attackers:
+        dmg = as_dice(a['Damage']).expr
+        dpr += sum(expected_damage(a['AtkMod'], dmg, d['AC']) for d in defenders) / len(defenders)
+    return hp * dpr
+
+
+def estimate_win(party: List[dict], monsters: List[dict], sharpness: float = 2.0) -> float:
+    """Rough win probability from the Lanchester strength ratio (no sampling)."""
+    if not monsters:
+        return 1.0
+    ratio = _strength(party, monsters) / _strength(monsters, party)
+    return ratio ** sharpness / (1 + ratio ** sharpness)
+
+
+def estimate_bound(party: List[dict], monsters: List[dict], lowest_ac: int, sharpness: float = 2.0) -> float:
+    """Upper bound on ``estimate_win`` for ``monsters`` plus any more monsters with AC >= ``lowest_ac``.
+
+    The monsters' strength only grows as more are added, and the party's
+    damage per round is at most its damage against ``lowest_ac``.
+    """
+    hp = sum(a['HP'] for a in party)
+    dpr = sum(expected_damage(a['AtkMod'], as_dice(a['Damage']).expr, lowest_ac) for a in party)
+    ratio = hp * dpr / _strength(monsters, party)
+    return ratio ** sharpness / (1 + ratio ** sharpness)
+
+
+class Balancer:
+    def __init__(self, heroes: Sequence[str], bestiary: Optional[Dict[str, dict]] = None,
+                 policy=random_target, seed: int = 0):
+        self.heroes = tuple(heroes)
+        self.bestiary = bestiary or enemyDict
+        self.policy = policy
+        self.seed = seed
+        self.party = [partyDict[h] for h in self.heroes]
+        self._sim_cache: Dict[Tuple[Tuple[str, int], ...], Tuple[int, int]] = {}  # group -> (wins, fights)
+
+    def invalidate(self, monsters) -> int:
+        """Forget simulated groups containing any of ``monsters`` (after their stats were edited)."""
+        monsters = set(monsters)
+        stale = [g for g in self._sim_cache if any(name in monsters for name, _ in g)]
+        for g in stale:
+            del self._sim_cache[g]
+        return len(stale)
+
+    def on_change(self, changed, table):
+        """``live_bestiary.LiveBestiary`` subscriber: use the new table, drop what it invalidates.
+
+        Runs from ``LiveBestiary.check()``, so call that on this balancer's
+        thread between searches, never while one is running.
+        """
+        self.bestiary = table
+        self.invalidate(changed)
+
+    def simulate(self, group: Tuple[Tuple[str, int], ...], fights: int) -> Tuple[float, float]:
+        """Monte Carlo win rate and standard error, reusing earlier fights for the same group."""
+        wins, done = self._sim_cache.get(group, (0, 0))
+        if done < fights:
+            rng = random.Random(f"{self.seed}|{self.heroes}|{group}|{done}")
+            for _ in range(fights - done):
+                combatants = [Combatant.from_stats(h, partyDict[h], PARTY) for h in self.heroes]
+                for name, count in group:
+                    combatants += [Combatant.from_stats(f"{name} {i + 1}", self.bestiary[name], ENEMIES)
+                                   for i in range(count)]
+                result = Encounter(combatants, policy=self.policy, rng=rng).run()
+                wins += result.winner == PARTY
+            done = fights
+            self._sim_cache[group] = (wins, done)
+        p = wins / done
+        return p, sqrt(max(p * (1 - p), 1 / done) / done)
+
+    def candidates(self, target: float, margin: float, max_monsters: int, max_per_kind: int):
+        """Monster groups whose analytic estimate is within ``margin`` of ``target``."""
+        kinds = list(self.bestiary)
+        # lowest AC among kinds[i:], the monsters a group built so far could still gain
+        lowest = [min(self.bestiary[k]['AC'] for k in kinds[i:]) for i in range(len(kinds))]
+
+        def visit(i: int, group: List[Tuple[str, int]], size: int):
+            if i == len(kinds):
+                if group:
+                    est = estimate_win(self.party, [self.bestiary[n] for n, c in group for _ in range(c)])
+                    if abs(est - target) <= margin:
+                        yield tuple(group), est
+                return
+            for count in range(0, max_per_kind + 1):
+                if size + count > max_monsters:
+                    break
+                nxt = group + [(kinds[i], count)] if count else group
+                if count:
+                    monsters = [self.bestiary[n] for n, c in nxt for _ in range(c)]
+                    ac = min(lowest[i], min(m['AC'] for m in monsters))
+                    if estimate_bound(self.party, monsters, ac) < target - margin:
+                        break  # no superset of this group can come back within reach
+                yield from visit(i + 1, nxt, size + count)
+
+        yield from visit(0, [], 0)
+
+    def search(self, target: float, tol: float = 0.05, max_monsters: int = 8, max_per_kind: int = 6,
+               margin: float = 0.3, stages: Sequence[int] = (50, 200, 600), top: int = 10) -> List[BalancedEncounter]:
+        found = []
+        for group, est in self.candidates(target, margin, max_monsters, max_per_kind):
+            for fights in stages[:-1]:
+                p, se = self.simulate(group, fights)
+                if abs(p - target) > tol + 3 * se:
+                    break
+            else:
+                p, se = self.simulate(group, stages[-1])
+                if abs(p - target) <= tol:
+                    found.append(BalancedEncounter(dict(group), p, se, est, stages[-1]))
+        found.sort(key=lambda e: (abs(e.win_prob - target), sum(e.monsters.values())))
+        return found[:top]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Find monster groups that give a party a target win probability")
+    ap.add_argument('--party', nargs='+', default=list(partyDict), choices=list(partyDict))
+    ap.add_argument('--target', type=float, default=0.7)
+    ap.add_argument('--tol', type=float, default=0.05)
+    ap.add_argument('--max-monsters', type=int, default=8)
+    ap.add_argument('--max-per-kind', type=int, default=6)
+    ap.add_argument('--top', type=int, default=10)
+    args = ap.parse_args()
+
+    start = time.perf_counter()
+    balancer = Balancer(args.party)
+    results = balancer.search(args.target, args.tol, args.max_monsters, args.max_per_kind, top=args.top)
+    elapsed = time.perf_counter() - start
+    print(f"party: {', '.join(args.party)}   target {args.target:.2f} ± {args.tol:.2f}")
+    for enc in results:
+        print("  " + enc.describe())
+    print(f"{len(results)} encounters in {elapsed:.1f}s ({len(balancer._sim_cache)} groups simulated)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,327 @@
+"""
+Flow-field pathfinding
+======================
+
+Movement around obstacles for large unit counts. Instead of an A* search per
+unit, every goal gets one flow field — the step distance from each free grid
+cell to the goal, plus the neighbouring cell to step into next — and all
+units heading to that goal just follow it. Moving N units is a few array
+lookups per cell of movement, however large N is.
+
+• ``ObstacleGrid``     — blocked/free cells over the battlefield (``cell`` feet square)
+• ``compute_flow_field`` — breadth-first wavefront from the goal, one NumPy
+  pass per distance layer; 8-way moves, no cutting across blocked corners
+• ``FlowFieldCache``   — fields by goal cell, least recently used evicted
+  first. When obstacles change, cached fields are kept up to date instead of
+  thrown away. A new obstacle only lengthens paths: cells that lose every
+  neighbour one step closer (and the cells that depended on them) are
+  cleared and refilled from the intact cells around them. A cleared cell
+  only shortens paths: a small wavefront from it lowers what improves. A
+  field is dropped, and recomputed on next use, only when an obstacle
+  reshapes a large part of it.
+• ``advance``          — moves battlefield units up to their speed along the
+  field for their goal; diagonals use the 5e alternating rule (5-10-5 feet
+  on a 5-foot grid)
+
+    grid = ObstacleGrid.for_battlefield(field, cell=5)
+    grid.set_blocked(wall_cells)
+    cache = FlowFieldCache(grid, capacity=32)
+    advance(field, cache, goblins, goal_x=300, goal_y=120)
+"""
+
+import heapq
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import numpy as np
+
+UNREACHABLE = np.iinfo(np.int32).max
+
+# orthogonal first, so ties prefer straight moves
+_DIRS = ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1))
+
+
+class ObstacleGrid:
+    def __init__(self, cols: int, rows: int, cell: float = 5.0):
+        self.cols = cols
+        self.rows = rows
+        self.cell = cell
+        self.blocked = np.zeros(rows * cols, dtype=bool)   # flat, row-major
+        self.version = 0
+
+    @classmethod
+    def for_battlefield(cls, field, cell: float = 5.0) -> 'ObstacleGrid':
+        return cls(int(np.ceil(field.width / cell)), int(np.ceil(field.height / cell)), cell)
+
+    def __len__(self):
+        return self.rows * self.cols
+
+    def cell_of(self, xs, ys) -> np.ndarray:
+        cx = np.clip((np.asarray(xs) / self.cell).astype(np.int64), 0, self.cols - 1)
+        cy = np.clip((np.asarray(ys) / self.cell).astype(np.int64), 0, self.rows - 1)
+        return cy * self.cols + cx
+
+    def center(self, cells):
+        cy, cx = np.divmod(np.asarray(cells), self.cols)
+        return (cx + 0.5) * self.cell, (cy + 0.5) * self.cell
+
+    def set_blocked(self, cells, value: bool = True) -> np.ndarray:
+        """Block (or clear) flat cell indices; returns the cells that actually changed."""
+        cells = np.unique(np.asarray(cells, dtype=np.int64))
+        changed = cells[self.blocked[cells] != value]
+        self.blocked[changed] = value
+        if len(changed):
+            self.version += 1
+        return changed
+
+
+@dataclass
+class FlowField:
+    goal: int
+    dist: np.ndarray     # steps to the goal per cell, UNREACHABLE if there's no path
+    next: np.ndarray     # cell to step into next; the cell itself at the goal or when stuck
+
+
+def _neighbours(grid: ObstacleGrid, cells: np.ndarray, dr: int, dc: int):
+    """Flat neighbour indices in direction (dr, dc) and whether the move is legal."""
+    free = ~grid.blocked
+    r, c = np.divmod(cells, grid.cols)
+    nr, nc = r + dr, c + dc
+    ok = (nr >= 0) & (nr < grid.rows) & (nc >= 0) & (nc < grid.cols)
+    n = np.where(ok, nr * grid.cols + nc, 0)
+    ok &= free[n]
+    if dr and dc:
+        # a diagonal needs both orthogonal cells it squeezes between to be free
+        ok &= free[np.where(ok, r * grid.cols + nc, 0)] & free[np.where(ok, nr * grid.cols + c, 0)]
+    return n, ok
+
+
+def compute_flow_field(grid: ObstacleGrid, goal: int) -> FlowField:
+    size = len(grid)
+    dist = np.full(size, UNREACHABLE, dtype=np.int32)
+    if not grid.blocked[goal]:
+        dist[goal] = 0
+        frontier = np.array([goal], dtype=np.int64)
+        d = 0
+        while len(frontier):
+            d += 1
+            found = []
+            for dr, dc in _DIRS:
+                n, ok = _neighbours(grid, frontier, dr, dc)
+                n = n[ok]
+                found.append(n[dist[n] == UNREACHABLE])
+            frontier = np.unique(np.concatenate(found))
+            dist[frontier] = d
+
+    return FlowField(goal, dist, _next_cells(grid, dist, np.arange(size, dtype=np.int64)))
+
+
+def _next_cells(grid: ObstacleGrid, dist: np.ndarray, cells: np.ndarray) -> np.ndarray:
+    """Each cell's lowest-distance legal neighbour (the cell itself if none is closer)."""
+    best = dist[cells].copy()
+    nxt = cells.copy()
+    for dr, dc in _DIRS:
+        n, ok = _neighbours(grid, cells, dr, dc)
+        nd = np.where(ok, dist[n], UNREACHABLE)
+        better = nd < best
+        best[better] = nd[better]
+        nxt[better] = n[better]
+    return nxt
+
+
+def _step(grid: ObstacleGrid, free, u: int, dr: int, dc: int) -> int:
+    """Scalar ``_neighbours`` for the repair loops: the cell reached from ``u``, or -1 if illegal."""
+    r, c = divmod(u, grid.cols)
+    nr, nc = r + dr, c + dc
+    if not (0 <= nr < grid.rows and 0 <= nc < grid.cols):
+        return -1
+    n = nr * grid.cols + nc
+    if not free[n] or (dr and dc and not (free[r * grid.cols + nc] and free[nr * grid.cols + c])):
+        return -1
+    return n
+
+
+def _around(grid: ObstacleGrid, cells) -> np.ndarray:
+    """``cells`` and every cell touching them, blocked or not."""
+    cells = np.asarray(cells, dtype=np.int64)
+    r, c = np.divmod(cells, grid.cols)
+    out = [cells]
+    for dr, dc in _DIRS:
+        nr, nc = r + dr, c + dc
+        ok = (nr >= 0) & (nr < grid.rows) & (nc >= 0) & (nc < grid.cols)
+        out.append(nr[ok] * grid.cols + nc[ok])
+    return np.unique(np.concatenate(out))
+
+
+def _relax(grid: ObstacleGrid, free, dist, heap, allowed=None):
+    """Unit-step Dijkstra from ``heap`` entries (d, cell), lowering ``dist`` (a list) in place.
+
+    Only cells in ``allowed`` (all, if None) are updated; returns the cells that changed.
+    """
+    heapq.heapify(heap)
+    changed = set()
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for dr, dc in _DIRS:
+            v = _step(grid, free, u, dr, dc)
+            if v >= 0 and d + 1 < dist[v] and (allowed is None or v in allowed):
+                dist[v] = d + 1
+                changed.add(v)
+                heapq.heappush(heap, (d + 1, v))
+    return changed
+
+
+def _repair_blocked(grid: ObstacleGrid, flow: FlowField, blocked: np.ndarray, limit: float = 0.25) -> bool:
+    """Update ``flow`` in place for newly ``blocked`` cells; False if it should be recomputed instead.
+
+    Blocking only lengthens paths. A cell keeps its distance as long as some
+    legal neighbour is still exactly one step closer; the cells that lose
+    every such neighbour — and, in turn, the cells that only had them — are
+    cleared and refilled by a wavefront from the intact cells around them.
+    If that region is more than ``limit`` of the grid, a fresh BFS is cheaper.
+    """
+    if grid.blocked[flow.goal]:
+        return False
+    free = (~grid.blocked).tolist()
+    dist = flow.dist.tolist()
+    for b in blocked.tolist():
+        dist[b] = UNREACHABLE
+    unsupported = set()
+    queue = [int(x) for x in _around(grid, blocked) if free[x] and dist[x] != UNREACHABLE]
+    while queue:
+        x = queue.pop()
+        d = dist[x]
+        if d == UNREACHABLE or x == flow.goal:
+            continue
+        if any(n >= 0 and dist[n] == d - 1 for n in (_step(grid, free, x, dr, dc) for dr, dc in _DIRS)):
+            continue
+        unsupported.add(x)
+        if len(unsupported) > limit * len(grid):
+            return False
+        dist[x] = UNREACHABLE
+        for dr, dc in _DIRS:                 # whoever stepped through x has to be checked again
+            v = _step(grid, free, x, dr, dc)
+            if v >= 0 and dist[v] == d + 1:
+                queue.append(v)
+
+    heap = []
+    for x in unsupported:
+        best = min((dist[n] for n in (_step(grid, free, x, dr, dc) for dr, dc in _DIRS)
+                    if n >= 0 and dist[n] != UNREACHABLE), default=UNREACHABLE)
+        if best != UNREACHABLE:
+            dist[x] = best + 1
+            heap.append((best + 1, x))
+    _relax(grid, free, dist, heap, allowed=unsupported)
+
+    flow.dist[:] = dist
+    redo = _around(grid, np.concatenate([blocked, np.fromiter(unsupported, dtype=np.int64)]))
+    flow.next[redo] = _next_cells(grid, flow.dist, redo)   # blocked cells too: a unit walled in steps out
+    return True
+
+
+def _repair_cleared(grid: ObstacleGrid, flow: FlowField, cleared: np.ndarray):
+    """Lower distances in place after ``cleared`` cells opened up.
+
+    Opening cells only shortens paths, so the old distances are upper bounds:
+    a wavefront from the cleared cells' neighbours relaxes just the cells
+    that improve, then their next steps are redone.
+    """
+    free = (~grid.blocked).tolist()
+    dist = flow.dist.tolist()
+    if flow.goal in cleared:
+        dist[flow.goal] = 0
+    seeds = _around(grid, cleared).tolist()
+    changed = _relax(grid, free, dist, [(dist[s], s) for s in seeds if free[s] and dist[s] != UNREACHABLE])
+    flow.dist[:] = dist
+    redo = _around(grid, np.concatenate([cleared, np.fromiter(changed, dtype=np.int64)]))
+    flow.next[redo] = _next_cells(grid, flow.dist, redo)
+
+
+class FlowFieldCache:
+    def __init__(self, grid: ObstacleGrid, capacity: int = 64):
+        self.grid = grid
+        self.capacity = capacity
+        self._fields: 'OrderedDict[int, FlowField]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._fields)
+
+    def get(self, goal: int) -> FlowField:
+        goal = int(goal)
+        field = self._fields.get(goal)
+        if field is not None:
+            self._fields.move_to_end(goal)
+            self.hits += 1
+            return field
+        self.misses += 1
+        field = compute_flow_field(self.grid, goal)
+        self._fields[goal] = field
+        if len(self._fields) > self.capacity:
+            self._fields.popitem(last=False)
+        return field
+
+    def invalidate_goal(self, goal: int):
+        self._fields.pop(int(goal), None)
+
+    def obstacles_changed(self, cells: Iterable[int]) -> int:
+        """Update cached fields for cells already changed in the grid; returns how many were dropped.
+
+        Fields are repaired in place around the changed cells; one is dropped
+        (and recomputed on next use) only when a new obstacle changes
+        distances over a large part of the grid.
+        """
+        cells = np.asarray(list(cells) if not isinstance(cells, np.ndarray) else cells, dtype=np.int64)
+        if not len(cells):
+            return 0
+        blocked = cells[self.grid.blocked[cells]]
+        cleared = cells[~self.grid.blocked[cells]]
+        stale = [g for g, f in self._fields.items() if len(blocked) and not _repair_blocked(self.grid, f, blocked)]
+        for g in stale:
+            del self._fields[g]
+        for f in self._fields.values():
+            if len(cleared):
+                _repair_cleared(self.grid, f, cleared)
+        return len(stale)
+
+    def set_blocked(self, cells, value: bool = True) -> np.ndarray:
+        changed = self.grid.set_blocked(cells, value)
+        self.obstacles_changed(changed)
+        return changed
+
+
+def advance(field, cache: FlowFieldCache, ids, goal_x: float, goal_y: float,
+            speed: Optional[np.ndarray] = None) -> np.ndarray:
+    """Move battlefield units ``ids`` along the flow field toward (goal_x, goal_y).
+
+    Each unit spends up to its speed in feet (its battlefield speed by
+    default) and ends on a cell centre. An orthogonal step costs one cell;
+    diagonals alternate one cell and two, as in the 5e variant rule, so a
+    unit can't outrun its speed by walking diagonally. Returns the units'
+    new cells.
+    """
+    grid = cache.grid
+    ids = np.asarray(ids)
+    flow = cache.get(grid.cell_of(goal_x, goal_y))
+    cells = grid.cell_of(field.x[ids], field.y[ids])
+    budget = (field.speed[ids] if speed is None else np.asarray(speed)).astype(np.float64)
+    diagonals = np.zeros(len(ids), dtype=np.int64)
+    while True:
+        nxt = flow.next[cells]
+        r, c = np.divmod(cells, grid.cols)
+        nr, nc = np.divmod(nxt, grid.cols)
+        diagonal = (r != nr) & (c != nc)
+        cost = np.where(diagonal & (diagonals % 2 == 1), 2 * grid.cell, grid.cell)
+        moving = (nxt != cells) & (cost <= budget)
+        if not moving.any():
+            break
+        budget -= np.where(moving, cost, 0.0)
+        diagonals += moving & diagonal
+        cells = np.where(moving, nxt, cells)
+    xs, ys = grid.center(cells)
+    field.move_to(ids, xs, ys)
+    return cells
@@ -0,0 +1,264 @@
+"""
+Hot-reloadable enemy table
+==========================
+
+Keeps the ``enemyDict`` stat blocks in a JSON file (``enemies.json`` next to
+this module, seeded from ``roster.py`` the first time) and applies edits to
+running simulators and games without a restart.
+
+• Reloads are copy-on-write: a new read-only snapshot is built from the file
+  and swapped in with one reference assignment, so a reader holding
+  ``live.current`` always sees a complete, consistent table — never half an
+  edit. A file that fails to parse or validate (an editor mid-save, a bad
+  dice string) is ignored and the previous snapshot stays live.
+• ``live.start()`` polls the file from a daemon thread, which only swaps in
+  new snapshots and queues what changed. Subscribers (and the ``roster``
+  sync) run inside ``live.check()``, on the thread that calls it — a game
+  loop once per frame, a balancer between searches — so a cache is never
+  invalidated while its owner is in the middle of using it. Without the
+  thread, ``check()`` also does the polling.
+• Subscribers get only the names that changed, so caches drop just the
+  entries that depend on those monsters (``DependentCache``,
+  ``encounter_balancer.Balancer.invalidate``). Caches keyed on the stat
+  values themselves — ``matchup_matrix``'s disk cache,
+  ``combat_exact.damage_distribution`` — already miss on the new numbers.
+• With ``sync_roster`` (the default) changed blocks are also swapped into
+  ``roster.enemyDict`` one key at a time, so code that looks monsters up
+  there when a fight starts picks up edits too.
+
+    live = LiveBestiary()
+    live.subscribe(lambda changed, table: print("reloaded", changed))
+    live.start()
+    live.edit("Orc", Damage="1d12+5")     # SC1-style edit, written back to the file
+    live.check()                          # in the consumer's loop: deliver queued changes
+
+Run:    python live_bestiary.py watch
+        python live_bestiary.py edit Orc Damage 1d12+5
+"""
+
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from types import MappingProxyType
+from typing import Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Set
+
+import roster
+from dice import compile_dice
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'enemies.json')
+REQUIRED = ('HP', 'Init', 'AC', 'AtkMod', 'Damage')
+
+
+def _validate(table: dict) -> Dict[str, Mapping]:
+    out = {}
+    for name, block in table.items():
+        missing = [k for k in REQUIRED if k not in block]
+        if missing:
+            raise ValueError(f"{name}: missing {', '.join(missing)}")
+        for k in ('HP', 'Init', 'AC', 'AtkMod'):
+            if not isinstance(block[k], int):
+                raise ValueError(f"{name}: {k} must be an integer")
+        compile_dice(str(block['Damage']))
+        out[name] = MappingProxyType(dict(block))
+    return out
+
+
+class DependentCache:
+    """A dict of results that remembers which monsters each one was computed from."""
+
+    def __init__(self):
+        self._values: Dict[Hashable, object] = {}
+        self._by_monster: Dict[str, Set[Hashable]] = {}
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def get(self, key, default=None):
+        return self._values.get(key, default)
+
+    def put(self, key, value, depends_on: Iterable[str]):
+        self._values[key] = value
+        for name in depends_on:
+            self._by_monster.setdefault(name, set()).add(key)
+
+    def invalidate(self, monsters: Iterable[str]) -> int:
+        dropped = 0
+        for name in monsters:
+            for key in self._by_monster.pop(name, ()):
+                if key in self._values:
+                    del self._values[key]
+                    dropped += 1
+        return dropped
+
+    def on_change(self, changed: Set[str], table):
+        self.invalidate(changed)
+
+
+class LiveBestiary:
+    def __init__(self, path: str = DEFAULT_PATH, sync_roster: bool = True):
+        self.path = path
+        self.sync_roster = sync_roster
+        self.last_error: Optional[str] = None
+        self.reloads = 0
+        self._subscribers: List[Callable[[Set[str], Mapping], None]] = []
+        self._lock = threading.Lock()      # serializes reloads/edits; readers never take it
+        self._pending = queue.SimpleQueue()     # (changed, table) pairs waiting for check()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if not os.path.exists(path):
+            self._write(roster.enemyDict)
+        self._stamp = None
+        self.current: Mapping[str, Mapping] = MappingProxyType({})
+        self.check()
+
+    # ------------------------- reading ----------------------------
+    def __getitem__(self, name: str) -> Mapping:
+        return self.current[name]
+
+    def __iter__(self):
+        return iter(self.current)
+
+    def subscribe(self, callback: Callable[[Set[str], Mapping], None]):
+        """``callback(changed_names, new_table)`` runs from ``check()`` after a reload changed something."""
+        self._subscribers.append(callback)
+
+    def check(self) -> Set[str]:
+        """Deliver changes to ``roster`` and the subscribers, on the calling thread.
+
+        Polls the file first unless the watcher thread is doing that. Returns
+        the monsters whose stats changed since the last ``check()``.
+        """
+        if self._thread is None:
+            self.reload()
+        changed: Set[str] = set()
+        table = None
+        while True:
+            try:
+                names, table = self._pending.get_nowait()
+            except queue.Empty:
+                break
+            changed |= names
+        if not changed:
+            return changed
+        if self.sync_roster:
+            for name in changed:
+                if name in table:
+                    roster.enemyDict[name] = dict(table[name])
+                else:
+                    roster.enemyDict.pop(name, None)
+        for callback in self._subscribers:
+            callback(changed, table)
+        return changed
+
+    def reload(self) -> Set[str]:
+        """Swap in a new snapshot if the file changed on disk and queue the change for ``check()``."""
+        try:
+            st = os.stat(self.path)
+        except OSError as e:
+            self.last_error = str(e)
+            return set()
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self._stamp:
+            return set()
+        with self._lock:
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    table = _validate(json.load(f))
+            except (OSError, ValueError) as e:
+                self.last_error = str(e)   # keep serving the old table
+                return set()
+            self._stamp = stamp
+            self.last_error = None
+            return self._swap(table)
+
+    def _swap(self, table: Dict[str, Mapping]) -> Set[str]:
+        old = self.current
+        changed = {n for n in set(old) | set(table) if old.get(n) != table.get(n)}
+        if not changed:
+            return changed
+        self.current = MappingProxyType(table)    # the atomic swap
+        self.reloads += 1
+        self._pending.put((changed, self.current))
+        return changed
+
+    # ------------------------- writing ----------------------------
+    def _write(self, table: Mapping):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({n: dict(b) for n, b in table.items()}, f, indent=4)
+        os.replace(tmp, self.path)
+
+    def edit(self, name: str, **stats) -> Set[str]:
+        """Change some of one monster's stats (or add it) and write the table back to the file."""
+        table = {n: dict(b) for n, b in self.current.items()}
+        table[name] = {**table.get(name, {}), **stats}
+        _validate({name: table[name]})
+        self._write(table)
+        self.reload()
+        return self.check()
+
+    # ------------------------- watching ---------------------------
+    def start(self, interval: float = 0.5):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def poll():
+            while not self._stop.wait(interval):
+                self.reload()
+
+        self._thread = threading.Thread(target=poll, name='live-bestiary', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Watch or edit the hot-reloadable enemy table")
+    ap.add_argument('--path', default=DEFAULT_PATH)
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    sub.add_parser('watch', help="print each change as the file is edited")
+    ed = sub.add_parser('edit', help="set one stat, e.g. edit Orc Damage 1d12+5")
+    ed.add_argument('name')
+    ed.add_argument('stat', choices=REQUIRED)
+    ed.add_argument('value')
+    args = ap.parse_args()
+
+    live = LiveBestiary(args.path)
+    if args.cmd == 'edit':
+        value = args.value if args.stat == 'Damage' else int(args.value)
+        print(live.current.get(args.name))
+        live.edit(args.name, **{args.stat: value})
+        print(live.current[args.name])
+        return
+
+    def report(changed, table):
+        for name in sorted(changed):
+            print(f"{time.strftime('%H:%M:%S')}  {name}: {dict(table[name]) if name in table else 'removed'}")
+
+    live.subscribe(report)
+    live.start()
+    print(f"watching {live.path} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+            live.check()
+            if live.last_error:
+                print(f"ignoring bad edit: {live.last_error}")
+                live.last_error = None
+    except KeyboardInterrupt:
+        live.stop()
+
+
+if __name__ == '__main__':
+    main()
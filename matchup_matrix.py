@@ -0,0 +1,145 @@
+"""
+Party-by-bestiary matchup matrix
+================================
+
+Evaluates every hero against every monster, fanning the pairings out over a
+process pool, and writes win-rate and expected-rounds matrices as CSV.
+
+Each pairing is cached on disk under a hash of both stat blocks and the rule
+settings (method, fight count, simulator version), so editing one monster
+only recomputes that monster's column on the next run; everything else is
+read back from ``.matchup_cache/``.
+
+Run:    python matchup_matrix.py                       (roster.py party vs enemies)
+        python matchup_matrix.py --party p.json --bestiary b.json --method exact
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from roster import enemyDict, partyDict
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.matchup_cache')
+SIM_VERSION = 2  # bump when combat rules change so old cache entries stop matching
+
+DEFAULT_SETTINGS = {'method': 'mc', 'fights': 200_000, 'version': SIM_VERSION}
+
+
+def pairing_key(hero: dict, monster: dict, settings: dict) -> str:
+    blob = json.dumps({'hero': hero, 'monster': monster, 'settings': settings}, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode('utf-8')).hexdigest()
+
+
+def cache_get(key: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(CACHE_DIR, f"{key}.json"), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def cache_put(key: str, value: dict):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f"{key}.json")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(value, f)
+    os.replace(tmp, path)
+
+
+def evaluate(hero: dict, monster: dict, settings: dict, key: str) -> dict:
+    """Work out one pairing. Runs in a worker process."""
+    if settings['method'] == 'exact':
+        from combat_exact import solve
+        r = solve(hero, monster)
+        return {'win': r.win_prob, 'rounds': r.mean_rounds}
+
+    import numpy as np
+    from combat_sim import simulate
+    # seed from the pairing hash so a cached and a recomputed entry agree
+    rng = np.random.default_rng(int(key[:16], 16))
+    r = simulate(hero, monster, settings['fights'], rng)
+    return {'win': r.win_prob, 'rounds': float(r.rounds.mean())}
+
+
+def _evaluate_and_store(args) -> Tuple[str, str, dict]:
+    hero_name, monster_name, hero, monster, settings, key = args
+    result = evaluate(hero, monster, settings, key)
+    cache_put(key, result)
+    return hero_name, monster_name, result
+
+
+def build_matrix(party: Dict[str, dict], bestiary: Dict[str, dict], settings: Optional[dict] = None,
+                 workers: Optional[int] = None) -> Tuple[Dict[Tuple[str, str], dict], int]:
+    """Return ({(hero, monster): {'win', 'rounds'}}, number of pairings recomputed)."""
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    results: Dict[Tuple[str, str], dict] = {}
+    todo = []
+    for hero_name, hero in party.items():
+        for monster_name, monster in bestiary.items():
+            key = pairing_key(hero, monster, settings)
+            cached = cache_get(key)
+            if cached is not None:
+                results[hero_name, monster_name] = cached
+            else:
+                todo.append((hero_name, monster_name, hero, monster, settings, key))
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for hero_name, monster_name, result in pool.map(_evaluate_and_store, todo, chunksize=4):
+                results[hero_name, monster_name] = result
+    return results, len(todo)
+
+
+def write_csv(path: str, results: Dict[Tuple[str, str], dict], field: str,
+              heroes, monsters):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        w = csv.writer(f)
+        w.writerow(['hero'] + list(monsters))
+        for h in heroes:
+            w.writerow([h] + [f"{results[h, m][field]:.6f}" for m in monsters])
+
+
+def _load_roster(path: Optional[str], default: Dict[str, dict]) -> Dict[str, dict]:
+    if not path:
+        return default
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Win-rate and expected-rounds matrix for every hero vs every monster")
+    ap.add_argument('--party', help="JSON file shaped like partyDict (default: roster.py)")
+    ap.add_argument('--bestiary', help="JSON file shaped like enemyDict (default: roster.py)")
+    ap.add_argument('--method', choices=('mc', 'exact'), default=DEFAULT_SETTINGS['method'])
+    ap.add_argument('--fights', type=int, default=DEFAULT_SETTINGS['fights'], help="fights per pairing (mc)")
+    ap.add_argument('--workers', type=int, help="process pool size (default: CPU count)")
+    ap.add_argument('--out', default='matchups', help="output prefix for <out>_win.csv and <out>_rounds.csv")
+    args = ap.parse_args()
+
+    party = _load_roster(args.party, partyDict)
+    bestiary = _load_roster(args.bestiary, enemyDict)
+    settings = {'method': args.method, 'fights': args.fights if args.method == 'mc' else 0}
+
+    start = time.perf_counter()
+    results, computed = build_matrix(party, bestiary, settings, args.workers)
+    elapsed = time.perf_counter() - start
+
+    write_csv(f"{args.out}_win.csv", results, 'win', party, bestiary)
+    write_csv(f"{args.out}_rounds.csv", results, 'rounds', party, bestiary)
+
+    width = max(len(m) for m in bestiary) + 2
+    print("win rate".ljust(14) + "".join(m.rjust(width) for m in bestiary))
+    for h in party:
+        print(h.ljust(14) + "".join(f"{results[h, m]['win']:.3f}".rjust(width) for m in bestiary))
+    print(f"{len(results)} pairings, {computed} recomputed, {elapsed:.2f}s -> {args.out}_win.csv, {args.out}_rounds.csv")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Tiny 5x7 pixel font
+===================
+
+``PIX_FONT`` glyphs and ``blit_pix_text``, shared by the blackjack table and
+the battle viewer. Each glyph is 7 rows of 5 columns as strings of 0/1;
+characters without a glyph render as a blank space.
+"""
+
+from typing import Tuple
+
+import pygame
+
+BLACK = (12, 12, 12)
+
+PIX_FONT = {
+    'A': ["01110","10001","10001","11111","10001","10001","10001"],
+    'B': ["11110","10001","10001","11110","10001","10001","11110"],
+    'C': ["01110","10001","10000","10000","10000","10001","01110"],
+    'D': ["11100","10010","10001","10001","10001","10010","11100"],
+    'E': ["11111","10000","10000","11110","10000","10000","11111"],
+    'F': ["11111","10000","10000","11110","10000","10000","10000"],
+    'G': ["01110","10001","10000","10111","10001","10001","01111"],
+    'H': ["10001","10001","10001","11111","10001","10001","10001"],
+    'I': ["01110","00100","00100","00100","00100","00100","01110"],
+    'J': ["00111","00001","00001","00001","10001","10001","01110"],
+    'K': ["10001","10010","11100","10010","10001","10001","10001"],
+    'L': ["10000","10000","10000","10000","10000","10000","11111"],
+    'M': ["10001","11011","10101","10101","10001","10001","10001"],
+    'N': ["10001","11001","10101","10011","10001","10001","10001"],
+    'O': ["01110","10001","10001","10001","10001","10001","01110"],
+    'P': ["11110","10001","10001","11110","10000","10000","10000"],
+    'Q': ["01110","10001","10001","10101","10011","01111","00001"],
+    'R': ["11110","10001","10001","11110","10100","10010","10001"],
+    'S': ["01111","10000","10000","01110","00001","00001","11110"],
+    'T': ["11111","00100","00100","00100","00100","00100","00100"],
+    'U': ["10001","10001","10001","10001","10001","10001","01110"],
+    'V': ["10001","10001","10001","10001","10001","01010","00100"],
+    'W': ["10001","10001","10001","10101","10101","10101","01010"],
+    'X': ["10001","10001","01010","00100","01010","10001","10001"],
+    'Y': ["10001","10001","01010","00100","00100","00100","00100"],
+    'Z': ["11111","00001","00010","00100","01000","10000","11111"],
+    '0': ["01110","10001","10011","10101","11001","10001","01110"],
+    '1': ["00100","01100","00100","00100","00100","00100","01110"],
+    '2': ["01110","10001","00001","00010","00100","01000","11111"],
+    '3': ["11110","00001","00001","01110","00001","00001","11110"],
+    '4': ["00010","00110","01010","10010","11111","00010","00010"],
+    '5': ["11111","10000","11110","00001","00001","10001","01110"],
+    '6': ["00110","01000","10000","11110","10001","10001","01110"],
+    '7': ["11111","00001","00010","00100","01000","01000","01000"],
+    '8': ["01110","10001","10001","01110","10001","10001","01110"],
+    '9': ["01110","10001","10001","01111","00001","00010","11100"],
+    ':': ["00000","00100","00100","00000","00100","00100","00000"],
+    '.': ["00000","00000","00000","00000","00000","01100","01100"],
+    '-': ["00000","00000","00000","11111","00000","00000","00000"],
+    '/': ["00001","00010","00010","00100","01000","01000","10000"],
+    '%': ["11001","11010","00010","00100","01000","01011","10011"],
+    '!': ["00100","00100","00100","00100","00100","00000","00100"],
+}
+
+
+def blit_pix_text(surface: pygame.Surface, text: str, pos: Tuple[int, int], color=BLACK, scale=2):
+    x, y = pos
+    for ch in text:
+        glyph = PIX_FONT.get(ch.upper())
+        if glyph is None:
+            x += 6 * scale
+            continue
+        for row, row_bits in enumerate(glyph):
+            for col, bit in enumerate(row_bits):
+                if bit == '1':
+                    pygame.draw.rect(surface, color, (x + col*scale, y + row*scale, scale, scale))
+        x += (5 + 1) * scale  # 1px gap
+
+
+def pix_text_width(text: str, scale=2) -> int:
+    return len(text) * 6 * scale
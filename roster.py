@@ -0,0 +1,77 @@
+"""
+Party and bestiary stat blocks
+==============================
+
+The Semester Project 1 dictionaries, importable from anywhere. ``"Damage"`` is
+a dice expression (see ``dice.py``) rolled fresh on every hit, not a number
+rolled once when the dict is built.
+"""
+
+partyDict = {
+    "LaeZel": {
+        "HP": 48,
+        "Init": 1,
+        "AC": 17,
+        "AtkMod": 6,
+        "Damage": "2d6+3",
+    },
+    "Shadowheart": {
+        "HP": 40,
+        "Init": 1,
+        "AC": 18,
+        "AtkMod": 4,
+        "Damage": "1d6+3",
+    },
+    "Gale": {
+        "HP": 32,
+        "Init": 1,
+        "AC": 14,
+        "AtkMod": 6,
+        "Damage": "2d10",
+    },
+    "Astarion": {
+        "HP": 40,
+        "Init": 3,
+        "AC": 14,
+        "AtkMod": 5,
+        "Damage": "1d8+1d6+4",
+    }
+}
+
+enemyDict = {
+    "Goblin": {
+        "HP": 7,
+        "Init": 0,
+        "AC": 12,
+        "AtkMod": 4,
+        "Damage": "1d6+2",
+    },
+    "Orc": {
+        "HP": 15,
+        "Init": 1,
+        "AC": 13,
+        "AtkMod": 5,
+        "Damage": "1d12+3",
+    },
+    "Troll": {
+        "HP": 84,
+        "Init": 1,
+        "AC": 15,
+        "AtkMod": 7,
+        "Damage": "2d6+4",
+    },
+    "Mindflayer": {
+        "HP": 71,
+        "Init": 1,
+        "AC": 15,
+        "AtkMod": 7,
+        "Damage": "2d10+4",
+    },
+    "Dragon": {
+        "HP": 127,
+        "Init": 2,
+        "AC": 18,
+        "AtkMod": 7,
+        "Damage": "2d10+1d8+4",
+    },
+}
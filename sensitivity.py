@@ -0,0 +1,149 @@
+"""
+Stat sensitivity with common random numbers
+===========================================
+
+"How much does +1 AC on Shadowheart change her win rate against the Orc?"
+
+Each question is answered by running the same N duels twice — baseline and
+with one stat changed — on the *same dice*: fight i's initiative rolls,
+d20s and damage rolls in round r come from a stream seeded by (seed, r), and
+damage is drawn by inverting the exact damage distribution with a shared
+uniform, so even a change of dice (1d6 → 1d8) keeps the rolls paired. Only
+fights the change actually flips contribute to the difference, so the
+estimate's variance is several to a hundred times smaller than comparing two
+independent runs of the same size (the report prints the factor).
+
+Changes are ``(side, stat, delta)`` with side ``'hero'`` or ``'monster'``
+and stat one of HP, AC, AtkMod, Init (``delta`` added) or Damage (``delta``
+a new dice expression, or an int added as a flat bonus).
+
+Rules as in ``combat_sim``: d20 + Init initiative (hero wins ties), d20 +
+AtkMod vs AC, natural 20 double damage, natural 1 miss.
+
+Run:    python sensitivity.py Shadowheart Orc --fights 200000
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from math import sqrt
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+from dice import as_dice
+from roster import enemyDict, partyDict
+
+Change = Tuple[str, str, Union[int, str]]
+
+DEFAULT_CHANGES: List[Change] = [
+    (side, stat, delta)
+    for side in ('hero', 'monster')
+    for stat, delta in (('HP', 5), ('AC', 1), ('AtkMod', 1), ('Init', 1), ('Damage', 1))
+]
+
+
+@dataclass
+class SensitivityResult:
+    side: str
+    stat: str
+    delta: Union[int, str]
+    base_p: float
+    new_p: float
+    effect: float          # new_p - base_p
+    ci: float              # 95% half-width with common random numbers
+    independent_ci: float  # what two independent runs of the same size would give
+
+    @property
+    def variance_reduction(self) -> float:
+        return (self.independent_ci / self.ci) ** 2 if self.ci else float('inf')
+
+
+def perturb(stats: dict, stat: str, delta: Union[int, str]) -> dict:
+    out = dict(stats)
+    if stat == 'Damage':
+        out['Damage'] = delta if isinstance(delta, str) else f"{as_dice(stats['Damage']).expr}{delta:+d}"
+    else:
+        out[stat] = stats[stat] + delta
+    return out
+
+
+def _inverse_cdf(damage) -> Tuple[np.ndarray, np.ndarray]:
+    dist = sorted(as_dice(damage).distribution().items())
+    values = np.maximum(np.array([v for v, _ in dist], dtype=np.int64), 0)   # a hit never heals
+    cdf = np.cumsum([p for _, p in dist])
+    cdf[-1] = 1.0
+    return values, cdf
+
+
+def duel_wins(hero: dict, monster: dict, n: int, seed: int = 0, max_rounds: int = 1000) -> np.ndarray:
+    """Whether the hero wins each of ``n`` duels, with dice fixed by ``seed`` (common random numbers)."""
+    h_vals, h_cdf = _inverse_cdf(hero['Damage'])
+    m_vals, m_cdf = _inverse_cdf(monster['Damage'])
+
+    rng = np.random.default_rng([seed, 0])
+    hero_first = rng.integers(1, 21, size=n) + hero['Init'] >= rng.integers(1, 21, size=n) + monster['Init']
+    hero_hp = np.full(n, hero['HP'], dtype=np.int64)
+    monster_hp = np.full(n, monster['HP'], dtype=np.int64)
+
+    for rnd in range(1, max_rounds + 1):
+        active = (hero_hp > 0) & (monster_hp > 0)
+        if not active.any():
+            break
+        # every fight draws this round's dice, finished or not, so fight i always sees the same numbers
+        rng = np.random.default_rng([seed, rnd])
+        h_nat, m_nat = rng.integers(1, 21, size=(2, n))
+        h_u, m_u = rng.random(size=(2, n))
+
+        h_hit = (h_nat == 20) | ((h_nat != 1) & (h_nat + hero['AtkMod'] >= monster['AC']))
+        m_hit = (m_nat == 20) | ((m_nat != 1) & (m_nat + monster['AtkMod'] >= hero['AC']))
+        h_dmg = np.where(h_hit, h_vals[np.searchsorted(h_cdf, h_u)] * np.where(h_nat == 20, 2, 1), 0)
+        m_dmg = np.where(m_hit, m_vals[np.searchsorted(m_cdf, m_u)] * np.where(m_nat == 20, 2, 1), 0)
+
+        # first mover strikes; the other answers only if still standing
+        monster_hp -= np.where(active & hero_first, h_dmg, 0)
+        hero_hp -= np.where(active & ~hero_first & (monster_hp > 0), m_dmg, 0)
+        hero_hp -= np.where(active & hero_first & (monster_hp > 0), m_dmg, 0)
+        monster_hp -= np.where(active & ~hero_first & (hero_hp > 0), h_dmg, 0)
+    return monster_hp <= 0
+
+
+def sensitivity(hero: dict, monster: dict, changes: Sequence[Change] = DEFAULT_CHANGES,
+                n: int = 100_000, seed: int = 0) -> List[SensitivityResult]:
+    base = duel_wins(hero, monster, n, seed)
+    base_p = float(base.mean())
+    results = []
+    for side, stat, delta in changes:
+        h = perturb(hero, stat, delta) if side == 'hero' else hero
+        m = perturb(monster, stat, delta) if side == 'monster' else monster
+        new = duel_wins(h, m, n, seed)
+        new_p = float(new.mean())
+        diff = new.astype(np.int8) - base.astype(np.int8)
+        ci = 1.96 * float(diff.std(ddof=1)) / sqrt(n)
+        independent = 1.96 * sqrt((base_p * (1 - base_p) + new_p * (1 - new_p)) / n)
+        results.append(SensitivityResult(side, stat, delta, base_p, new_p, new_p - base_p, ci, independent))
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Win-probability sensitivity to each stat, using common random numbers")
+    ap.add_argument('hero', choices=sorted(partyDict))
+    ap.add_argument('monster', choices=sorted(enemyDict))
+    ap.add_argument('--fights', type=int, default=200_000)
+    ap.add_argument('--seed', type=int, default=0)
+    args = ap.parse_args()
+
+    start = time.perf_counter()
+    results = sensitivity(partyDict[args.hero], enemyDict[args.monster], n=args.fights, seed=args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"{args.hero} vs {args.monster}: base win probability {results[0].base_p:.4f} "
+          f"({args.fights:,} fights per variant, {elapsed:.1f}s)")
+    for r in results:
+        who = args.hero if r.side == 'hero' else args.monster
+        change = f"{r.stat} {r.delta:+d}" if isinstance(r.delta, int) else f"{r.stat} -> {r.delta}"
+        print(f"  {who:12s} {change:16s} {r.effect:+.4f} ± {r.ci:.4f}   "
+              f"(independent runs ± {r.independent_ci:.4f}, {r.variance_reduction:.0f}x less variance)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Simulation clock
+================
+
+Timed combat loops ``await clock.sleep(seconds)`` instead of calling
+``time.sleep``, so the same loop can run
+
+• ``SimClock.realtime()``         — at wall-clock speed, for presentation
+• ``SimClock.accelerated(10)``    — ten times faster than real time
+• ``SimClock.instant()``          — in virtual time: no waiting at all, but
+  sleepers still wake in timestamp order, so interleaving is the same as it
+  would be in real time
+
+Every loop shares one asyncio event loop, so a warrior taking damage and a
+healer healing on their own timers run side by side instead of one blocking
+the other:
+
+    clock = SimClock.instant()
+    clock.run(warrior_ticks(clock), healer_ticks(clock))
+    clock.now()     # virtual seconds elapsed
+
+In instant mode the clock advances only once every task started with
+``clock.spawn``/``clock.run`` is waiting on it, so tasks must not block on
+anything else (other awaits that complete straight away are fine).
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+from typing import Awaitable, List, Optional, Tuple
+
+
+class SimClock:
+    def __init__(self, speed: float = 1.0):
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.speed = speed
+        self._now = 0.0              # virtual seconds (instant mode)
+        self._origin: Optional[float] = None
+        self._sleepers: List[Tuple[float, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._active = 0
+
+    @classmethod
+    def realtime(cls) -> 'SimClock':
+        return cls(1.0)
+
+    @classmethod
+    def accelerated(cls, factor: float) -> 'SimClock':
+        return cls(factor)
+
+    @classmethod
+    def instant(cls) -> 'SimClock':
+        return cls(math.inf)
+
+    @property
+    def is_instant(self) -> bool:
+        return self.speed == math.inf
+
+    def now(self) -> float:
+        """Simulated seconds since the clock started."""
+        if self.is_instant or self._origin is None:
+            return self._now
+        return (asyncio.get_running_loop().time() - self._origin) * self.speed
+
+    async def sleep(self, seconds: float):
+        if not self.is_instant:
+            if self._origin is None:
+                self._origin = asyncio.get_running_loop().time()
+            await asyncio.sleep(seconds / self.speed)
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self._now + max(seconds, 0.0), next(self._seq), fut))
+        self._maybe_advance()
+        await fut
+
+    # ------------------------- tasks ------------------------------
+    def spawn(self, coro: Awaitable) -> asyncio.Task:
+        """Start a task the clock knows about (needed for instant mode to know when all are waiting)."""
+        self._active += 1
+        task = asyncio.ensure_future(coro)
+        task.add_done_callback(self._finished)
+        return task
+
+    def _finished(self, task: asyncio.Task):
+        self._active -= 1
+        self._maybe_advance()
+
+    def _maybe_advance(self):
+        # every task is parked on the clock: jump to the earliest wake-up and release it
+        if self.is_instant and self._sleepers and len(self._sleepers) >= self._active:
+            when, _, fut = heapq.heappop(self._sleepers)
+            self._now = max(self._now, when)
+            if not fut.done():
+                fut.set_result(None)
+
+    async def gather(self, *coros: Awaitable) -> list:
+        return await asyncio.gather(*(self.spawn(c) for c in coros))
+
+    def run(self, *coros: Awaitable) -> list:
+        """Run coroutines side by side on a fresh event loop; returns their results."""
+        self._origin = None
+        return asyncio.run(self.gather(*coros))
@@ -0,0 +1,99 @@
+"""
+Area-of-effect spells
+=====================
+
+Fireball-style spells against a ``creatures.Roster``: every target rolls a
+d20 saving throw against the caster's DC and takes full damage on a failure
+or half (rounded down) on a success. The whole area resolves in one NumPy
+pass — one d20 array, one comparison, one scatter into the HP column —
+instead of a Python loop per target.
+
+Each spell names the ability its save uses (Cone of Cold is a Constitution
+save, the rest Dexterity), but stat blocks carry no save bonuses at all. As a
+simplification every save rolls with the creature's Init modifier (its Dex
+modifier) unless ``save_mods`` is passed explicitly — pass them for non-Dex
+saves when the numbers matter. Creatures already dead are skipped, along
+with their entries in ``save_mods``. Caster DC is 8 + AtkMod.
+
+    roster = Roster()
+    goblins = roster.add(enemyDict["Goblin"], 10_000, kind="Goblin")
+    result = cast(roster, FIREBALL, goblins, spell_dc(partyDict["Gale"]), rng)
+    result.killed   # indices of goblins dropped by the blast
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from creatures import Roster
+from dice import as_dice
+
+
+@dataclass(frozen=True)
+class Spell:
+    name: str
+    damage: str
+    half_on_save: bool = True
+    save: str = 'DEX'
+    per_target_rolls: bool = False   # 5e rolls once for everyone; set for a fresh roll per target
+
+
+FIREBALL = Spell("Fireball", "8d6")
+CONE_OF_COLD = Spell("Cone of Cold", "8d8", save='CON')
+BURNING_HANDS = Spell("Burning Hands", "3d6")
+LIGHTNING_BOLT = Spell("Lightning Bolt", "8d6")
+SPELLS = {s.name: s for s in (FIREBALL, CONE_OF_COLD, BURNING_HANDS, LIGHTNING_BOLT)}
+
+
+@dataclass
+class AoEResult:
+    targets: np.ndarray     # roster indices that were in the area
+    saved: np.ndarray       # bool per target
+    damage: np.ndarray      # damage dealt per target
+    killed: np.ndarray      # roster indices that were alive before and are dead now
+
+    @property
+    def total_damage(self) -> int:
+        return int(self.damage.sum())
+
+
+def spell_dc(stats: dict) -> int:
+    return 8 + stats['AtkMod']
+
+
+def cast(roster: Roster, spell: Spell, targets, dc: int, rng: Optional[np.random.Generator] = None,
+         save_mods: Optional[np.ndarray] = None) -> AoEResult:
+    """Resolve ``spell`` against every living creature in ``targets`` and apply the damage.
+
+    ``save_mods``, if given, lines up with ``targets``; entries for dead targets are dropped too.
+
+    >>> from roster import enemyDict
+    >>> roster = Roster()
+    >>> goblins = roster.add(enemyDict["Goblin"], 10, kind="Goblin")
+    >>> roster.apply_damage(goblins[:3], 1000)
+    >>> result = cast(roster, FIREBALL, goblins, 15, np.random.default_rng(0), save_mods=np.zeros(10))
+    >>> len(result.targets), len(result.saved)
+    (7, 7)
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    targets = np.asarray(targets, dtype=np.int64)
+    alive = roster.hp[targets] > 0
+    targets = targets[alive]
+    if save_mods is not None:
+        save_mods = np.asarray(save_mods)[alive]
+    n = len(targets)
+
+    dice = as_dice(spell.damage)
+    if spell.per_target_rolls:
+        full = dice.roll_many(n, rng)
+    else:
+        full = np.full(n, dice.roll_many(1, rng)[0], dtype=np.int64)
+
+    mods = roster.data['init_mod'][targets] if save_mods is None else save_mods
+    saved = rng.integers(1, 21, size=n) + mods >= dc
+    damage = np.where(saved, full // 2 if spell.half_on_save else 0, full)
+
+    roster.apply_damage(targets, damage)
+    killed = targets[roster.hp[targets] <= 0]
+    return AoEResult(targets, saved, damage, killed)
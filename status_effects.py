@@ -0,0 +1,260 @@
+"""
+Status effects
+==============
+
+Timed conditions on combatants — poisoned, stunned, regeneration, and N-round
+buffs or debuffs to AC, AtkMod and damage.
+
+Timing runs on a hierarchical timing wheel (``TimingWheel``): scheduling is
+O(1), and advancing a round only touches the slot for that round, so
+thousands of long-running buffs cost nothing until the round they expire.
+Effects that do something every round (poison, regeneration) reschedule
+their own next tick.
+
+Each creature's effects are folded into a cached ``Modifiers`` record that
+is updated when an effect starts or ends, never on a roll, so attack code
+just reads ``board.mods(c).ac`` and friends.
+
+    board = StatusBoard()
+    board.apply(troll, poisoned(3, "1d6"))
+    board.apply(laezel, buff("Bless", 10, atk_mod=2))
+    hurt = board.advance(round_number)   # fires ticks and expiries due this round
+
+Effects are indexed by creature, then by name: applying one that is already
+active refreshes its duration instead of stacking, and listing or clearing a
+creature's effects (on death, say) only touches that creature's own.
+"""
+
+import itertools
+import random
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List
+
+from combat_events import DAMAGE, EFFECT_END, EFFECT_START, HEAL, NORMAL, NULL_SINK, CombatEvent
+from dice import as_dice
+
+POISONED = 'poisoned'
+STUNNED = 'stunned'
+REGENERATION = 'regeneration'
+BUFF = 'buff'
+
+
+class TimingWheel:
+    """Hierarchical timing wheel over integer ticks (rounds).
+
+    Level ``L`` has ``slots`` buckets each covering ``slots ** L`` ticks. An
+    item goes in the lowest level whose span still contains both ``now`` and
+    its due tick; when a level's slot comes up its items cascade down a level.
+    """
+
+    def __init__(self, bits: int = 6, levels: int = 4, now: int = 0):
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+        self.levels = levels
+        self.now = now
+        self._wheels = [[[] for _ in range(1 << bits)] for _ in range(levels)]
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def schedule(self, when: int, item):
+        when = max(when, self.now + 1)
+        self._place(when, item)
+        self._count += 1
+
+    def _place(self, when: int, item):
+        level = 0
+        while level < self.levels - 1 and (when >> (self.bits * (level + 1))) != (self.now >> (self.bits * (level + 1))):
+            level += 1
+        self._wheels[level][(when >> (self.bits * level)) & self.mask].append((when, item))
+
+    def tick(self) -> List:
+        """Advance one tick and return the items due on it."""
+        self.now += 1
+        for level in range(self.levels - 1, 0, -1):
+            if self.now & ((1 << (self.bits * level)) - 1) == 0:
+                slot = (self.now >> (self.bits * level)) & self.mask
+                bucket, self._wheels[level][slot] = self._wheels[level][slot], []
+                for when, item in bucket:
+                    self._place(when, item)
+        slot = self.now & self.mask
+        bucket, self._wheels[0][slot] = self._wheels[0][slot], []
+        due, keep = [], []
+        for when, item in bucket:
+            (due if when == self.now else keep).append((when, item))
+        # only past-the-top-level items can land here early
+        self._wheels[0][slot] = keep
+        self._count -= len(due)
+        return [item for _, item in due]
+
+    def advance_to(self, now: int) -> List:
+        due = []
+        while self.now < now:
+            due += self.tick()
+        return due
+
+
+@dataclass(eq=False)
+class Effect:
+    name: str
+    kind: str
+    rounds: int
+    ac: int = 0
+    atk_mod: int = 0
+    damage: int = 0
+    per_round: str = ''       # dice for poison damage / regeneration healing each round
+    # filled in by StatusBoard.apply
+    target: Hashable = None
+    expires: int = 0
+    active: bool = False
+    id: int = field(default=0, repr=False)
+
+
+def poisoned(rounds: int, damage: str = "1d4", atk_mod: int = -2) -> Effect:
+    return Effect(POISONED, POISONED, rounds, atk_mod=atk_mod, per_round=damage)
+
+
+def stunned(rounds: int = 1) -> Effect:
+    return Effect(STUNNED, STUNNED, rounds)
+
+
+def regeneration(rounds: int, healing: str = "1d6") -> Effect:
+    return Effect(REGENERATION, REGENERATION, rounds, per_round=healing)
+
+
+def buff(name: str, rounds: int, ac: int = 0, atk_mod: int = 0, damage: int = 0) -> Effect:
+    """Any AC / AtkMod / flat damage change; use negative numbers for debuffs."""
+    return Effect(name, BUFF, rounds, ac=ac, atk_mod=atk_mod, damage=damage)
+
+
+class Modifiers:
+    """Sum of a creature's active effects, kept up to date as they start and end."""
+    __slots__ = ('ac', 'atk_mod', 'damage', 'stunned', 'effects')
+
+    def __init__(self):
+        self.effects = 0
+        self.ac = 0
+        self.atk_mod = 0
+        self.damage = 0
+        self.stunned = 0
+
+    def add(self, e: Effect, sign: int):
+        self.effects += sign
+        self.ac += sign * e.ac
+        self.atk_mod += sign * e.atk_mod
+        self.damage += sign * e.damage
+        if e.kind == STUNNED:
+            self.stunned += sign
+
+    def __repr__(self):
+        return f"Modifiers(ac={self.ac}, atk_mod={self.atk_mod}, damage={self.damage}, stunned={self.stunned})"
+
+
+NO_MODS = Modifiers()   # shared, never mutated: returned for creatures without effects
+
+
+class StatusBoard:
+    def __init__(self, now: int = 0, rng=None, events=NULL_SINK):
+        self.wheel = TimingWheel(now=now)
+        self.rng = rng or random.Random()
+        self.events = events
+        self._mods: Dict[Hashable, Modifiers] = {}
+        self._by_target: Dict[Hashable, Dict[str, Effect]] = {}   # target -> effect name -> active effect
+        self._ids = itertools.count(1)
+
+    @property
+    def now(self) -> int:
+        return self.wheel.now
+
+    def mods(self, target) -> Modifiers:
+        return self._mods.get(target, NO_MODS)
+
+    def effects_on(self, target) -> List[Effect]:
+        return list(self._by_target.get(target, {}).values())
+
+    def apply(self, target, effect: Effect) -> Effect:
+        """Start ``effect`` on ``target`` for ``effect.rounds`` rounds from now (or refresh it)."""
+        on_target = self._by_target.get(target)
+        existing = on_target.get(effect.name) if on_target else None
+        expires = self.now + effect.rounds
+        if existing is not None:
+            if expires > existing.expires:
+                existing.expires = expires
+                self.wheel.schedule(expires, ('end', existing))
+            return existing
+        effect.target = target
+        effect.expires = expires
+        effect.active = True
+        effect.id = next(self._ids)
+        if on_target is None:
+            on_target = self._by_target[target] = {}
+        on_target[effect.name] = effect
+        mods = self._mods.get(target)
+        if mods is None:
+            mods = self._mods[target] = Modifiers()
+        mods.add(effect, +1)
+        self.wheel.schedule(expires, ('end', effect))
+        if effect.per_round:
+            self.wheel.schedule(self.now + 1, ('tick', effect))
+        if self.events.level >= NORMAL:
+            self.events.emit(CombatEvent(EFFECT_START, self.now, effect.name, _name(target), effect.rounds))
+        return effect
+
+    def remove(self, effect: Effect):
+        """End an effect early (dispelled, cured); its queued wheel entries go stale."""
+        if not effect.active:
+            return
+        effect.active = False
+        on_target = self._by_target[effect.target]
+        del on_target[effect.name]
+        if not on_target:
+            del self._by_target[effect.target]
+        mods = self._mods.get(effect.target)
+        if mods is not None:
+            mods.add(effect, -1)
+            if not mods.effects:
+                del self._mods[effect.target]
+        if self.events.level >= NORMAL:
+            self.events.emit(CombatEvent(EFFECT_END, self.now, effect.name, _name(effect.target)))
+
+    def clear(self, target):
+        for e in self.effects_on(target):
+            self.remove(e)
+
+    def advance(self, now: int) -> List:
+        """Run every tick and expiry up to round ``now``; returns targets whose HP changed."""
+        hurt = []
+        while self.wheel.now < now:
+            due = self.wheel.tick()
+            # damage and healing land before effects run out on the same round
+            due.sort(key=lambda d: d[0] != 'tick')
+            for what, e in due:
+                if not e.active:
+                    continue
+                if what == 'end':
+                    if e.expires == self.now:
+                        self.remove(e)
+                    continue
+                self._tick(e)
+                hurt.append(e.target)
+                if self.now < e.expires:
+                    self.wheel.schedule(self.now + 1, ('tick', e))
+        return hurt
+
+    def _tick(self, e: Effect):
+        t = e.target
+        amount = as_dice(e.per_round).roll(self.rng)
+        if e.kind == REGENERATION:
+            before = t.hp
+            t.hp = min(t.max_hp, t.hp + amount)
+            if self.events.level >= NORMAL:
+                self.events.emit(CombatEvent(HEAL, self.now, e.name, _name(t), t.hp - before, t.hp))
+        else:
+            t.hp -= amount
+            if self.events.level >= NORMAL:
+                self.events.emit(CombatEvent(DAMAGE, self.now, e.name, _name(t), amount, t.hp))
+
+
+def _name(target) -> str:
+    return getattr(target, 'name', str(target))
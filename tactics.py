@@ -0,0 +1,329 @@
+"""
+Expectimax tactical AI
+======================
+
+Picks each combatant's action instead of always "attack the one enemy":
+
+• ``('attack', j)`` — d20 + AtkMod vs AC (natural 20 double damage, natural 1 miss)
+• ``('heal', j)``   — HW21's HealLoop: +30 HP up to max, for units with heals left
+• ``('defend',)``   — +2 AC until the unit's next turn
+
+The search alternates max nodes (party), min nodes (enemies) and chance
+nodes (the d20, then the damage roll, condensed to a few equal-probability
+buckets) to a bounded depth. Positions are compact ``TacticalState`` tuples —
+HP per unit, a defending bitmask, heals left, whose turn — so the
+transposition table can key on them directly and reuse evaluations between
+branches and between decisions.
+
+Each decision runs iterative deepening under a time budget and returns the
+best action of the deepest search that finished, so large encounters stay
+interactive.
+
+Run:    python tactics.py --heroes LaeZel Shadowheart --monsters Orc:2 Goblin:2 --healer Shadowheart
+"""
+
+import argparse
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from combat_events import CRIT, DEATH, DEFEND, HEAL, HIT, MISS, NORMAL, NULL_SINK, SUMMARY, CombatEvent, TextSink
+from dice import Dice, as_dice
+from roster import enemyDict, partyDict
+
+PARTY_SIDE, ENEMY_SIDE = 0, 1
+
+HEAL_AMOUNT = 30     # HW21 HealLoop
+HEAL_USES = 2
+DEFEND_BONUS = 2
+WIN_SCORE = 100.0
+
+Action = Tuple  # ('attack', j) | ('heal', j) | ('defend',)
+
+
+@dataclass(frozen=True)
+class Unit:
+    name: str
+    side: int
+    max_hp: int
+    ac: int
+    atk_mod: int
+    init_mod: int
+    damage: Dice
+    heal: int = 0
+    heals: int = 0
+
+    @classmethod
+    def from_stats(cls, name: str, stats: dict, side: int, heals: int = 0, heal: int = HEAL_AMOUNT) -> 'Unit':
+        return cls(name, side, stats['HP'], stats['AC'], stats['AtkMod'], stats['Init'],
+                   as_dice(stats['Damage']), heal if heals else 0, heals)
+
+
+class TacticalState(NamedTuple):
+    hp: Tuple[int, ...]
+    defending: int          # bit i set while unit i is defending
+    heals: Tuple[int, ...]
+    turn: int               # position in the initiative order
+
+
+@dataclass
+class Decision:
+    action: Action
+    value: float            # expected score from the party's point of view
+    depth: int              # deepest search that finished
+    nodes: int
+    seconds: float
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+def damage_buckets(dice: Dice, buckets: int) -> List[Tuple[float, int]]:
+    """Condense a damage distribution into ``buckets`` (probability, rounded mean) pairs."""
+    outcomes = sorted(dice.distribution().items())
+    out, mass, total, edge = [], 0.0, 0.0, 1.0 / buckets
+    for value, p in outcomes:
+        value = max(value, 0)   # a hit never heals
+        while p > 1e-12:
+            take = min(p, edge - mass)
+            mass += take
+            total += take * value
+            p -= take
+            if mass >= edge - 1e-12:
+                out.append((mass, round(total / mass)))
+                mass = total = 0.0
+    if mass > 1e-9:
+        out.append((mass, round(total / mass)))
+    return out
+
+
+class TacticalAI:
+    def __init__(self, units: Sequence[Unit], order: Sequence[int], max_depth: int = 8,
+                 time_budget: float = 0.05, buckets: int = 3, table_size: int = 1_000_000):
+        self.units = list(units)
+        self.order = list(order)
+        self.max_depth = max_depth
+        self.time_budget = time_budget
+        self.table_size = table_size
+        self.table: Dict[TacticalState, Tuple[int, float]] = {}   # state -> (depth searched, value)
+        self._damage = []   # per unit: (normal hit buckets, natural-20 buckets at double damage)
+        for u in self.units:
+            normal = damage_buckets(u.damage, buckets)
+            self._damage.append((normal, [(p, 2 * d) for p, d in normal]))
+        self._nodes = 0
+        self._deadline = None
+
+    # ------------------------- rules ------------------------------
+    def start(self) -> TacticalState:
+        return TacticalState(tuple(u.max_hp for u in self.units), 0, tuple(u.heals for u in self.units), 0)
+
+    def actor(self, state: TacticalState) -> int:
+        return self.order[state.turn]
+
+    def winner(self, state: TacticalState) -> Optional[int]:
+        alive = {PARTY_SIDE: False, ENEMY_SIDE: False}
+        for u, hp in zip(self.units, state.hp):
+            if hp > 0:
+                alive[u.side] = True
+        if not alive[ENEMY_SIDE]:
+            return PARTY_SIDE
+        if not alive[PARTY_SIDE]:
+            return ENEMY_SIDE
+        return None
+
+    def actions(self, state: TacticalState) -> List[Action]:
+        a = self.actor(state)
+        me = self.units[a]
+        acts: List[Action] = [('attack', j) for j, u in enumerate(self.units)
+                              if u.side != me.side and state.hp[j] > 0]
+        if state.heals[a]:
+            acts += [('heal', j) for j, u in enumerate(self.units)
+                     if u.side == me.side and 0 < state.hp[j] < u.max_hp]
+        acts.append(('defend',))
+        return acts
+
+    def _advance(self, hp, defending, heals, turn) -> TacticalState:
+        n = len(self.order)
+        for _ in range(n):
+            turn = (turn + 1) % n
+            if hp[self.order[turn]] > 0:
+                break
+        return TacticalState(hp, defending, heals, turn)
+
+    def outcomes(self, state: TacticalState, action: Action) -> List[Tuple[float, TacticalState]]:
+        """Every chance outcome of ``action`` as (probability, next state)."""
+        a = self.actor(state)
+        me = self.units[a]
+        defending = state.defending & ~(1 << a)
+        kind = action[0]
+        if kind == 'defend':
+            return [(1.0, self._advance(state.hp, defending | (1 << a), state.heals, state.turn))]
+        j = action[1]
+        if kind == 'heal':
+            hp = list(state.hp)
+            hp[j] = min(self.units[j].max_hp, hp[j] + me.heal)
+            heals = list(state.heals)
+            heals[a] -= 1
+            return [(1.0, self._advance(tuple(hp), defending, tuple(heals), state.turn))]
+
+        ac = self.units[j].ac + (DEFEND_BONUS if state.defending >> j & 1 else 0)
+        p_hit = sum(1 for nat in range(2, 20) if nat + me.atk_mod >= ac) / 20
+        p_crit = 1 / 20
+        out = [(1 - p_hit - p_crit, self._advance(state.hp, defending, state.heals, state.turn))]
+        normal, crit = self._damage[a]
+        for p_roll, table in ((p_hit, normal), (p_crit, crit)):
+            if p_roll <= 0:
+                continue
+            for p, dmg in table:
+                hp = list(state.hp)
+                hp[j] = max(0, hp[j] - dmg)
+                out.append((p_roll * p, self._advance(tuple(hp), defending, state.heals, state.turn)))
+        return out
+
+    # ------------------------- search -----------------------------
+    def evaluate(self, state: TacticalState) -> float:
+        """Party's standing: living units plus HP fraction, minus the same for the enemies."""
+        won = self.winner(state)
+        score = 0.0
+        for u, hp in zip(self.units, state.hp):
+            if hp > 0:
+                v = 1.0 + hp / u.max_hp
+                score += v if u.side == PARTY_SIDE else -v
+        if won == PARTY_SIDE:
+            score += WIN_SCORE
+        elif won == ENEMY_SIDE:
+            score -= WIN_SCORE
+        return score
+
+    def _search(self, state: TacticalState, depth: int) -> float:
+        if depth == 0 or self.winner(state) is not None:
+            return self.evaluate(state)
+        hit = self.table.get(state)
+        if hit is not None and hit[0] >= depth:
+            return hit[1]
+        self._nodes += 1
+        if self._deadline is not None and self._nodes & 63 == 0 and time.perf_counter() > self._deadline:
+            raise _OutOfTime
+        maximize = self.units[self.actor(state)].side == PARTY_SIDE
+        best = None
+        for action in self.actions(state):
+            v = sum(p * self._search(nxt, depth - 1) for p, nxt in self.outcomes(state, action))
+            if best is None or (v > best if maximize else v < best):
+                best = v
+        if len(self.table) >= self.table_size:
+            self.table.clear()
+        self.table[state] = (depth, best)
+        return best
+
+    def choose(self, state: TacticalState, time_budget: Optional[float] = None) -> Decision:
+        """Best action for whoever's turn it is, deepening until the time budget runs out."""
+        start = time.perf_counter()
+        budget = self.time_budget if time_budget is None else time_budget
+        maximize = self.units[self.actor(state)].side == PARTY_SIDE
+        self._nodes = 0
+        best: Optional[Tuple[Action, float]] = None
+        reached = 0
+        for depth in range(1, self.max_depth + 1):
+            # depth 1 always finishes, so there is always an answer
+            self._deadline = None if depth == 1 else start + budget
+            try:
+                scored = [(sum(p * self._search(nxt, depth - 1) for p, nxt in self.outcomes(state, action)), action)
+                          for action in self.actions(state)]
+            except _OutOfTime:
+                break
+            value, action = (max if maximize else min)(scored, key=lambda s: s[0])
+            best, reached = (action, value), depth
+            if time.perf_counter() > start + budget:
+                break
+        self._deadline = None
+        return Decision(best[0], best[1], reached, self._nodes, time.perf_counter() - start)
+
+
+# -----------------------------
+# Playing a fight out
+# -----------------------------
+def initiative_order(units: Sequence[Unit], rng: random.Random) -> List[int]:
+    """Highest d20 + Init first; the party wins ties."""
+    rolls = [(rng.randint(1, 20) + u.init_mod, u.side == PARTY_SIDE) for u in units]
+    return sorted(range(len(units)), key=lambda i: rolls[i], reverse=True)
+
+
+def resolve(ai: TacticalAI, state: TacticalState, action: Action, rng: random.Random,
+            events=NULL_SINK, turn: int = 0) -> TacticalState:
+    """Apply ``action`` with real dice rolls and return the next state."""
+    a = ai.actor(state)
+    me = ai.units[a]
+    if action[0] != 'attack':
+        if events.level >= NORMAL:
+            if action[0] == 'heal':
+                target = ai.units[action[1]]
+                healed = min(target.max_hp, state.hp[action[1]] + me.heal) - state.hp[action[1]]
+                events.emit(CombatEvent(HEAL, turn, me.name, target.name, healed, state.hp[action[1]] + healed))
+            else:
+                events.emit(CombatEvent(DEFEND, turn, me.name))
+        return ai.outcomes(state, action)[0][1]
+
+    j = action[1]
+    target = ai.units[j]
+    ac = target.ac + (DEFEND_BONUS if state.defending >> j & 1 else 0)
+    nat = rng.randint(1, 20)
+    dmg = 0
+    if nat == 20 or (nat != 1 and nat + me.atk_mod >= ac):
+        dmg = max(0, me.damage.roll(rng)) * (2 if nat == 20 else 1)
+    hp = list(state.hp)
+    hp[j] = max(0, hp[j] - dmg)
+    if events.level >= NORMAL:
+        if dmg:
+            events.emit(CombatEvent(CRIT if nat == 20 else HIT, turn, me.name, target.name, dmg, hp[j]))
+        else:
+            events.emit(CombatEvent(MISS, turn, me.name, target.name, nat))
+    if hp[j] == 0 and events.level >= SUMMARY:
+        events.emit(CombatEvent(DEATH, turn, me.name, target.name, hp=0))
+    return ai._advance(tuple(hp), state.defending & ~(1 << a), state.heals, state.turn)
+
+
+def play(units: Sequence[Unit], rng: Optional[random.Random] = None, events=NULL_SINK,
+         max_turns: int = 1000, **ai_kw) -> Tuple[Optional[int], TacticalState, List[Decision]]:
+    """Fight to the end with the AI choosing for both sides; returns (winning side, final state, decisions)."""
+    rng = rng or random.Random()
+    ai = TacticalAI(units, initiative_order(units, rng), **ai_kw)
+    state = ai.start()
+    decisions = []
+    for turn in range(1, max_turns + 1):
+        if ai.winner(state) is not None:
+            break
+        decision = ai.choose(state)
+        decisions.append(decision)
+        state = resolve(ai, state, decision.action, rng, events, turn)
+    events.flush()
+    return ai.winner(state), state, decisions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Play out a fight with the expectimax tactical AI on both sides")
+    ap.add_argument('--heroes', nargs='+', default=['LaeZel', 'Shadowheart'], choices=list(partyDict))
+    ap.add_argument('--monsters', nargs='+', default=['Orc:2'], help="NAME:COUNT pairs from enemyDict")
+    ap.add_argument('--healer', nargs='*', default=['Shadowheart'], help="heroes who can cast HealLoop")
+    ap.add_argument('--budget', type=float, default=0.05, help="seconds per decision")
+    ap.add_argument('--depth', type=int, default=8)
+    ap.add_argument('--seed', type=int)
+    args = ap.parse_args()
+
+    units = [Unit.from_stats(h, partyDict[h], PARTY_SIDE, heals=HEAL_USES if h in args.healer else 0)
+             for h in args.heroes]
+    for spec in args.monsters:
+        name, _, count = spec.partition(':')
+        units += [Unit.from_stats(f"{name} {i + 1}", enemyDict[name], ENEMY_SIDE) for i in range(int(count or 1))]
+
+    winner, state, decisions = play(units, random.Random(args.seed), TextSink(),
+                                    time_budget=args.budget, max_depth=args.depth)
+    print("party wins" if winner == PARTY_SIDE else "enemies win" if winner == ENEMY_SIDE else "no winner")
+    depths = [d.depth for d in decisions]
+    print(f"{len(decisions)} decisions, mean depth {sum(depths) / len(depths):.1f}, "
+          f"slowest {max(d.seconds for d in decisions) * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()